@@ -0,0 +1,5 @@
+"""The T@PP modules live at the top of the repository, next to todogui.py"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
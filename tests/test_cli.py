@@ -0,0 +1,84 @@
+"""The command line, run through todocli.main against a temporary database"""
+import io
+import json
+import sys
+import time
+
+import pytest
+
+import todocli
+
+@pytest.fixture
+def cli(tmp_path, capsys, monkeypatch):
+    db = str(tmp_path / "tasks.db")
+    
+    def run(*argv, stdin=None):
+        """(exit code, stdout, stderr) of one command"""
+        if stdin is not None:
+            monkeypatch.setattr(sys, "stdin", io.StringIO(stdin))
+        code = todocli.main(["--db", db, *argv])
+        out, err = capsys.readouterr()
+        return code, out, err
+    
+    run.db = db
+    return run
+
+def test_add_list_done_and_rm(cli):
+    assert cli("add", "Buy milk", "Ship it #ops", "--priority", "high", "--print-ids") == \
+        (0, "1\n2\n", "Added 2 tasks\n")
+    code, out, _err = cli("list")
+    assert out.splitlines() == ["#1 [ ] Buy milk (high)", "#2 [ ] Ship it #ops (high)"]
+    assert cli("done", "1")[2] == "Marked 1 task completed\n"
+    assert cli("list", "--active")[1] == "#2 [ ] Ship it #ops (high)\n"
+    assert cli("list", "--completed")[1] == "#1 [x] Buy milk (high)\n"
+    code, _out, err = cli("rm", "2", "9")
+    assert code == 1 and "No task #9" in err
+    assert cli("list")[1] == "#1 [x] Buy milk (high)\n"
+
+def test_add_reads_stdin_and_due_suffixes(cli):
+    assert cli("add", stdin="one\n\ntwo @2030-01-01\n")[2] == "Added 2 tasks\n"
+    code, out, _err = cli("list", "--json")
+    records = [json.loads(line) for line in out.splitlines()]
+    assert [record["text"] for record in records] == ["one", "two"]
+    assert records[0]["due"] is None and records[1]["due"].startswith("2030-01-01T00:00")
+
+def test_filter_and_tags(cli):
+    cli("add", "a #ops", "b #ops #urgent", "c #urgent")
+    cli("done", "3")
+    assert cli("list", "--filter", "active AND #urgent")[1] == "#2 [ ] b #ops #urgent\n"
+    assert cli("tags")[1] == "#ops\t2\n#urgent\t2\n"
+    with pytest.raises(SystemExit):
+        cli("list", "--filter", "active AND")
+
+def test_import_counts_skipped_records(cli, tmp_path):
+    path = tmp_path / "tasks.jsonl"
+    path.write_text('{"text": "from file", "status": true}\nnot json\n{"text": ""}\n'
+                    '{"text": "never", "due": Infinity}\n{"text": "too late", "due": 1e20}\n', encoding="utf-8")
+    assert cli("import", str(path))[2] == "Imported 1 task (4 skipped)\n"
+    assert cli("import", "-", "--csv", stdin="text,status\nfrom csv,false\n")[2] == "Imported 1 task\n"
+    assert cli("list")[1] == "#1 [x] from file\n#2 [ ] from csv\n"
+
+def test_streamed_tasks_are_written_before_the_batch_fills(cli, monkeypatch):
+    seen = []
+    
+    class SlowProducer:
+        """stdin that waits for the first task to be listed before sending the second"""
+        
+        def __iter__(self):
+            yield "first\n"
+            deadline = time.monotonic() + 5
+            while not seen and time.monotonic() < deadline:
+                time.sleep(0.05)
+            yield "second\n"
+        
+        def __enter__(self):
+            return self
+        
+        def __exit__(self, *exc):
+            return False
+    
+    original = todocli.add_rows
+    monkeypatch.setattr(todocli, "add_rows", lambda storage, rows: seen.append(rows) or original(storage, rows))
+    monkeypatch.setattr(sys, "stdin", SlowProducer())
+    assert todocli.main(["--db", cli.db, "add"]) == 0
+    assert [[row[0] for row in rows] for rows in seen] == [["first"], ["second"]]
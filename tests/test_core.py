@@ -0,0 +1,185 @@
+"""TaskStore, views, search, tags and filter expressions"""
+import random
+
+import pytest
+
+from todocore import (FILTERS, HIGH, LOW, NORMAL, SearchIndex, TagIndex, TaskFilter, TaskStore, bitset_ids,
+                      make_view, task_tags)
+
+def fill(store, texts):
+    return store.add_many([(text, False) for text in texts])
+
+# ============= STORE =============
+def test_store_ids_counts_and_events():
+    store = TaskStore()
+    events = []
+    store.subscribe(lambda event, tasks: events.append((event, [task.id for task in tasks])))
+    first = store.add("one")
+    more = fill(store, ["two", "three"])
+    assert [first.id] + [task.id for task in more] == [1, 2, 3]
+    store.toggle(2)
+    store.set_status_many([1, 2], True)
+    assert store.completed == 2
+    store.remove(2)
+    assert store.completed == 1 and len(store) == 2 and 2 not in store
+    store.clear()
+    assert len(store) == 0 and store.completed == 0
+    assert [event for event, _ids in events] == ["add", "add", "update", "update", "remove", "clear"]
+    # Only the task whose status changed is reported
+    assert events[3] == ("update", [1])
+
+def test_update_keeps_previous_fields_in_before():
+    store = TaskStore()
+    task = store.add("old text", priority=LOW)
+    seen = {}
+    store.subscribe(lambda event, tasks: seen.update(store.before))
+    store.update_many([(task.id, "new text", True, HIGH, 100)])
+    assert seen[task.id] == ("old text", False, LOW, None)
+    assert task.fields() == ("new text", True, HIGH, 100)
+    assert store.completed == 1
+
+def test_restored_and_loaded_tasks_keep_their_ids():
+    store = TaskStore()
+    fill(store, ["a", "b", "c"])
+    removed = store.remove(2)
+    store.restore([(removed.id,) + removed.fields()])
+    store.load([(10, "loaded", 1, NORMAL, None)])
+    assert sorted(task.id for task in store) == [1, 2, 3, 10]
+    assert store.completed == 1
+    assert store.add("next").id == 11
+
+def test_allocate_ids_replaces_the_local_counter():
+    store = TaskStore()
+    store.allocate_ids = lambda count: range(100, 100 + count)
+    assert [task.id for task in fill(store, ["a", "b"])] == [100, 101]
+    store.allocate_ids = None
+    assert store.add("c").id == 102
+
+# ============= VIEWS =============
+@pytest.mark.parametrize("sort", ["created", "priority", "alpha"])
+def test_views_follow_random_changes(sort):
+    rng = random.Random(sort)
+    store = TaskStore()
+    predicate = FILTERS["active"]
+    view = make_view(store, predicate, sort)
+    view.attach()
+    words = ["apple", "Banana", "cherry", "date"]
+    for _ in range(400):
+        ids = [task.id for task in store]
+        action = rng.random()
+        if action < 0.3 or not ids:
+            store.add_many([(rng.choice(words), rng.random() < 0.3, rng.randrange(3))
+                            for _ in range(rng.choice([1, 2, 100]))])
+        elif action < 0.5:
+            store.toggle(rng.choice(ids))
+        elif action < 0.6:
+            store.set_priority(rng.choice(ids), rng.randrange(3))
+        elif action < 0.8:
+            removed = store.remove_many(rng.sample(ids, min(len(ids), rng.choice([1, 80]))))
+            if rng.random() < 0.5:
+                store.restore(sorted((task.id,) + task.fields() for task in removed))
+        elif action < 0.85:
+            store.clear()
+        else:
+            store.set_status_many(rng.sample(ids, min(len(ids), 70)), rng.random() < 0.5)
+        expected = make_view(store, predicate, sort)
+        assert view.ids == expected.ids
+        assert [task.id for task in view] == expected.ids
+    for position, task_id in enumerate(view.ids):
+        assert view.index(task_id) == position
+
+def test_sorted_views_order_by_their_key():
+    store = TaskStore()
+    store.add_many([("b", False, LOW), ("A", False, HIGH), ("c", False, HIGH)])
+    assert make_view(store, FILTERS["all"], "priority").ids == [2, 3, 1]
+    assert make_view(store, FILTERS["all"], "alpha").ids == [2, 1, 3]
+
+def test_view_from_the_whole_store_is_in_id_order_after_a_restore():
+    store = TaskStore()
+    fill(store, ["a", "b", "c"])
+    removed = store.remove(1)
+    store.restore([(removed.id,) + removed.fields()])
+    assert make_view(store, FILTERS["all"]).ids == [1, 2, 3]
+
+# ============= SEARCH =============
+def test_search_matches_word_prefixes_and_follows_changes():
+    store = TaskStore()
+    index = SearchIndex()
+    index.attach(store)
+    fill(store, ["Buy milk", "Build the shed", "Call mom"])
+    assert index.search("bu") == {1, 2}
+    assert index.search("bu mi") == {1}
+    assert index.search("zzz") == set()
+    store.update_many([(1, "Sell milk", False, NORMAL, None)])
+    assert index.search("bu") == {2}
+    assert index.matches(1, "sel")
+    store.remove(2)
+    assert index.search("build") == set()
+    store.clear()
+    assert index.search("call") == set()
+
+# ============= TAGS AND FILTERS =============
+def test_task_tags_are_casefolded_and_unique():
+    assert task_tags("Page #OnCall about #db-load and #oncall") == ("db-load", "oncall")
+    assert task_tags("issue#12 and #1st are not tags") == ()
+
+def test_bitset_ids():
+    assert bitset_ids(0) == []
+    assert bitset_ids(0b101010) == [1, 3, 5]
+
+def test_tag_index_counts_tags():
+    store = TaskStore()
+    index = TagIndex()
+    index.attach(store)
+    fill(store, ["a #ops", "b #ops #urgent", "c"])
+    assert index.tags() == [("ops", 2), ("urgent", 1)]
+    store.update_many([(2, "b #urgent", False, NORMAL, None)])
+    store.remove(1)
+    assert index.tags() == [("urgent", 1)]
+    store.clear()
+    assert index.tags() == []
+
+def test_filter_parser_normal_form():
+    assert TaskFilter("").text == "all"
+    assert TaskFilter("Active and NOT #Ops").text == "active AND NOT #ops"
+    assert TaskFilter("urgent ops").text == "#urgent AND #ops"
+    assert TaskFilter("(high OR low) AND done").text == "(high OR low) AND done"
+    # AND binds tighter than OR
+    assert TaskFilter("high OR low AND done").text == "high OR (low AND done)"
+
+@pytest.mark.parametrize("expression", ["AND", "(active", "active )", "NOT", "#1st", "active OR"])
+def test_filter_parser_rejects_bad_expressions(expression):
+    with pytest.raises(ValueError):
+        TaskFilter(expression)
+
+def test_filter_ids_agree_with_the_predicate():
+    rng = random.Random(7)
+    store = TaskStore()
+    index = TagIndex()
+    index.attach(store)
+    tags = ["#ops", "#urgent", "#home", ""]
+    store.add_many([(f"task {rng.choice(tags)} {rng.choice(tags)}", rng.random() < 0.4, rng.randrange(3))
+                    for _ in range(300)])
+    store.remove_many(rng.sample([task.id for task in store], 50))
+    words = ["active", "completed", "high", "low", "#ops", "urgent", "home"]
+    for _ in range(200):
+        expression = rng.choice(words)
+        for _ in range(rng.randrange(4)):
+            expression = f"{'NOT ' if rng.random() < 0.3 else ''}{rng.choice(words)} " \
+                         f"{rng.choice(['AND', 'OR', ''])} ({expression})"
+        task_filter = TaskFilter(expression)
+        assert task_filter.ids(index) == sorted(task.id for task in store if task_filter(task)), expression
+
+def test_tag_bitsets_are_indexed_by_dense_slots():
+    store = TaskStore()
+    index = TagIndex()
+    index.attach(store)
+    store.load([(10_000_000 + i, f"task #t{i % 2}", False, NORMAL, None) for i in range(0, 3000, 3)])
+    assert index.all.mask().bit_length() <= 1000
+    removed = store.remove_many([10_000_000 + i for i in range(0, 300, 3)])
+    store.add_many([("new #t0", False)] * 50)
+    # Freed slots are reused before the bitsets grow
+    assert index.all.mask().bit_length() <= 1000
+    assert TaskFilter("#t0").ids(index) == sorted(task.id for task in store if "#t0" in task.text)
+    store.restore(sorted((task.id,) + task.fields() for task in removed))
+    assert TaskFilter("all").ids(index) == sorted(task.id for task in store)
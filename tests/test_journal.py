@@ -0,0 +1,116 @@
+"""UndoJournal, in place and with spill files written and read on workers"""
+import time
+
+import pytest
+
+import todojournal
+from todocore import HIGH, TaskStore
+from todojournal import UndoJournal
+from todoworkers import WorkerPool
+
+def snapshot(store):
+    return sorted((task.id,) + task.fields() for task in store)
+
+@pytest.fixture
+def store():
+    return TaskStore()
+
+@pytest.fixture
+def journal(store):
+    journal = UndoJournal(store)
+    journal.attach()
+    yield journal
+    journal.clear()
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool()
+    yield pool
+    pool.shutdown()
+
+def drain(pool):
+    while pool.busy:
+        pool.drain()
+        time.sleep(0.001)
+
+def test_every_kind_of_change_can_be_undone_and_redone(store, journal):
+    states = [snapshot(store)]
+    store.add_many([("a", False), ("b", True), ("c", False)])
+    states.append(snapshot(store))
+    store.set_priority(2, HIGH)
+    states.append(snapshot(store))
+    store.remove_many([1, 3])
+    states.append(snapshot(store))
+    store.clear()
+    states.append(snapshot(store))
+    for state in reversed(states[:-1]):
+        assert journal.undo() is not None
+        assert snapshot(store) == state
+    assert journal.undo() is None
+    for state in states[1:]:
+        assert journal.redo() is not None
+        assert snapshot(store) == state
+    assert journal.redo() is None
+
+def test_a_new_change_drops_the_redo_history(store, journal):
+    store.add("a")
+    journal.undo()
+    assert journal.can_redo
+    store.add("b")
+    assert not journal.can_redo
+
+def test_history_stays_within_its_limits(store):
+    journal = UndoJournal(store, max_steps=3)
+    journal.attach()
+    for text in "abcde":
+        store.add(text)
+    assert len(journal.undo_steps) == 3
+    small = UndoJournal(store, memory_limit=1)
+    small.attach()
+    store.set_priority(1, HIGH)
+    store.set_priority(2, HIGH)
+    # The latest step is kept even over the limit
+    assert len(small.undo_steps) == 1
+
+def test_large_removals_are_spilled_to_disk(store, journal, monkeypatch):
+    monkeypatch.setattr(todojournal, "SPILL_ROWS", 10)
+    store.add_many([(f"task {i}", i % 2 == 0) for i in range(50)])
+    before = snapshot(store)
+    store.clear()
+    path = journal.undo_steps[-1].path
+    assert path is not None
+    journal.undo()
+    assert snapshot(store) == before
+    journal.clear()
+    with pytest.raises(FileNotFoundError):
+        open(path)
+
+def test_spill_files_are_written_and_read_on_workers(store, journal, pool, monkeypatch):
+    monkeypatch.setattr(todojournal, "SPILL_ROWS", 10)
+    monkeypatch.setattr(todojournal, "IMPORT_BATCH_SIZE", 7)
+    journal.run_io = pool.submit
+    store.add_many([(f"task {i}", False) for i in range(50)])
+    before = snapshot(store)
+    store.clear()
+    step = journal.undo_steps[-1]
+    drain(pool)
+    assert step.data is None
+    assert journal.undo() == "clear"
+    assert journal.busy
+    assert journal.undo() is None
+    drain(pool)
+    assert not journal.busy
+    assert snapshot(store) == before
+    assert journal.redo() == "clear"
+    assert len(store) == 0
+
+def test_undo_before_the_spill_is_written_uses_the_tasks_in_memory(store, journal, pool, monkeypatch):
+    monkeypatch.setattr(todojournal, "SPILL_ROWS", 10)
+    journal.run_io = pool.submit
+    store.add_many([(f"task {i}", False) for i in range(50)])
+    before = snapshot(store)
+    store.clear()
+    # Nothing was drained, so the step still holds the tasks
+    assert journal.undo() == "clear"
+    assert snapshot(store) == before
+    drain(pool)
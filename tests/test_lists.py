@@ -0,0 +1,40 @@
+"""List names and files, and the ListCache of open lists"""
+import pytest
+
+import todolists
+from todolists import DEFAULT_LIST, ListCache, TaskList, check_list_name, list_names, list_path
+
+def test_check_list_name():
+    assert check_list_name("  Work   stuff ") == "Work stuff"
+    with pytest.raises(ValueError):
+        check_list_name("   ")
+    with pytest.raises(ValueError):
+        check_list_name("x" * (todolists.MAX_LIST_NAME + 1))
+
+def test_list_files_keep_their_names(tmp_path):
+    for name in ["Work", "Home/Garden", "Ünïcode?"]:
+        path = list_path(name, str(tmp_path))
+        assert path.startswith(str(tmp_path))
+        open(path, "w").close()
+    assert list_path(DEFAULT_LIST) == todolists.DB_PATH
+    assert list_names(str(tmp_path)) == [DEFAULT_LIST, "Home/Garden", "Work", "Ünïcode?"]
+    assert list_names(str(tmp_path / "missing")) == [DEFAULT_LIST]
+
+def test_cache_evicts_the_least_recently_used_lists():
+    cache = ListCache(max_lists=2)
+    a, b, c = TaskList("a"), TaskList("b"), TaskList("c")
+    assert cache.put(a) == [] and cache.put(b) == []
+    cache.put(a)
+    assert cache.put(c) == [b]
+    assert [task_list.name for task_list in cache] == ["a", "c"]
+    assert "b" not in cache and cache.get("a") is a
+
+def test_cache_trims_by_memory_but_keeps_the_latest_list():
+    cache = ListCache(max_lists=5, max_mb=1)
+    big, small = TaskList("big"), TaskList("small")
+    cache.put(big)
+    big.store.add_many([("task", False)] * (2 * 1024 * 1024 // todolists.TASK_MEMORY_ESTIMATE))
+    assert cache.trim() == []
+    assert cache.put(small) == [big]
+    assert cache.put(big) == [small]
+    assert len(cache) == 1
@@ -0,0 +1,115 @@
+"""Due date parsing and the DueScheduler, with a fake timer and clock"""
+from datetime import datetime
+
+import pytest
+
+from todocore import TaskStore
+from todoreminders import MAX_WAIT_MS, DueScheduler, parse_due, split_due
+
+NOW = datetime(2025, 6, 1, 12, 0).timestamp()
+
+class FakeTimer:
+    """Stands in for Tk's after/after_cancel; run() fires the armed callback"""
+    
+    def __init__(self):
+        self.jobs = {}
+        self.count = 0
+    
+    def after(self, ms, callback):
+        self.count += 1
+        self.jobs[self.count] = (ms, callback)
+        return self.count
+    
+    def after_cancel(self, job):
+        del self.jobs[job]
+    
+    @property
+    def delay(self):
+        (ms, _callback), = self.jobs.values()
+        return ms
+    
+    def run(self):
+        (job, (_ms, callback)), = self.jobs.items()
+        del self.jobs[job]
+        callback()
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+    
+    def __call__(self):
+        return self.now
+
+def test_parse_due_forms():
+    assert parse_due(None) is None and parse_due("  ") is None
+    assert parse_due(1700000000) == 1700000000
+    assert parse_due("+30m", NOW) == NOW + 1800
+    assert parse_due("+2d", NOW) == NOW + 2 * 86400
+    assert parse_due("17:30", NOW) == datetime(2025, 6, 1, 17, 30).timestamp()
+    # A time already past today is tomorrow's
+    assert parse_due("09:00", NOW) == datetime(2025, 6, 2, 9, 0).timestamp()
+    assert parse_due("2025-12-31") == datetime(2025, 12, 31).timestamp()
+    with pytest.raises(ValueError):
+        parse_due("soon")
+    with pytest.raises(ValueError):
+        parse_due(True)
+
+@pytest.mark.parametrize("value", [float("inf"), float("nan"), 1e20, "+99999999w"])
+def test_parse_due_rejects_times_out_of_range(value):
+    with pytest.raises(ValueError):
+        parse_due(value, NOW)
+
+def test_split_due():
+    assert split_due("Call mom @+1h", NOW) == ("Call mom", NOW + 3600)
+    assert split_due("Email bob@example.com", NOW) == ("Email bob@example.com", None)
+    assert split_due("Meet @ the park", NOW) == ("Meet @ the park", None)
+    assert split_due("Later @+99999999w", NOW) == ("Later @+99999999w", None)
+
+@pytest.fixture
+def scheduled():
+    store = TaskStore()
+    timer = FakeTimer()
+    clock = Clock(NOW)
+    fired = []
+    scheduler = DueScheduler(store, timer, lambda tasks: fired.extend(task.id for task in tasks), clock)
+    scheduler.attach()
+    return store, timer, clock, fired
+
+def test_only_the_nearest_deadline_is_armed(scheduled):
+    store, timer, clock, fired = scheduled
+    late = store.add("late", due=NOW + 600)
+    early = store.add("early", due=NOW + 60)
+    assert timer.delay == 60 * 1000 + 1
+    clock.now = NOW + 60
+    timer.run()
+    assert fired == [early.id]
+    assert timer.delay == 540 * 1000 + 1
+    store.toggle(late.id)
+    assert timer.jobs == {}
+
+def test_removed_and_rescheduled_tasks_do_not_fire(scheduled):
+    store, timer, clock, fired = scheduled
+    gone = store.add("gone", due=NOW + 10)
+    moved = store.add("moved", due=NOW + 20)
+    store.remove(gone.id)
+    store.update_many([(moved.id, "moved", False, moved.priority, NOW + 5000)])
+    clock.now = NOW + 30
+    timer.run()
+    assert fired == []
+    clock.now = NOW + 5000
+    timer.run()
+    assert fired == [moved.id]
+
+def test_far_deadlines_wait_at_most_max_wait(scheduled):
+    store, timer, clock, fired = scheduled
+    store.add("next year", due=NOW + 365 * 86400)
+    assert timer.delay == MAX_WAIT_MS
+    timer.run()
+    assert fired == [] and timer.delay == MAX_WAIT_MS
+
+def test_loaded_overdue_tasks_are_announced_once(scheduled):
+    store, timer, clock, fired = scheduled
+    store.load([(1, "overdue", 0, 1, NOW - 60), (2, "done", 1, 1, NOW - 60)])
+    timer.run()
+    assert fired == [1]
+    assert timer.jobs == {}
@@ -0,0 +1,182 @@
+"""SQLiteStorage and ChangeFeed, with two instances on one database"""
+import sqlite3
+
+from todocore import TaskStore
+from todofeed import ChangeFeed
+from todostorage import LEASE_BLOCK, SQLiteStorage
+
+class Instance:
+    """A store, its storage and feed, with writes queued like the serial worker's"""
+    
+    def __init__(self, path):
+        self.writes = []
+        self.storage = SQLiteStorage(str(path), writer=lambda *job: self.writes.append(job))
+        self.store = TaskStore()
+        self.storage.attach(self.store)
+        self.store.allocate_ids = self.storage.lease_ids
+        self.feed = ChangeFeed(self.storage, self.store)
+        self.feed.start()
+        last_id = self.storage.max_id()
+        self.store.reserve_ids(last_id)
+        self.store.load(self.storage.load_page(0, last_id, last_id or 1))
+    
+    def run_writes(self):
+        while self.writes:
+            write, changes, on_error = self.writes.pop(0)
+            try:
+                write(changes)
+            except sqlite3.OperationalError as e:
+                if on_error is None:
+                    raise
+                on_error(e)
+    
+    def sync(self):
+        """Flush, write and apply the feed, as one poll of the GUI"""
+        self.storage.flush()
+        self.run_writes()
+        self.feed.apply(self.feed.read())
+    
+    def rows(self):
+        return sorted((task.id,) + task.fields() for task in self.store)
+    
+    def close(self):
+        self.run_writes()
+        self.storage.close()
+
+def test_own_stale_entry_does_not_revert_an_edit_taken_after_the_read(tmp_path):
+    a = Instance(tmp_path / "tasks.db")
+    b = Instance(tmp_path / "tasks.db")
+    task = a.store.add("v1")
+    a.storage.flush()
+    a.run_writes()
+    # The read sees our own write of v1 ...
+    entries = a.feed.read()
+    assert [entry[4] for entry in entries] == ["v1"]
+    # ... and the task is edited, and the edit taken for writing, before it is applied
+    a.store.update_many([(task.id, "v2", False, task.priority, None)])
+    a.storage.flush()
+    a.feed.apply(entries)
+    assert a.store.get(task.id).text == "v2"
+    a.run_writes()
+    a.sync()
+    b.sync()
+    assert a.store.get(task.id).text == "v2"
+    assert a.rows() == b.rows()
+    a.close()
+    b.close()
+
+def test_changes_reach_the_other_instance(tmp_path):
+    a = Instance(tmp_path / "tasks.db")
+    b = Instance(tmp_path / "tasks.db")
+    first = a.store.add("from a")
+    a.sync()
+    second = b.store.add("from b")
+    b.sync()
+    a.sync()
+    assert first.id != second.id
+    assert a.rows() == b.rows()
+    assert [task.text for task in sorted(a.store, key=lambda task: task.id)] == ["from a", "from b"]
+    b.store.remove(first.id)
+    b.store.toggle(second.id)
+    b.sync()
+    a.sync()
+    assert a.rows() == b.rows() == [(second.id, "from b", True, second.priority, None)]
+    a.close()
+    b.close()
+
+def test_remote_clear_keeps_tasks_with_unwritten_changes(tmp_path):
+    a = Instance(tmp_path / "tasks.db")
+    b = Instance(tmp_path / "tasks.db")
+    a.store.add("old")
+    a.sync()
+    b.sync()
+    b.store.clear()
+    b.sync()
+    kept = a.store.add("added meanwhile")
+    a.feed.apply(a.feed.read())
+    assert [task.id for task in a.store] == [kept.id]
+    a.sync()
+    b.sync()
+    assert a.rows() == b.rows() == [(kept.id, "added meanwhile", False, kept.priority, None)]
+    a.close()
+    b.close()
+
+def test_ids_come_from_leased_blocks_while_the_database_is_locked(tmp_path):
+    a = Instance(tmp_path / "tasks.db")
+    b = Instance(tmp_path / "tasks.db")
+    a.storage.prefetch_ids()
+    a.run_writes()
+    lock = sqlite3.connect(str(tmp_path / "tasks.db"), timeout=0)
+    lock.execute("BEGIN IMMEDIATE")
+    ids = [a.store.add(f"task {i}").id for i in range(LEASE_BLOCK // 2 + 1)]
+    lock.rollback()
+    lock.close()
+    assert ids == sorted(ids)
+    # Below half a block left, another one is leased through the writer
+    assert a.writes
+    a.run_writes()
+    b_ids = [task.id for task in b.store.add_many([("from b", False)] * 10)]
+    assert not set(ids) & set(b_ids)
+    a.sync()
+    b.sync()
+    a.sync()
+    assert a.rows() == b.rows()
+    a.close()
+    b.close()
+
+def test_changes_are_coalesced_until_flushed(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "tasks.db"))
+    store = TaskStore()
+    storage.attach(store)
+    task = store.add("draft")
+    store.toggle(task.id)
+    store.set_priority(task.id, 2)
+    doomed = store.add("doomed")
+    store.remove(doomed.id)
+    assert storage.dirty
+    assert storage.load_page(0, 10) == [(task.id, "draft", 1, 2, None)]
+    assert not storage.dirty
+    storage.close()
+    reopened = SQLiteStorage(str(tmp_path / "tasks.db"))
+    assert reopened.max_id() == task.id
+    assert reopened.load_ids([doomed.id, task.id]) == [(task.id, "draft", 1, 2, None)]
+    reopened.close()
+
+def test_an_instance_behind_a_compacted_feed_must_reload(tmp_path):
+    a = Instance(tmp_path / "tasks.db")
+    b = Instance(tmp_path / "tasks.db")
+    a.store.add("one")
+    a.sync()
+    # Only a is still registered, so the feed is compacted up to where it got
+    b.storage.conn.execute(b.storage.UNREGISTER, (b.storage.origin,))
+    b.storage.conn.commit()
+    a.storage.heartbeat = 0
+    a.storage.acknowledge(a.feed.seq)
+    a.storage.compact()
+    assert b.feed.read() is None
+    a.close()
+    b.close()
+
+def test_a_failed_write_is_retried_by_the_next_flush(tmp_path):
+    a = Instance(tmp_path / "tasks.db")
+    b = Instance(tmp_path / "tasks.db")
+    kept = a.store.add("kept")
+    edited = a.store.add("first")
+    gone = a.store.add("gone")
+    a.storage.flush()
+    lock = sqlite3.connect(str(tmp_path / "tasks.db"), timeout=0)
+    lock.execute("BEGIN IMMEDIATE")
+    a.storage.conn.execute("PRAGMA busy_timeout = 0")
+    a.run_writes()
+    lock.rollback()
+    lock.close()
+    assert a.storage.dirty
+    # Changes made meanwhile win over the ones put back
+    a.store.update_many([(edited.id, "second", False, edited.priority, None)])
+    a.store.remove(gone.id)
+    a.sync()
+    b.sync()
+    assert b.rows() == a.rows() == [(kept.id, "kept", False, kept.priority, None),
+                                    (edited.id, "second", False, edited.priority, None)]
+    a.close()
+    b.close()
@@ -0,0 +1,253 @@
+"""Benchmarks for T@PP: model throughput and GUI refresh latency at scale.
+
+The model layer times the Tk-free task store, filter views and the search
+and tag indexes. The GUI layer drives todogui under the current display, or under
+a private Xvfb server when there is none. Every metric is lower-is-better
+(microseconds per operation, or widget counts), so a run can be checked
+against a saved baseline:
+
+    python todobench.py --output baseline.json
+    python todobench.py --compare baseline.json --tolerance 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import time
+
+from todocore import FILTERS, PRIORITY_NAMES, SORTS, SearchIndex, TagIndex, TaskFilter, TaskStore, make_view
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+# Operations timed per size for the per-task mutations, so the large
+# sizes measure the cost of one change instead of running for minutes
+SAMPLE_OPS = 1000
+
+SEARCH_QUERIES = ["report", "fix bug", "call", "q", "review plan week", "zzz"]
+
+FILTER_EXPRESSIONS = ["active AND #urgent AND NOT #ops", "#oncall OR (high AND NOT done)", "NOT #ops", "#zzz"]
+
+TAGS = ["#ops", "#urgent", "#oncall"]
+
+WORDS = [
+    "buy", "milk", "call", "mom", "fix", "bug", "write", "report", "review",
+    "plan", "week", "clean", "kitchen", "book", "flight", "pay", "rent",
+    "email", "team", "update", "docs", "read", "chapter", "water", "plants",
+]
+
+XVFB_DISPLAY = ":97"
+
+# ============= HELPERS =============
+def make_rows(count, seed=0):
+    """Deterministic (text, status) rows with a third of them completed and about half tagged"""
+    rng = random.Random(seed)
+    return [(" ".join(rng.choices(WORDS, k=rng.randint(2, 6)) + rng.sample(TAGS, k=rng.randint(0, 2))), i % 3 == 0)
+            for i in range(count)]
+
+def build_model(rows=()):
+    """A store wired to views and the search and tag indexes the same way the GUI does it"""
+    store = TaskStore()
+    index = SearchIndex()
+    index.attach(store)
+    tags = TagIndex()
+    tags.attach(store)
+    views = {name: make_view(store, task_filter) for name, task_filter in FILTERS.items()}
+    for view in views.values():
+        view.attach()
+    if rows:
+        store.add_many(rows)
+    return store, index, tags, views
+
+def per_op_us(func, ops):
+    """Run func once and return the microseconds it took per operation"""
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1e6 / max(ops, 1)
+
+# ============= MODEL LAYER =============
+def bench_model(size):
+    rows = make_rows(size)
+    rng = random.Random(size)
+    results = {}
+
+    store, _index, _tags, _views = build_model()
+    results["add_us"] = per_op_us(lambda: [store.add(text, status) for text, status in rows], size)
+
+    store, index, tags, _views = build_model()
+    results["add_many_us"] = per_op_us(lambda: store.add_many(rows), size)
+
+    sample = rng.sample(range(1, size + 1), min(SAMPLE_OPS, size))
+    results["toggle_us"] = per_op_us(lambda: [store.toggle(i) for i in sample], len(sample))
+
+    def switch_filters():
+        for task_filter in FILTERS.values():
+            make_view(store, task_filter, matched=task_filter.ids(tags))
+    results["filter_rebuild_us"] = per_op_us(switch_filters, len(FILTERS))
+    
+    filters = [TaskFilter(expression) for expression in FILTER_EXPRESSIONS]
+    results["filter_eval_us"] = per_op_us(
+        lambda: [task_filter.mask(tags) for task_filter in filters], len(filters))
+    results["filter_ids_us"] = per_op_us(
+        lambda: [task_filter.ids(tags) for task_filter in filters], len(filters))
+
+    results["search_us"] = per_op_us(
+        lambda: [index.search(query) for query in SEARCH_QUERIES], len(SEARCH_QUERIES))
+
+    def build_sorted_views():
+        for sort in SORTS[1:]:
+            make_view(store, FILTERS["all"], sort)
+    results["sort_rebuild_us"] = per_op_us(build_sorted_views, len(SORTS) - 1)
+
+    # A priority change moves the task within an attached sorted view
+    by_priority = make_view(store, FILTERS["all"], "priority")
+    by_priority.attach()
+    results["set_priority_us"] = per_op_us(
+        lambda: [store.set_priority(i, i % len(PRIORITY_NAMES)) for i in sample], len(sample))
+    by_priority.detach()
+
+    results["remove_us"] = per_op_us(lambda: [store.remove(i) for i in sample], len(sample))
+
+    results["clear_us"] = per_op_us(store.clear, size)
+    return results
+
+# ============= GUI LAYER =============
+def start_xvfb():
+    """Start a private Xvfb server if there is no display; return the process"""
+    if os.environ.get("DISPLAY"):
+        return None
+    if shutil.which("Xvfb") is None:
+        raise RuntimeError("no DISPLAY set and Xvfb is not installed")
+    proc = subprocess.Popen(["Xvfb", XVFB_DISPLAY, "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ["DISPLAY"] = XVFB_DISPLAY
+    time.sleep(0.5)
+    if proc.poll() is not None:
+        raise RuntimeError("Xvfb exited on startup")
+    return proc
+
+def bench_gui(sizes, renderer="widgets", repeats=20):
+    import tkinter as tk
+    import todogui as app
+
+    app.card_renderer = renderer
+    app.root = tk.Tk()
+    app.root.geometry("550x700")
+    app.build_main_page()
+    app.main_page.pack(fill="both", expand=True)
+    app.root.update()
+
+    results = {}
+    try:
+        for size in sizes:
+            app.store.clear()
+            app.store.add_many(make_rows(size))
+            app.refresh_todos()
+            app.root.update()
+            timings = {}
+
+            def refresh():
+                for _ in range(repeats):
+                    app.refresh_todos()
+                    app.root.update_idletasks()
+            timings["refresh_todos_us"] = per_op_us(refresh, repeats)
+
+            todo = app.todo_grid.items[0]
+            cards = []
+
+            def create_cards():
+                for _ in range(repeats):
+                    cards.append(app.create_todo_card(app.canvas, todo))
+                app.root.update_idletasks()
+            timings["create_todo_card_us"] = per_op_us(create_cards, repeats)
+            for card in cards:
+                card.destroy()
+
+            def progress():
+                for _ in range(repeats):
+                    app.update_progress()
+                    app.root.update_idletasks()
+            timings["update_progress_us"] = per_op_us(progress, repeats)
+
+            timings["widgets"] = app.count_widgets(app.root)
+            timings["cards_built"] = len(app.todo_grid.cards)
+            results[str(size)] = timings
+    finally:
+        app.root.destroy()
+    return results
+
+# ============= REPORT =============
+def flatten(results):
+    """{layer: {size: {metric: value}}} -> {"layer.size.metric": value}"""
+    return {f"{layer}.{size}.{metric}": value
+            for layer, by_size in results.items()
+            for size, metrics in by_size.items()
+            for metric, value in metrics.items()}
+
+def compare(current, baseline, tolerance):
+    """Metrics that grew by more than tolerance over the baseline"""
+    regressions = []
+    for name, value in sorted(flatten(current).items()):
+        base = baseline.get(name)
+        if base is not None and value > base * (1 + tolerance):
+            regressions.append((name, base, value))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the T@PP model and GUI")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--gui", action="store_true", help="also run the GUI layer (uses Xvfb without a display)")
+    parser.add_argument("--renderer", default="widgets", help="card renderer for the GUI layer")
+    parser.add_argument("--output", help="write the JSON results here instead of stdout")
+    parser.add_argument("--compare", metavar="BASELINE", help="fail if a metric regressed against this results file")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed growth over the baseline before failing (default 0.25)")
+    args = parser.parse_args(argv)
+
+    results = {"model": {}}
+    for size in args.sizes:
+        results["model"][str(size)] = bench_model(size)
+        print(f"model {size}: done", file=sys.stderr)
+
+    if args.gui:
+        try:
+            xvfb = start_xvfb()
+        except RuntimeError as e:
+            parser.error(f"cannot run the GUI layer: {e}")
+        try:
+            results["gui"] = bench_gui(args.sizes, args.renderer)
+        finally:
+            if xvfb is not None:
+                xvfb.terminate()
+                xvfb.wait()
+        print("gui: done", file=sys.stderr)
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+        "metrics": flatten(results),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["metrics"]
+        regressions = compare(results, baseline, args.tolerance)
+        for name, base, value in regressions:
+            print(f"REGRESSION {name}: {base:.2f} -> {value:.2f}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""Command-line interface for T@PP: scripted task operations without Tk.
+
+Works on the same SQLite databases as the GUI (TAPP_DB for the default
+list, --list for another one, or --db) and never imports tkinter, so it
+starts in milliseconds:
+
+    python todocli.py add "Buy milk @17:30" "Call mom" --priority high
+    some-tool | python todocli.py add -       # one task per line
+    python todocli.py list --active
+    python todocli.py list --filter "active AND #urgent AND NOT #ops"
+    python todocli.py tags                    # tags in use, with task counts
+    python todocli.py done 12 15
+    python todocli.py rm 7
+    python todocli.py import tasks.jsonl      # or - for JSONL on stdin
+    python todocli.py --list Work add "Ship the release #ops"
+    python todocli.py lists
+
+Tasks read from stdin are written a batch at a time as they arrive, so
+a producer can stream any number of them through one process; a batch
+still filling is written once its first task has waited STREAM_FLUSH_S.
+Open windows pick the changes up from the database's change feed.
+"""
+import argparse
+import json
+import os
+import sys
+
+from todocore import NORMAL, PRIORITY_NAMES, TagIndex, Task, TaskFilter, TaskStore
+from todoio import IMPORT_BATCH_SIZE, STREAM_FLUSH_S, batched, is_csv, row_batches, task_record
+from todolists import DEFAULT_LIST, check_list_name, list_names, list_path
+from todoreminders import parse_due, short_due, split_due
+from todostorage import LOAD_PAGE_SIZE, SQLiteStorage
+
+# ============= HELPERS =============
+def batch_store(storage):
+    """An empty store persisted through storage, taking new ids from its shared counter.
+    
+    Each batch gets a fresh one, so streaming never keeps old tasks in memory.
+    """
+    store = TaskStore()
+    storage.attach(store)
+    store.allocate_ids = storage.lease_ids
+    return store
+
+def add_rows(storage, rows):
+    """Add (text, status, priority, due) rows and write them right away"""
+    tasks = batch_store(storage).add_many(rows)
+    storage.flush()
+    return tasks
+
+def saved_tasks(storage):
+    """Every saved task in id order, streamed from the database"""
+    _count, rows = storage.saved_rows()
+    for task_id, text, status, priority, due in rows:
+        yield Task(task_id, text, bool(status), priority, due)
+
+def format_task(task):
+    line = f"#{task.id} [{'x' if task.status else ' '}] {task.text}"
+    details = []
+    if task.priority != NORMAL:
+        details.append(PRIORITY_NAMES[task.priority])
+    if task.due is not None:
+        details.append(f"due {short_due(task.due)}")
+    return f"{line} ({', '.join(details)})" if details else line
+
+def plural(count, word="task"):
+    return f"{count} {word}{'s' if count != 1 else ''}"
+
+# ============= COMMANDS =============
+def cmd_add(args, storage):
+    streaming = args.text in ([], ["-"])
+    lines = sys.stdin if streaming else args.text
+    texts = (line.strip() for line in lines)
+    added = 0
+    wait = STREAM_FLUSH_S if streaming else None
+    for batch in batched((text for text in texts if text), IMPORT_BATCH_SIZE, wait):
+        rows = []
+        for line in batch:
+            # A trailing "@when" overrides --due for that task
+            text, due = split_due(line)
+            rows.append((text, False, args.priority, args.due if due is None else due))
+        tasks = add_rows(storage, rows)
+        added += len(tasks)
+        if args.print_ids:
+            print("\n".join(str(task.id) for task in tasks))
+    print(f"Added {plural(added)}", file=sys.stderr)
+    return 0
+
+def cmd_list(args, storage):
+    for task in saved_tasks(storage):
+        if (args.active and task.status) or (args.completed and not task.status):
+            continue
+        if args.filter is not None and not args.filter(task):
+            continue
+        print(json.dumps(task_record(task)) if args.json else format_task(task))
+    return 0
+
+def cmd_tags(args, storage):
+    index = TagIndex()
+    for tasks in batched(saved_tasks(storage), LOAD_PAGE_SIZE):
+        index.on_change("load", tasks)
+    for tag, count in index.tags():
+        print(f"#{tag}\t{count}")
+    return 0
+
+def change_tasks(args, storage, change):
+    """Load the tasks named by args.ids, apply change(store, ids) and save"""
+    store = batch_store(storage)
+    tasks = store.load(storage.load_ids(args.ids))
+    found = [task.id for task in tasks]
+    missing = sorted(set(args.ids).difference(found))
+    for task_id in missing:
+        print(f"No task #{task_id}", file=sys.stderr)
+    change(store, found)
+    storage.flush()
+    return found, 1 if missing else 0
+
+def cmd_done(args, storage):
+    found, code = change_tasks(args, storage, lambda store, ids: store.set_status_many(ids, not args.reopen))
+    print(f"Marked {plural(len(found))} {'active' if args.reopen else 'completed'}", file=sys.stderr)
+    return code
+
+def cmd_rm(args, storage):
+    found, code = change_tasks(args, storage, lambda store, ids: store.remove_many(ids))
+    print(f"Removed {plural(len(found))}", file=sys.stderr)
+    return code
+
+def cmd_import(args, storage):
+    csv_format = args.csv or is_csv(args.path)
+    if args.path == "-":
+        f = sys.stdin
+        wait = STREAM_FLUSH_S
+    else:
+        f = open(args.path, newline="", encoding="utf-8")
+        wait = None
+    added = skipped = 0
+    with f:
+        for rows, skipped in row_batches(f, csv_format, wait=wait):
+            if rows:
+                added += len(add_rows(storage, rows))
+    message = f"Imported {plural(added)}"
+    if skipped:
+        message += f" ({skipped} skipped)"
+    print(message, file=sys.stderr)
+    return 0
+
+def cmd_lists(args, storage):
+    print("\n".join(list_names()))
+    return 0
+
+# ============= MAIN =============
+def priority_arg(value):
+    try:
+        return PRIORITY_NAMES.index(value.lower())
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"choose from {', '.join(PRIORITY_NAMES)}") from None
+
+def due_arg(value):
+    try:
+        return parse_due(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"cannot read {value!r} as a due date") from None
+
+def filter_arg(value):
+    try:
+        return TaskFilter(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+def list_arg(value):
+    try:
+        return check_list_name(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="T@PP command line: change tasks without the GUI")
+    parser.add_argument("--list", type=list_arg, default=DEFAULT_LIST, help=f'task list to work on (default: "{DEFAULT_LIST}")')
+    parser.add_argument("--db", help="task database file, instead of the one of --list")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    add = commands.add_parser("add", help="add tasks given as arguments, or one per line on stdin")
+    add.add_argument("text", nargs="*", help='task texts, or - (or nothing) to read stdin; "... @when" sets a due date')
+    add.add_argument("--priority", type=priority_arg, default=NORMAL, help="low, normal or high")
+    add.add_argument("--due", type=due_arg, help='due date for every task, e.g. "17:30", "+2h" or "2025-12-31"')
+    add.add_argument("--print-ids", action="store_true", help="print the id of every added task")
+    add.set_defaults(func=cmd_add)
+    
+    lister = commands.add_parser("list", help="print tasks in id order")
+    which = lister.add_mutually_exclusive_group()
+    which.add_argument("--active", action="store_true", help="only tasks still to do")
+    which.add_argument("--completed", action="store_true", help="only completed tasks")
+    lister.add_argument("--filter", type=filter_arg,
+                        help='only tasks matching a filter expression, e.g. "active AND #urgent AND NOT #ops"')
+    lister.add_argument("--json", action="store_true", help="print JSON lines, as the export writes them")
+    lister.set_defaults(func=cmd_list)
+    
+    commands.add_parser("tags", help="print the tags in use and how many tasks have each").set_defaults(func=cmd_tags)
+    
+    done = commands.add_parser("done", help="mark tasks completed")
+    done.add_argument("ids", type=int, nargs="+")
+    done.add_argument("--reopen", action="store_true", help="mark them active again instead")
+    done.set_defaults(func=cmd_done)
+    
+    rm = commands.add_parser("rm", help="remove tasks")
+    rm.add_argument("ids", type=int, nargs="+")
+    rm.set_defaults(func=cmd_rm)
+    
+    importer = commands.add_parser("import", help="import a .jsonl or .csv file, or - for stdin")
+    importer.add_argument("path")
+    importer.add_argument("--csv", action="store_true", help="read CSV (the default for stdin is JSON lines)")
+    importer.set_defaults(func=cmd_import)
+    
+    commands.add_parser("lists", help="print the names of the saved lists").set_defaults(func=cmd_lists)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.func is cmd_lists:
+        return cmd_lists(args, None)
+    path = args.db or list_path(args.list)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    storage = SQLiteStorage(path)
+    try:
+        return args.func(args, storage)
+    except BrokenPipeError:
+        # The reader went away (e.g. "list | head"); keep exit-time
+        # flushing of stdout from failing too
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    finally:
+        storage.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,762 @@
+"""Task model for T@PP: the store, filter views, search and tag indexes (no Tk)"""
+import bisect
+import heapq
+import itertools
+import re
+
+# ============= TASK STORE =============
+# Task priorities, lowest first
+LOW, NORMAL, HIGH = 0, 1, 2
+PRIORITY_NAMES = ("low", "normal", "high")
+
+class Task:
+    """A single task record"""
+    
+    __slots__ = ("id", "text", "status", "priority", "due")
+    
+    def __init__(self, task_id, text, status=False, priority=NORMAL, due=None):
+        self.id = task_id
+        self.text = text
+        self.status = status
+        self.priority = priority
+        self.due = due  # epoch seconds, or None
+    
+    def fields(self):
+        """The (text, status, priority, due) of the task, as kept in before"""
+        return self.text, self.status, self.priority, self.due
+
+class TaskStore:
+    """In-memory tasks indexed by id.
+    
+    Ids come from a monotonic counter and the completed count is kept up
+    to date on every change, so lookups, mutations and stats are all O(1).
+    Listeners registered with subscribe() are called as
+    listener(event, tasks) after every change, where event is one of
+    "add", "update", "remove", "clear" or "load". During an "update"
+    notification, before maps each task id to its fields() before the
+    change, and remote is True while changes another process made are
+    being applied (listeners that save or record changes skip those).
+    
+    When several processes share the tasks, allocate_ids(count) hands out
+    count fresh ids, in increasing order, in place of the local counter.
+    
+    Iteration follows insertion, not ids: tasks restored by undo or loaded
+    after newer ones come last. Views and exports sort ids themselves.
+    """
+    
+    def __init__(self):
+        self._tasks = {}  # id -> Task
+        self._next_id = 1
+        self._listeners = []
+        self.completed = 0
+        self.before = {}
+        self.remote = False
+        self.allocate_ids = None
+    
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+    
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+    
+    def _notify(self, event, tasks):
+        for listener in self._listeners:
+            listener(event, tasks)
+    
+    def _notify_update(self, tasks, before):
+        self.before = before
+        try:
+            self._notify("update", tasks)
+        finally:
+            self.before = {}
+    
+    def __len__(self):
+        return len(self._tasks)
+    
+    def __iter__(self):
+        return iter(self._tasks.values())
+    
+    def __contains__(self, task_id):
+        return task_id in self._tasks
+    
+    def get(self, task_id):
+        return self._tasks.get(task_id)
+    
+    def _take_ids(self, count):
+        """count new ids in increasing order"""
+        if self.allocate_ids is not None:
+            ids = self.allocate_ids(count)
+            self.reserve_ids(ids[-1])
+            return ids
+        first = self._next_id
+        self._next_id += count
+        return range(first, self._next_id)
+    
+    def add(self, text, status=False, priority=NORMAL, due=None):
+        task = Task(self._take_ids(1)[0], text, status, priority, due)
+        self._tasks[task.id] = task
+        if status:
+            self.completed += 1
+        self._notify("add", [task])
+        return task
+    
+    def toggle(self, task_id):
+        """Flip a task between active and completed and return it"""
+        task = self._tasks[task_id]
+        before = {task_id: task.fields()}
+        task.status = not task.status
+        self.completed += 1 if task.status else -1
+        self._notify_update([task], before)
+        return task
+    
+    def set_priority(self, task_id, priority):
+        """Change the priority of a task and return it"""
+        task = self._tasks[task_id]
+        before = {task_id: task.fields()}
+        task.priority = priority
+        self._notify_update([task], before)
+        return task
+    
+    def remove(self, task_id):
+        task = self._tasks.pop(task_id)
+        if task.status:
+            self.completed -= 1
+        self._notify("remove", [task])
+        return task
+    
+    def set_status_many(self, task_ids, status):
+        """Mark tasks completed or active in one go and notify listeners once.
+        
+        Returns the tasks whose status actually changed.
+        """
+        changed, before = [], {}
+        for task_id in task_ids:
+            task = self._tasks[task_id]
+            if task.status != status:
+                before[task_id] = task.fields()
+                task.status = status
+                changed.append(task)
+        self.completed += len(changed) if status else -len(changed)
+        if changed:
+            self._notify_update(changed, before)
+        return changed
+    
+    def update_many(self, rows):
+        """Set (id, text, status, priority, due) rows on existing tasks and notify listeners once"""
+        changed, before = [], {}
+        for task_id, text, status, priority, due in rows:
+            task = self._tasks[task_id]
+            before[task_id] = task.fields()
+            self.completed += int(bool(status)) - int(task.status)
+            task.text = text
+            task.status = bool(status)
+            task.priority = priority
+            task.due = due
+            changed.append(task)
+        if changed:
+            self._notify_update(changed, before)
+        return changed
+    
+    def remove_many(self, task_ids):
+        """Remove tasks in one go and notify listeners once"""
+        tasks = [self._tasks.pop(task_id) for task_id in task_ids]
+        self.completed -= sum(1 for task in tasks if task.status)
+        if tasks:
+            self._notify("remove", tasks)
+        return tasks
+    
+    def clear(self):
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        self.completed = 0
+        self._notify("clear", tasks)
+    
+    def add_many(self, rows):
+        """Add (text, status[, priority[, due]]) rows in one go and notify listeners once"""
+        rows = list(rows)
+        ids = self._take_ids(len(rows)) if rows else ()
+        tasks = []
+        for task_id, row in zip(ids, rows):
+            task = Task(task_id, *row)
+            self._tasks[task.id] = task
+            if task.status:
+                self.completed += 1
+            tasks.append(task)
+        self._notify("add", tasks)
+        return tasks
+    
+    def reserve_ids(self, last_id):
+        """Make sure ids handed out from now on come after last_id"""
+        self._next_id = max(self._next_id, last_id + 1)
+    
+    def load(self, rows):
+        """Add already persisted (id, text, status, priority, due) rows, sorted by id"""
+        return self._insert(rows, "load")
+    
+    def restore(self, rows):
+        """Put removed (id, text, status, priority, due) rows, sorted by id, back as new additions"""
+        return self._insert(rows, "add")
+    
+    def _insert(self, rows, event):
+        tasks = [Task(task_id, text, bool(status), priority, due) for task_id, text, status, priority, due in rows]
+        if not tasks:
+            return tasks
+        for task in tasks:
+            self._tasks[task.id] = task
+            if task.status:
+                self.completed += 1
+        self.reserve_ids(max(task.id for task in tasks))
+        self._notify(event, tasks)
+        return tasks
+
+# ============= FILTER VIEWS =============
+class TaskView:
+    """Ids of the tasks matching a predicate, kept in id (creation) order.
+    
+    An attached view follows the store's changes with bisect inserts and
+    removals, so it never has to be rebuilt from the full task list.
+    Indexing a view returns Task records. A view starts from the whole
+    store, from candidate ids to check, or from matched ids already known
+    to match (in id order, e.g. from a TaskFilter).
+    """
+    
+    # Larger batches are merged in one pass instead of one bisect per task
+    BULK_THRESHOLD = 64
+    
+    def __init__(self, store, predicate, candidates=None, matched=None):
+        self.store = store
+        self.predicate = predicate
+        if matched is not None:
+            self.ids = list(matched)
+        elif candidates is None:
+            self.ids = sorted(task.id for task in store if predicate(task))
+        else:
+            self.ids = sorted(i for i in candidates if predicate(store.get(i)))
+    
+    def attach(self):
+        self.store.subscribe(self.on_change)
+    
+    def detach(self):
+        self.store.unsubscribe(self.on_change)
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def __getitem__(self, index):
+        return self.store.get(self.ids[index])
+    
+    def index(self, task_id):
+        """Position of a task in the view, or None"""
+        index = bisect.bisect_left(self.ids, task_id)
+        if index < len(self.ids) and self.ids[index] == task_id:
+            return index
+        return None
+    
+    def on_change(self, event, tasks):
+        if event == "clear":
+            self.ids.clear()
+            return
+        added, removed = [], []
+        for task in tasks:
+            if event != "remove" and self.predicate(task):
+                added.append(task.id)
+            elif event != "add":
+                removed.append(task.id)
+        if event != "update" and not removed and added and (not self.ids or added[0] > self.ids[-1]):
+            # New tasks come in id order; with the highest ids they simply go at the end
+            self.ids.extend(added)
+        elif len(added) + len(removed) > self.BULK_THRESHOLD:
+            changed = set(added).union(removed)
+            kept = [i for i in self.ids if i not in changed]
+            self.ids = list(heapq.merge(kept, sorted(added)))
+        else:
+            for task_id in removed:
+                index = self.index(task_id)
+                if index is not None:
+                    del self.ids[index]
+            for task_id in added:
+                index = bisect.bisect_left(self.ids, task_id)
+                if index == len(self.ids) or self.ids[index] != task_id:
+                    self.ids.insert(index, task_id)
+
+# Sort keys for the orderings other than creation (id) order; every key
+# ends with the task id, so keys are unique and ties keep creation order
+SORT_KEYS = {
+    "priority": lambda task: (-task.priority, task.id),
+    "alpha": lambda task: (task.text.casefold(), task.id),
+}
+
+SORTS = ("created", "priority", "alpha")
+
+class SortedTaskView(TaskView):
+    """A TaskView kept ordered by a sort key instead of by id.
+    
+    The view holds a bisect-sorted list of keys and remembers each task's
+    key, so a change moves just that task: its old key is found by bisect
+    and removed, and the new one inserted, without re-sorting the list.
+    """
+    
+    def __init__(self, store, predicate, key, candidates=None, matched=None):
+        self.store = store
+        self.predicate = predicate
+        self.key = key
+        if matched is not None:
+            self.keys = {task_id: key(store.get(task_id)) for task_id in matched}  # id -> key
+        else:
+            tasks = store if candidates is None else map(store.get, candidates)
+            self.keys = {task.id: key(task) for task in tasks if predicate(task)}
+        self.entries = sorted(self.keys.values())
+    
+    @property
+    def ids(self):
+        return [entry[-1] for entry in self.entries]
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def __getitem__(self, index):
+        return self.store.get(self.entries[index][-1])
+    
+    def index(self, task_id):
+        key = self.keys.get(task_id)
+        if key is None:
+            return None
+        return bisect.bisect_left(self.entries, key)
+    
+    def on_change(self, event, tasks):
+        if event == "clear":
+            self.keys.clear()
+            self.entries.clear()
+            return
+        added, removed = [], []
+        for task in tasks:
+            old = self.keys.pop(task.id, None)
+            new = self.key(task) if event != "remove" and self.predicate(task) else None
+            if new is not None:
+                self.keys[task.id] = new
+            if old != new:
+                if old is not None:
+                    removed.append(old)
+                if new is not None:
+                    added.append(new)
+        if len(added) + len(removed) > self.BULK_THRESHOLD:
+            removed = set(removed)
+            kept = [entry for entry in self.entries if entry not in removed]
+            self.entries = list(heapq.merge(kept, sorted(added)))
+        else:
+            for entry in removed:
+                del self.entries[bisect.bisect_left(self.entries, entry)]
+            for entry in added:
+                bisect.insort(self.entries, entry)
+
+def make_view(store, predicate, sort="created", candidates=None, matched=None):
+    """An id-ordered TaskView, or a SortedTaskView for the other sorts"""
+    if sort == "created":
+        return TaskView(store, predicate, candidates, matched)
+    return SortedTaskView(store, predicate, SORT_KEYS[sort], candidates, matched)
+
+# ============= SEARCH =============
+# Candidate sets smaller than this are narrowed by checking each task's
+# words instead of merging postings for the next query word
+SEARCH_SCAN_LIMIT = 2000
+
+def tokenize(text):
+    return re.findall(r"\w+", text.casefold())
+
+class SearchIndex:
+    """Incremental inverted index from words to task ids.
+    
+    Every query word matches as a prefix, so results show up while a word
+    is still being typed. Prefixes are resolved by bisecting a sorted
+    vocabulary, which bulk changes only mark stale so it is re-sorted once
+    at the next query instead of on every insert.
+    """
+    
+    def __init__(self):
+        self._postings = {}  # word -> set of task ids
+        self._tokens = {}    # task id -> words indexed for it
+        self._vocab = []
+        self._vocab_stale = False
+    
+    def attach(self, store):
+        store.subscribe(self.on_change)
+    
+    def on_change(self, event, tasks):
+        if event == "clear":
+            self._postings.clear()
+            self._tokens.clear()
+            self._vocab = []
+            self._vocab_stale = False
+            return
+        if len(tasks) > 1:
+            self._vocab_stale = True
+        for task in tasks:
+            if event == "remove":
+                self._remove(task.id)
+            elif event == "update":
+                tokens = tuple(set(tokenize(task.text)))
+                if set(tokens) != set(self._tokens.get(task.id, ())):
+                    self._remove(task.id)
+                    self._add(task.id, tokens)
+            else:
+                self._add(task.id, tuple(set(tokenize(task.text))))
+    
+    def _add(self, task_id, tokens):
+        self._tokens[task_id] = tokens
+        for token in tokens:
+            ids = self._postings.get(token)
+            if ids is None:
+                ids = self._postings[token] = set()
+                if not self._vocab_stale:
+                    bisect.insort(self._vocab, token)
+            ids.add(task_id)
+    
+    def _remove(self, task_id):
+        for token in self._tokens.pop(task_id, ()):
+            ids = self._postings[token]
+            ids.discard(task_id)
+            if not ids:
+                del self._postings[token]
+                if not self._vocab_stale:
+                    del self._vocab[bisect.bisect_left(self._vocab, token)]
+    
+    def _expand(self, prefix):
+        """Indexed words that start with prefix"""
+        if self._vocab_stale:
+            self._vocab = sorted(self._postings)
+            self._vocab_stale = False
+        start = bisect.bisect_left(self._vocab, prefix)
+        end = bisect.bisect_left(self._vocab, prefix + chr(0x10FFFF), start)
+        return self._vocab[start:end]
+    
+    def _has_prefix(self, task_id, word):
+        return any(token.startswith(word) for token in self._tokens.get(task_id, ()))
+    
+    def search(self, query):
+        """Ids of the tasks that have a word starting with every query word"""
+        result = None
+        # Longer words are more selective, so they narrow the candidates first
+        for word in sorted(set(tokenize(query)), key=len, reverse=True):
+            if result is not None and len(result) < SEARCH_SCAN_LIMIT:
+                result = {task_id for task_id in result if self._has_prefix(task_id, word)}
+            else:
+                ids = set()
+                for token in self._expand(word):
+                    ids |= self._postings[token]
+                result = ids if result is None else result & ids
+            if not result:
+                break
+        return result or set()
+    
+    def matches(self, task_id, query):
+        return all(self._has_prefix(task_id, word) for word in tokenize(query))
+
+# ============= TAGS AND FILTER EXPRESSIONS =============
+# Tags are "#words" in the task text, e.g. "Restart the pager #oncall #urgent"
+TAG_PATTERN = re.compile(r"(?<![\w#])#([^\W\d][\w-]*)")
+TAG_NAME = re.compile(r"[^\W\d][\w-]*")
+
+def task_tags(text):
+    """The tags of a task text, casefolded and sorted, without duplicates"""
+    if "#" not in text:
+        return ()
+    return tuple(sorted({tag.casefold() for tag in TAG_PATTERN.findall(text)}))
+
+# Turns the digits of bin() into 0 and 1 bytes for itertools.compress
+BIT_DIGITS = bytes.maketrans(b"01", b"\x00\x01")
+
+def bitset_ids(mask):
+    """The positions of the bits set in an int bitset, in increasing order"""
+    if mask <= 0:
+        return []
+    flags = bin(mask)[:1:-1].encode("ascii").translate(BIT_DIGITS)
+    return list(itertools.compress(range(len(flags)), flags))
+
+class Bitset:
+    """Mutable set of small ints (TagIndex slots), bit i standing for i"""
+    
+    __slots__ = ("bits",)
+    
+    def __init__(self):
+        self.bits = bytearray()
+    
+    def add(self, slot):
+        byte = slot >> 3
+        if byte >= len(self.bits):
+            # Grow by half again, so slots handed out in order cost amortized O(1)
+            self.bits.extend(bytes(max(byte + 1 - len(self.bits), len(self.bits) // 2)))
+        self.bits[byte] |= 1 << (slot & 7)
+    
+    def discard(self, slot):
+        byte = slot >> 3
+        if byte < len(self.bits):
+            self.bits[byte] &= ~(1 << (slot & 7)) & 0xFF
+    
+    def mask(self):
+        """The set as one int, for bitwise filter evaluation"""
+        return int.from_bytes(self.bits, "little")
+
+class TagIndex:
+    """Bitset indexes over the tasks for evaluating filter expressions.
+    
+    Every task gets a dense slot, its bit in the bitsets; slots of removed
+    tasks are reused lowest first, so bitsets are as long as the list is
+    large, however sparse the ids. There is one Bitset per tag in use,
+    plus ones for every task, the completed tasks and each priority, all
+    kept up to date from store notifications at O(tags) per changed task.
+    A filter is then a handful of big-integer ANDs, ORs and NOTs over whole
+    bitsets, and ids() maps the result back to task ids.
+    """
+    
+    def __init__(self):
+        self._reset()
+    
+    def _reset(self):
+        self.all = Bitset()
+        self.completed = Bitset()
+        self.priorities = [Bitset() for _ in PRIORITY_NAMES]
+        self._tags = {}       # tag -> Bitset of its tasks
+        self._counts = {}     # tag -> number of tasks with it
+        self._task_tags = {}  # task id -> tags indexed for it
+        self._slots = {}      # task id -> slot
+        self._slot_ids = []   # slot -> task id, or None while free
+        self._free = []       # heap of free slots
+    
+    def attach(self, store):
+        store.subscribe(self.on_change)
+    
+    def detach(self, store):
+        store.unsubscribe(self.on_change)
+    
+    def on_change(self, event, tasks):
+        if event == "clear":
+            self._reset()
+            return
+        for task in tasks:
+            task_id = task.id
+            if event == "remove":
+                slot = self._slots.pop(task_id, None)
+                if slot is None:
+                    continue
+                self.all.discard(slot)
+                self.completed.discard(slot)
+                self.priorities[task.priority].discard(slot)
+                self._set_tags(task_id, slot, ())
+                self._slot_ids[slot] = None
+                heapq.heappush(self._free, slot)
+                continue
+            slot = self._slots.get(task_id)
+            if slot is None:
+                slot = self._take_slot(task_id)
+            self.all.add(slot)
+            if task.status:
+                self.completed.add(slot)
+            elif event == "update":
+                self.completed.discard(slot)
+            for priority, bits in enumerate(self.priorities):
+                if priority == task.priority:
+                    bits.add(slot)
+                elif event == "update":
+                    bits.discard(slot)
+            self._set_tags(task_id, slot, task_tags(task.text))
+    
+    def _take_slot(self, task_id):
+        if self._free:
+            slot = heapq.heappop(self._free)
+            self._slot_ids[slot] = task_id
+        else:
+            slot = len(self._slot_ids)
+            self._slot_ids.append(task_id)
+        self._slots[task_id] = slot
+        return slot
+    
+    def _set_tags(self, task_id, slot, tags):
+        old = self._task_tags.get(task_id, ())
+        if tags == old:
+            return
+        for tag in old:
+            if tag not in tags:
+                self._counts[tag] -= 1
+                if self._counts[tag]:
+                    self._tags[tag].discard(slot)
+                else:
+                    del self._counts[tag]
+                    del self._tags[tag]
+        for tag in tags:
+            if tag not in old:
+                bits = self._tags.get(tag)
+                if bits is None:
+                    bits = self._tags[tag] = Bitset()
+                    self._counts[tag] = 0
+                bits.add(slot)
+                self._counts[tag] += 1
+        if tags:
+            self._task_tags[task_id] = tags
+        else:
+            self._task_tags.pop(task_id, None)
+    
+    def tags(self):
+        """Tags in use with the number of tasks that have each, by name"""
+        return sorted(self._counts.items())
+    
+    def ids(self, mask):
+        """Ids of the tasks whose slots are set in a mask, in id order"""
+        slot_ids = self._slot_ids
+        ids = [slot_ids[slot] for slot in bitset_ids(mask)]
+        # Slots mostly follow the ids, so this sort is close to linear
+        ids.sort()
+        return ids
+    
+    def tag_mask(self, tag):
+        bits = self._tags.get(tag)
+        return bits.mask() if bits is not None else 0
+    
+    def term_mask(self, term):
+        """Bitset of the tasks a FILTER_TERMS word stands for"""
+        if term == "all":
+            return self.all.mask()
+        if term == "active":
+            return self.all.mask() & ~self.completed.mask()
+        if term in ("completed", "done"):
+            return self.completed.mask()
+        return self.priorities[PRIORITY_NAMES.index(term)].mask()
+
+# Words a filter expression understands besides tags
+FILTER_TERMS = {
+    "all": lambda task: True,
+    "active": lambda task: not task.status,
+    "completed": lambda task: task.status,
+    "done": lambda task: task.status,
+    "low": lambda task: task.priority == LOW,
+    "normal": lambda task: task.priority == NORMAL,
+    "high": lambda task: task.priority == HIGH,
+}
+
+FILTER_OPERATORS = ("AND", "OR", "NOT")
+
+class TaskFilter:
+    """A parsed filter expression such as "active AND urgent AND NOT #ops".
+    
+    Words are FILTER_TERMS or tags (written "#ops", or just "ops" when
+    that is not a term), combined with AND, OR, NOT and parentheses; words
+    side by side are ANDed and an empty expression means "all". mask() and
+    ids() evaluate the filter over a TagIndex with bitwise operations, and
+    the filter is also a predicate on single tasks, so views built from its
+    ids can follow later changes. text is the expression in a normal form,
+    the same for expressions that differ only in spelling. Raises
+    ValueError for expressions it cannot read.
+    """
+    
+    def __init__(self, expression):
+        self._tokens = re.findall(r"[()]|[^\s()]+", expression)
+        self._pos = 0
+        self.tree = self._parse_or() if self._tokens else ("term", "all")
+        if self._pos < len(self._tokens):
+            raise ValueError(f"unexpected {self._tokens[self._pos]!r}")
+        del self._tokens
+        self.text = self._format(self.tree)
+        self.uses_tags = "#" in self.text
+        self._predicate = self._compile(self.tree)
+    
+    def __call__(self, task):
+        return self._predicate(task, task_tags(task.text) if self.uses_tags else ())
+    
+    def mask(self, index):
+        """Bitset of the tasks in a TagIndex that match"""
+        return self._mask(self.tree, index)
+    
+    def ids(self, index):
+        """Ids of the tasks in a TagIndex that match, in id order"""
+        return index.ids(self.mask(index))
+    
+    # Parsing, lowest precedence first
+    def _peek(self):
+        return self._tokens[self._pos] if self._pos < len(self._tokens) else None
+    
+    def _next(self):
+        token = self._peek()
+        if token is None:
+            raise ValueError("the filter ends too early")
+        self._pos += 1
+        return token
+    
+    def _parse_or(self):
+        node = self._parse_and()
+        while (self._peek() or "").upper() == "OR":
+            self._pos += 1
+            node = ("or", node, self._parse_and())
+        return node
+    
+    def _parse_and(self):
+        node = self._parse_not()
+        while self._peek() not in (None, ")") and self._peek().upper() != "OR":
+            if self._peek().upper() == "AND":
+                self._pos += 1
+            node = ("and", node, self._parse_not())
+        return node
+    
+    def _parse_not(self):
+        if (self._peek() or "").upper() == "NOT":
+            self._pos += 1
+            return ("not", self._parse_not())
+        token = self._next()
+        if token == "(":
+            node = self._parse_or()
+            if self._next() != ")":
+                raise ValueError("missing )")
+            return node
+        if token == ")" or token.upper() in FILTER_OPERATORS:
+            raise ValueError(f"unexpected {token!r}")
+        word = token.casefold()
+        if word in FILTER_TERMS:
+            return ("term", word)
+        tag = word[1:] if word.startswith("#") else word
+        if not TAG_NAME.fullmatch(tag):
+            raise ValueError(f"{token!r} is not a tag or filter word")
+        return ("tag", tag)
+    
+    @classmethod
+    def _format(cls, node, parent=None):
+        kind = node[0]
+        if kind == "term":
+            return node[1]
+        if kind == "tag":
+            return "#" + node[1]
+        if kind == "not":
+            return "NOT " + cls._format(node[1], kind)
+        text = f"{cls._format(node[1], kind)} {kind.upper()} {cls._format(node[2], kind)}"
+        return f"({text})" if parent not in (None, kind) else text
+    
+    @classmethod
+    def _compile(cls, node):
+        """A (task, tags) -> bool function for a parsed node"""
+        kind = node[0]
+        if kind == "term":
+            matches = FILTER_TERMS[node[1]]
+            return lambda task, tags: matches(task)
+        if kind == "tag":
+            tag = node[1]
+            return lambda task, tags: tag in tags
+        if kind == "not":
+            inner = cls._compile(node[1])
+            return lambda task, tags: not inner(task, tags)
+        left, right = cls._compile(node[1]), cls._compile(node[2])
+        if kind == "and":
+            return lambda task, tags: left(task, tags) and right(task, tags)
+        return lambda task, tags: left(task, tags) or right(task, tags)
+    
+    @classmethod
+    def _mask(cls, node, index):
+        kind = node[0]
+        if kind == "term":
+            return index.term_mask(node[1])
+        if kind == "tag":
+            return index.tag_mask(node[1])
+        if kind == "not":
+            return index.all.mask() & ~cls._mask(node[1], index)
+        if kind == "and":
+            return cls._mask(node[1], index) & cls._mask(node[2], index)
+        return cls._mask(node[1], index) | cls._mask(node[2], index)
+
+# The filter buttons, as presets of the expression engine
+FILTERS = {name: TaskFilter(name) for name in ("all", "active", "completed")}
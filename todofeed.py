@@ -0,0 +1,103 @@
+"""Change feed follower that keeps several T@PP instances on one database in sync"""
+import time
+
+# Compact the feed at most this often (seconds)
+COMPACT_INTERVAL_S = 60
+
+class ChangeFeed:
+    """Applies the changes other processes log to a SQLiteStorage's feed.
+    
+    read() runs wherever the storage's connection is used (the serial
+    worker in the GUI) and fetches the entries after the last applied
+    sequence number; apply() then runs on the thread that owns the store.
+    A batch collapses to the latest state of each task it touches, and
+    only tasks that differ from it are patched, as updates, additions or
+    removals, so listeners see ordinary store events for just those
+    tasks. Our own entries take part too: they usually match already,
+    but after another process cleared the list they bring back what we
+    wrote since. Tasks with a change of ours still waiting to be written
+    are left alone: that write comes later in the feed and wins
+    everywhere, and so are tasks with a change taken for writing after
+    the read began (the read may predate it). Cost is proportional to the
+    number of changes, never to the size of the list.
+    """
+    
+    def __init__(self, storage, store):
+        self.storage = storage
+        self.store = store
+        self.seq = 0
+        self.compacted_at = time.time()
+        self.read_written = 0  # storage.written when the last read began
+    
+    def start(self):
+        """Begin following from the current end of the feed (before loading tasks)"""
+        self.seq = self.storage.register()
+        return self.seq
+    
+    def read(self):
+        """Entries since the last applied one, or None when a full reload is needed"""
+        storage = self.storage
+        self.read_written = storage.written
+        storage.acknowledge(self.seq)
+        if time.time() - self.compacted_at > COMPACT_INTERVAL_S:
+            self.compacted_at = time.time()
+            storage.compact()
+        return storage.read_feed(self.seq)
+    
+    def apply(self, entries):
+        """Patch the store with a batch of entries from read()"""
+        if not entries:
+            return
+        self.seq = entries[-1][0]
+        storage = self.storage
+        written = self.read_written
+        origin = storage.origin
+        latest = {}  # id -> row, or None once deleted
+        remote_clear = False
+        for _seq, entry_origin, op, task_id, *fields in entries:
+            if op == "clear":
+                # Everything before a clear is moot, whoever made it
+                latest.clear()
+                remote_clear = remote_clear or entry_origin != origin
+            else:
+                latest[task_id] = None if op == "delete" else fields
+        
+        store = self.store
+        store.remote = True
+        try:
+            if remote_clear:
+                self._clear(written)
+            removed, updated, added = [], [], []
+            for task_id, fields in sorted(latest.items()):
+                if storage.has_pending(task_id, written):
+                    continue
+                task = store.get(task_id)
+                if fields is None:
+                    if task is not None:
+                        removed.append(task_id)
+                    continue
+                text, status, priority, due = fields
+                row = (task_id, text, bool(status), priority, due)
+                if task is None:
+                    added.append(row)
+                elif (task.id,) + task.fields() != row:
+                    updated.append(row)
+            if removed:
+                store.remove_many(removed)
+            if updated:
+                store.update_many(updated)
+            if added:
+                store.restore(added)
+        finally:
+            store.remote = False
+        storage.forget_taken(written)
+    
+    def _clear(self, written):
+        """Another process cleared the list; keep only tasks with changes of ours to write"""
+        store = self.store
+        keep = [task.id for task in store if self.storage.has_pending(task.id, written)]
+        if not keep:
+            store.clear()
+        else:
+            keep = set(keep)
+            store.remove_many([task.id for task in store if task.id not in keep])
@@ -1,6 +1,41 @@
-﻿import tkinter as tk
-
-todos = []
+﻿import argparse
+import functools
+import os
+import sqlite3
+import sys
+import time
+import tkinter as tk
+from collections import deque
+from tkinter import filedialog
+from tkinter import font as tkfont
+
+from todocore import FILTERS, HIGH, LOW, NORMAL, PRIORITY_NAMES, SORTS, Task, TaskFilter, make_view, tokenize
+from todofeed import ChangeFeed
+from todoio import export_tasks, import_batches
+from todolists import DEFAULT_LIST, ListCache, TaskList, check_list_name, list_names, list_path
+from todometrics import Metrics
+from todoreminders import DueScheduler, editable_due, is_overdue, short_due, split_due
+from todostorage import FEED_PAGE_SIZE, FLUSH_DELAY_MS, LOAD_PAGE_SIZE, SQLiteStorage
+from todoworkers import WorkerPool
+
+# ============= TASK MODEL =============
+# The list on screen (see TASK LISTS). Its store, search and tag indexes,
+# undo journal (so deletes and clears need no confirmation) and filter
+# views are module globals too, which use_list() points at another list.
+current_list = TaskList(DEFAULT_LIST)
+store = current_list.store
+search_index = current_list.search_index
+tag_index = current_list.tag_index
+journal = current_list.journal
+
+# Views of the filters shown most recently, least recent first. Each is
+# built from the tag index the first time a filter is shown in a sort
+# order and kept up to date from then on, so switching back is a swap.
+filter_views = current_list.views  # (filter text, sort) -> TaskView or SortedTaskView
+FILTER_VIEW_CACHE_SIZE = 8
+
+# Scroll offset (in canvas pixels) last seen in each (filter, sort) view
+view_scroll = current_list.view_scroll
 
 # Enhanced Color scheme
 COLORS = {
@@ -24,18 +59,168 @@ COLORS = {
     "border": "#533483"
 }
 
-root = tk.Tk()
-root.title("T@PP - Todo App")
-root.geometry("550x700")
-root.configure(bg=COLORS["bg"])
-root.resizable(True, True)
+# Grid columns follow the canvas width: as many as fit at this width each
+MIN_COLUMN_WIDTH = 240
+MAX_COLUMNS = 6
+
+# Every card gets a fixed-height slot so the scroll region can be sized
+# without building the cards that are off screen
+CARD_HEIGHT = 160
+CARD_PADDING = 8
+ROW_HEIGHT = CARD_HEIGHT + 2 * CARD_PADDING
+
+# Extra rows built above and below the viewport so scrolling never shows gaps
+OVERSCAN_ROWS = 2
+
+# How cards are drawn: "widgets" builds each card from Frames, Labels and
+# Buttons in a canvas window, "canvas" draws it as a few canvas items.
+# Set with TAPP_RENDERER or --renderer.
+CARD_RENDERERS = ("widgets", "canvas")
+card_renderer = os.environ.get("TAPP_RENDERER", "widgets")
+
+# Priority indicator colors and badges (completed tasks use success)
+PRIORITY_COLORS = {LOW: COLORS["text_light"], NORMAL: COLORS["primary"], HIGH: COLORS["warning"]}
+PRIORITY_BADGES = {LOW: "▽ Low", NORMAL: "◇ Normal", HIGH: "▲ High"}
+
+SORT_LABELS = {"created": "⇅ Newest last", "priority": "⇅ Priority", "alpha": "⇅ A–Z"}
+
+# Maximum number of tasks, or None for no limit
+TASK_LIMIT = None
+
+# Longest a repaint may spend restyling cards before it yields to the
+# event loop and finishes on the next idle pass (None for no limit)
+FRAME_BUDGET_MS = 12
+
+# Search runs this long after the last keystroke
+SEARCH_DEBOUNCE_MS = 150
+
+TASK_FILETYPES = [("Task files", "*.jsonl *.csv"), ("JSON Lines", "*.jsonl"), ("CSV", "*.csv")]
+
+# Placeholder text
+placeholder_text = "What needs to be done?"
+search_placeholder = "🔍 Search"
+filter_placeholder = "🏷 Filter, e.g. active #urgent"
+
+# Tk objects are created by main(); the main page waits for switch_to_main()
+root = None
+main_page = None
+storage = None
+
+# Milliseconds from startup until the welcome screen was painted
+first_paint_ms = None
+
+# ============= DELEGATED EVENTS =============
+# Widgets get one of these bind tags instead of their own bindings; a
+# single bind_class handler per event looks up what the widget belongs to
+HOVER_TAG = "TappHover"
+CARD_TAGS = {
+    "hover": "TappCardHover",
+    "edit": "TappCardEdit",
+    "complete": "TappCardButton",
+    "delete": "TappCardButton",
+    "priority": "TappCardPriority",
+}
+# Ctrl/Shift-click anywhere on a card, its buttons included, selects it
+CARD_SELECT_TAG = "TappCardSelect"
+
+hover_colors = {}  # widget path -> (normal color, hover color)
+widget_cards = {}  # widget path -> (card, action)
+delegated_events_bound = False
+
+def add_bindtag(widget, tag):
+    if not delegated_events_bound:
+        bind_delegated_events(widget)
+    widget.bindtags(widget.bindtags() + (tag,))
+
+def create_hover_effect(button, normal_color, hover_color):
+    """Show hover_color while the pointer is over button"""
+    if str(button) not in hover_colors:
+        add_bindtag(button, HOVER_TAG)
+    hover_colors[str(button)] = (normal_color, hover_color)
+
+def register_card_widget(widget, card, action=None):
+    """Route hover, edit, button or selection events on widget to card"""
+    widget_cards[str(widget)] = (card, action)
+    if action in CARD_TAGS:
+        add_bindtag(widget, CARD_TAGS[action])
+    add_bindtag(widget, CARD_SELECT_TAG)
+
+def forget_widget(e):
+    hover_colors.pop(str(e.widget), None)
+    widget_cards.pop(str(e.widget), None)
+
+def on_hover(e, index):
+    colors = hover_colors.get(str(e.widget))
+    if colors is not None:
+        e.widget.configure(bg=colors[index])
+
+def card_for(e):
+    card, _action = widget_cards.get(str(e.widget), (None, None))
+    return card if card is not None and card.todo is not None else None
+
+def on_card_enter(e):
+    card = card_for(e)
+    if card is not None:
+        card.set_hover(True)
+
+def on_card_leave(e):
+    card = card_for(e)
+    if card is not None:
+        card.set_hover(False)
+
+def on_card_edit(e):
+    card = card_for(e)
+    if card is not None:
+        edit_todo(card.todo.id)
+
+def on_card_button(e):
+    card = card_for(e)
+    # Like a Button command, only fire when released over the button
+    if card is None or not (0 <= e.x < e.widget.winfo_width() and 0 <= e.y < e.widget.winfo_height()):
+        return
+    if widget_cards[str(e.widget)][1] == "complete":
+        mark_complete(card.todo.id)
+    else:
+        delete_todo(card.todo.id)
+
+def on_card_priority(e):
+    card = card_for(e)
+    if card is not None:
+        cycle_priority(card.todo.id)
+
+def on_card_select(e, extend):
+    card = card_for(e)
+    if card is not None:
+        select_task(card.todo.id, extend)
+
+def bind_delegated_events(widget):
+    global delegated_events_bound
+    delegated_events_bound = True
+    widget.bind_class(HOVER_TAG, "<Enter>", lambda e: on_hover(e, 1))
+    widget.bind_class(HOVER_TAG, "<Leave>", lambda e: on_hover(e, 0))
+    widget.bind_class(CARD_TAGS["hover"], "<Enter>", on_card_enter)
+    widget.bind_class(CARD_TAGS["hover"], "<Leave>", on_card_leave)
+    widget.bind_class(CARD_TAGS["edit"], "<Double-Button-1>", on_card_edit)
+    widget.bind_class(CARD_TAGS["complete"], "<ButtonRelease-1>", on_card_button)
+    # Modifier clicks select instead of pressing the card buttons
+    widget.bind_class(CARD_TAGS["complete"], "<Control-ButtonRelease-1>", lambda e: None)
+    widget.bind_class(CARD_TAGS["complete"], "<Shift-ButtonRelease-1>", lambda e: None)
+    widget.bind_class(CARD_TAGS["priority"], "<Button-1>", on_card_priority)
+    widget.bind_class(CARD_TAGS["priority"], "<Control-Button-1>", lambda e: None)
+    widget.bind_class(CARD_TAGS["priority"], "<Shift-Button-1>", lambda e: None)
+    widget.bind_class(CARD_SELECT_TAG, "<Control-Button-1>", lambda e: on_card_select(e, False))
+    widget.bind_class(CARD_SELECT_TAG, "<Shift-Button-1>", lambda e: on_card_select(e, True))
+    for tag in {HOVER_TAG, CARD_SELECT_TAG, *CARD_TAGS.values()}:
+        widget.bind_class(tag, "<Destroy>", forget_widget, add="+")
 
 # ============= CUSTOM POPUP/DIALOG SYSTEM =============
 class CustomDialog:
     """Custom styled dialog box to replace default messagebox"""
     
-    def __init__(self, parent, title, message, dialog_type="info", buttons=None):
+    def __init__(self, parent, title, message, dialog_type="info", buttons=None, entry_text=None):
+        started = time.perf_counter()
         self.result = None
+        self.entry = None
         self.dialog = tk.Toplevel(parent)
         self.dialog.title(title)
         self.dialog.configure(bg=COLORS["bg_light"])
@@ -89,6 +274,18 @@ class CustomDialog:
                              wraplength=320, justify="center")
         msg_label.pack()
         
+        # Optional text input (the confirm button returns its contents)
+        if entry_text is not None:
+            entry_border = tk.Frame(main_frame, bg=COLORS["border"], padx=2, pady=2)
+            entry_border.pack(fill="x", padx=30)
+            self.entry = tk.Entry(entry_border, font=("Arial", 11), relief=tk.FLAT,
+                                  bg=COLORS["secondary"], fg=COLORS["text"],
+                                  insertbackground=COLORS["text"])
+            self.entry.pack(fill="x", ipady=6, padx=6)
+            self.entry.insert(0, entry_text)
+            self.entry.select_range(0, tk.END)
+            self.entry.bind("<Return>", lambda e: self._on_button(True))
+        
         # Buttons - placed at BOTTOM
         btn_frame = tk.Frame(main_frame, bg=COLORS["bg_light"], pady=20)
         btn_frame.pack(side=tk.BOTTOM, fill="x")
@@ -109,23 +306,24 @@ class CustomDialog:
                            relief=tk.FLAT, cursor="hand2", width=12, pady=8,
                            command=lambda v=btn_value: self._on_button(v))
             btn.pack(side=tk.LEFT, padx=15, expand=True)
-            
-            # Hover effects with proper closure
-            original_color = btn_color
-            btn.bind("<Enter>", lambda e, b=btn: b.configure(bg=COLORS["primary_hover"]))
-            btn.bind("<Leave>", lambda e, b=btn, c=original_color: b.configure(bg=c))
+            create_hover_effect(btn, btn_color, COLORS["primary_hover"])
         
         # Handle window close
         self.dialog.protocol("WM_DELETE_WINDOW", lambda: self._on_button(False))
         
         # Focus dialog
-        self.dialog.focus_set()
+        (self.entry or self.dialog).focus_set()
+        
+        if metrics.enabled:
+            metrics.observe("dialog", (time.perf_counter() - started) * 1000)
         
         # Wait for dialog to close
         self.dialog.wait_window()
     
     def _on_button(self, value):
         self.result = value
+        if value is True and self.entry is not None:
+            self.result = self.entry.get()
         self.dialog.destroy()
 
 def show_info(title, message):
@@ -150,75 +348,180 @@ def show_confirm(title, message):
                          buttons=[("Yes", True), ("No", False)])
     return dialog.result
 
+def show_prompt(title, message, text=""):
+    """Show a text input dialog and return the entered text, or None"""
+    dialog = CustomDialog(root, title, message, "info", entry_text=text,
+                          buttons=[("Save", True), ("Cancel", False)])
+    return dialog.result if isinstance(dialog.result, str) else None
+
 # ============= TOAST NOTIFICATION SYSTEM =============
-class Toast:
-    """Floating toast notification"""
+TOAST_STYLES = {
+    "info": ("primary", "ℹ️"),
+    "success": ("success", "✓"),
+    "warning": ("warning", "⚠"),
+    "error": ("danger", "✗")
+}
+
+# Slide animation: y offsets, pixels per frame and frame interval
+TOAST_HIDDEN_Y = -50
+TOAST_SHOWN_Y = 10
+TOAST_STEP = 5
+TOAST_FRAME_MS = 15
+
+# While other messages wait, the one on screen stays at most this long
+TOAST_QUEUED_MS = 700
+
+# Different messages waiting beyond this drop the oldest one
+TOAST_QUEUE_LIMIT = 5
+
+class ToastManager:
+    """One reused toast widget showing queued messages in turn, merging repeats"""
     
-    def __init__(self, parent, message, toast_type="info", duration=2500):
+    def __init__(self, parent):
         self.parent = parent
+        self.queue = deque()  # [message, toast_type, duration, count, action]
+        self.current = None
+        self.hiding = False
+        self.job = None
+        self.y = TOAST_HIDDEN_Y
+        self.shown_at = 0
+        self.deadline = 0
         
-        colors = {
-            "info": COLORS["primary"],
-            "success": COLORS["success"],
-            "warning": COLORS["warning"],
-            "error": COLORS["danger"]
-        }
-        icons = {
-            "info": "ℹ️",
-            "success": "✓",
-            "warning": "⚠",
-            "error": "✗"
-        }
-        
-        bg_color = colors.get(toast_type, colors["info"])
-        icon = icons.get(toast_type, icons["info"])
-        
-        # Create toast frame
-        self.toast = tk.Frame(parent, bg=bg_color, padx=15, pady=10)
+        self.toast = tk.Frame(parent, padx=15, pady=10)
         
         # Icon
-        tk.Label(self.toast, text=icon, font=("Arial", 12, "bold"),
-                bg=bg_color, fg="white").pack(side=tk.LEFT, padx=(0, 10))
+        self.icon = tk.Label(self.toast, font=("Arial", 12, "bold"), fg="white")
+        self.icon.pack(side=tk.LEFT, padx=(0, 10))
         
         # Message
-        tk.Label(self.toast, text=message, font=("Arial", 10),
-                bg=bg_color, fg="white").pack(side=tk.LEFT)
+        self.message = tk.Label(self.toast, font=("Arial", 10), fg="white")
+        self.message.pack(side=tk.LEFT)
         
         # Close button
-        close_btn = tk.Label(self.toast, text="×", font=("Arial", 14, "bold"),
-                            bg=bg_color, fg="white", cursor="hand2")
-        close_btn.pack(side=tk.RIGHT, padx=(10, 0))
-        close_btn.bind("<Button-1>", lambda e: self.hide())
+        self.close_btn = tk.Label(self.toast, text="×", font=("Arial", 14, "bold"),
+                                  fg="white", cursor="hand2")
+        self.close_btn.pack(side=tk.RIGHT, padx=(10, 0))
+        self.close_btn.bind("<Button-1>", lambda e: self.hide())
         
-        # Position at top center
-        self.toast.place(relx=0.5, y=-50, anchor="n")
-        
-        # Animate in
-        self._animate_in()
-        
-        # Auto hide after duration
-        self.parent.after(duration, self.hide)
+        # Optional action such as "Undo", packed only when a message has one
+        self.action_btn = tk.Label(self.toast, font=("Arial", 10, "bold underline"),
+                                   fg="white", cursor="hand2")
+        self.action_btn.bind("<Button-1>", lambda e: self._on_action())
     
-    def _animate_in(self, y=-50):
-        if y < 10:
-            y += 5
-            self.toast.place(relx=0.5, y=y, anchor="n")
-            self.parent.after(15, lambda: self._animate_in(y))
+    def show(self, message, toast_type="info", duration=2500, action=None):
+        """Queue a message; action is an optional (label, callback) button"""
+        key = [message, toast_type]
+        if action is None:
+            if self.current is not None and not self.hiding and self.current[:2] == key and self.current[4] is None:
+                self.current[3] += 1
+                self.deadline = time.perf_counter() + duration / 1000
+                self._update_message()
+                return
+            for item in self.queue:
+                if item[:2] == key and item[4] is None:
+                    item[3] += 1
+                    return
+        else:
+            self.queue = deque(item for item in self.queue if item[4] is None)
+            if self.current is not None and self.current[4] is not None:
+                self.hide()
+        self.queue.append([message, toast_type, duration, 1, action])
+        if len(self.queue) > TOAST_QUEUE_LIMIT:
+            self.queue.popleft()
+        if self.current is None:
+            self._next()
+        else:
+            # Wake the timer so the toast on screen makes way sooner
+            self._arm(0)
     
     def hide(self):
-        try:
-            self.toast.destroy()
-        except:
-            pass
+        if self.current is not None and not self.hiding:
+            self.hiding = True
+            self._arm(0)
+    
+    def _next(self):
+        if not self.queue:
+            self.current = None
+            return
+        self.current = self.queue.popleft()
+        _message, toast_type, duration, _count, _action = self.current
+        color_key, icon = TOAST_STYLES.get(toast_type, TOAST_STYLES["info"])
+        bg_color = COLORS[color_key]
+        for widget in (self.toast, self.icon, self.message, self.close_btn, self.action_btn):
+            widget.configure(bg=bg_color)
+        self.icon.configure(text=icon)
+        self._update_message()
+        
+        self.hiding = False
+        self.y = TOAST_HIDDEN_Y
+        self.toast.place(relx=0.5, y=self.y, anchor="n")
+        self.toast.lift()
+        self.shown_at = time.perf_counter()
+        self.deadline = self.shown_at + duration / 1000
+        self._arm(0)
+    
+    def _update_message(self):
+        message, _type, _duration, count, action = self.current
+        self.message.configure(text=f"{message} ×{count}" if count > 1 else message)
+        if action is None:
+            self.action_btn.pack_forget()
+        else:
+            self.action_btn.configure(text=action[0])
+            self.action_btn.pack(side=tk.RIGHT, padx=(15, 0))
+    
+    def _on_action(self):
+        if self.current is not None and self.current[4] is not None and not self.hiding:
+            callback = self.current[4][1]
+            self.hide()
+            callback()
+    
+    def _arm(self, delay_ms):
+        if self.job is not None:
+            self.parent.after_cancel(self.job)
+        self.job = self.parent.after(delay_ms, self._tick)
+    
+    def _tick(self):
+        """Advance the slide animation or the hide countdown by one step"""
+        self.job = None
+        target = TOAST_HIDDEN_Y if self.hiding else TOAST_SHOWN_Y
+        if self.y != target:
+            if self.y < target:
+                self.y = min(self.y + TOAST_STEP, target)
+            else:
+                self.y = max(self.y - TOAST_STEP, target)
+            self.toast.place(relx=0.5, y=self.y, anchor="n")
+            self._arm(TOAST_FRAME_MS)
+            return
+        if self.hiding:
+            self.toast.place_forget()
+            self._next()
+            return
+        deadline = self.deadline
+        if self.queue:
+            deadline = min(deadline, self.shown_at + TOAST_QUEUED_MS / 1000)
+        remaining = deadline - time.perf_counter()
+        if remaining > 0:
+            self._arm(int(remaining * 1000) + 1)
+        else:
+            self.hiding = True
+            self._arm(TOAST_FRAME_MS)
+
+toasts = None
 
-def show_toast(message, toast_type="info", duration=2500):
-    """Show a toast notification"""
-    Toast(root, message, toast_type, duration)
+def show_toast(message, toast_type="info", duration=2500, action=None):
+    """Show a toast notification, optionally with an (label, callback) action"""
+    global toasts
+    if toasts is None:
+        toasts = ToastManager(root)
+    toasts.show(message, toast_type, duration, action)
 
 # ============= PAGE SWITCHER =============
 def switch_to_main():
     welcome.place_forget()
     welcome_btns.pack_forget()
+    # The main page is only built the first time it is needed
+    if main_page is None:
+        build_main_page()
     main_page.pack(fill="both", expand=True)
     show_toast("Welcome! Let's get productive! 🚀", "success")
 
@@ -228,373 +531,1274 @@ def switch_to_welcome():
     welcome_btns.pack(side=tk.BOTTOM)
 
 # ============= WELCOME PAGE =============
-welcome = tk.Frame(root, bg=COLORS["bg"])
-
-# Animated logo frame
-logo_frame = tk.Frame(welcome, bg=COLORS["bg"])
-logo_frame.pack(pady=20)
-
-# App icon
-app_icon = tk.Label(logo_frame, text="📝", font=("Segoe UI Emoji", 48),
-                    bg=COLORS["bg"])
-app_icon.pack()
-
-# App title with gradient effect simulation
-title_label = tk.Label(welcome, text="T@PP", font=("Arial", 36, "bold"), 
-                       bg=COLORS["bg"], fg=COLORS["primary"])
-title_label.pack()
-
-subtitle = tk.Label(welcome, text="Your Personal Task Manager", 
-                    font=("Arial", 12), bg=COLORS["bg"], fg=COLORS["accent"])
-subtitle.pack(pady=(5, 0))
-
-tagline = tk.Label(welcome, text="Part of the Curiosity Program", 
-                   font=("Arial", 10, "italic"), bg=COLORS["bg"], fg=COLORS["text_light"])
-tagline.pack(pady=(10, 0))
-
-# Feature highlights
-features_frame = tk.Frame(welcome, bg=COLORS["bg"], pady=30)
-features_frame.pack()
-
-features = [
-    ("✓", "Organize your tasks"),
-    ("✓", "Track your progress"),
-    ("✓", "Stay productive")
-]
-
-for icon, text in features:
-    feature_row = tk.Frame(features_frame, bg=COLORS["bg"])
-    feature_row.pack(anchor="w", pady=3)
-    tk.Label(feature_row, text=icon, font=("Arial", 10), 
-             bg=COLORS["bg"], fg=COLORS["success"]).pack(side=tk.LEFT)
-    tk.Label(feature_row, text=f"  {text}", font=("Arial", 10), 
-             bg=COLORS["bg"], fg=COLORS["text_light"]).pack(side=tk.LEFT)
-
-welcome.place(relx=0.5, rely=0.4, anchor=tk.CENTER)
-
-# Welcome buttons
-welcome_btns = tk.Frame(root, pady=30, bg=COLORS["bg"])
-welcome_btns.pack(side=tk.BOTTOM)
-
-btnsinit = tk.Button(welcome_btns, text="🚀  Get Started", 
-                     height=2, width=25, command=switch_to_main,
-                     bg=COLORS["primary"], fg="white", font=("Arial", 12, "bold"),
-                     relief=tk.FLAT, cursor="hand2", activebackground=COLORS["primary_hover"])
-btnsinit.pack()
-
-# Hover animation for start button
-def on_start_hover(e):
-    btnsinit.configure(bg=COLORS["primary_hover"])
-def on_start_leave(e):
-    btnsinit.configure(bg=COLORS["primary"])
-btnsinit.bind("<Enter>", on_start_hover)
-btnsinit.bind("<Leave>", on_start_leave)
-
-# Version label
-version_label = tk.Label(welcome_btns, text="v2.0", font=("Arial", 8),
-                        bg=COLORS["bg"], fg=COLORS["text_light"])
-version_label.pack(pady=(15, 0))
+def build_welcome_page():
+    global welcome, welcome_btns, btnsinit
+    
+    welcome = tk.Frame(root, bg=COLORS["bg"])
+    
+    # Animated logo frame
+    logo_frame = tk.Frame(welcome, bg=COLORS["bg"])
+    logo_frame.pack(pady=20)
+    
+    # App icon
+    app_icon = tk.Label(logo_frame, text="📝", font=("Segoe UI Emoji", 48),
+                        bg=COLORS["bg"])
+    app_icon.pack()
+    
+    # App title with gradient effect simulation
+    title_label = tk.Label(welcome, text="T@PP", font=("Arial", 36, "bold"), 
+                           bg=COLORS["bg"], fg=COLORS["primary"])
+    title_label.pack()
+    
+    subtitle = tk.Label(welcome, text="Your Personal Task Manager", 
+                        font=("Arial", 12), bg=COLORS["bg"], fg=COLORS["accent"])
+    subtitle.pack(pady=(5, 0))
+    
+    tagline = tk.Label(welcome, text="Part of the Curiosity Program", 
+                       font=("Arial", 10, "italic"), bg=COLORS["bg"], fg=COLORS["text_light"])
+    tagline.pack(pady=(10, 0))
+    
+    # Feature highlights
+    features_frame = tk.Frame(welcome, bg=COLORS["bg"], pady=30)
+    features_frame.pack()
+    
+    features = [
+        ("✓", "Organize your tasks"),
+        ("✓", "Track your progress"),
+        ("✓", "Stay productive")
+    ]
+    
+    for icon, text in features:
+        feature_row = tk.Frame(features_frame, bg=COLORS["bg"])
+        feature_row.pack(anchor="w", pady=3)
+        tk.Label(feature_row, text=icon, font=("Arial", 10), 
+                 bg=COLORS["bg"], fg=COLORS["success"]).pack(side=tk.LEFT)
+        tk.Label(feature_row, text=f"  {text}", font=("Arial", 10), 
+                 bg=COLORS["bg"], fg=COLORS["text_light"]).pack(side=tk.LEFT)
+    
+    welcome.place(relx=0.5, rely=0.4, anchor=tk.CENTER)
+    
+    # Welcome buttons
+    welcome_btns = tk.Frame(root, pady=30, bg=COLORS["bg"])
+    welcome_btns.pack(side=tk.BOTTOM)
+    
+    btnsinit = tk.Button(welcome_btns, text="🚀  Get Started", 
+                         height=2, width=25, command=switch_to_main,
+                         bg=COLORS["primary"], fg="white", font=("Arial", 12, "bold"),
+                         relief=tk.FLAT, cursor="hand2", activebackground=COLORS["primary_hover"])
+    btnsinit.pack()
+    
+    # Hover animation for start button
+    create_hover_effect(btnsinit, COLORS["primary"], COLORS["primary_hover"])
+    
+    # Version label
+    version_label = tk.Label(welcome_btns, text="v2.0", font=("Arial", 8),
+                            bg=COLORS["bg"], fg=COLORS["text_light"])
+    version_label.pack(pady=(15, 0))
 
 # ============= MAIN PAGE =============
-main_page = tk.Frame(root, bg=COLORS["bg"])
-
-# Header section with stats
-header_frame = tk.Frame(main_page, bg=COLORS["bg_light"], pady=15)
-header_frame.pack(fill="x")
-
-header_inner = tk.Frame(header_frame, bg=COLORS["bg_light"])
-header_inner.pack(fill="x", padx=20)
-
-# Left side - title
-title_section = tk.Frame(header_inner, bg=COLORS["bg_light"])
-title_section.pack(side=tk.LEFT)
-
-tk.Label(title_section, text="📋", font=("Segoe UI Emoji", 20),
-         bg=COLORS["bg_light"]).pack(side=tk.LEFT)
-tk.Label(title_section, text=" My Tasks", font=("Arial", 18, "bold"),
-         bg=COLORS["bg_light"], fg=COLORS["text"]).pack(side=tk.LEFT)
-
-# Right side - stats
-stats_section = tk.Frame(header_inner, bg=COLORS["bg_light"])
-stats_section.pack(side=tk.RIGHT)
-
-td_total = tk.Label(stats_section, text="0 tasks", 
-                    font=("Arial", 11), bg=COLORS["bg_light"], fg=COLORS["text_light"])
-td_total.pack(side=tk.LEFT, padx=10)
-
-td_complete = tk.Label(stats_section, text="0 done", 
-                       font=("Arial", 11), bg=COLORS["bg_light"], fg=COLORS["success"])
-td_complete.pack(side=tk.LEFT)
-
-# Progress bar frame
-progress_frame = tk.Frame(main_page, bg=COLORS["bg"], pady=10, padx=20)
-progress_frame.pack(fill="x")
+def view_key():
+    return current_filter.get(), current_sort.get()
+
+def get_view(task_filter, sort):
+    """The live view of a filter in a sort order, built on first use"""
+    key = (task_filter.text, sort)
+    view = filter_views.pop(key, None)
+    if view is None:
+        view = make_view(store, task_filter, sort, matched=task_filter.ids(tag_index))
+        view.attach()
+    filter_views[key] = view
+    while len(filter_views) > FILTER_VIEW_CACHE_SIZE:
+        filter_views.pop(next(iter(filter_views))).detach()
+    return view
+
+def set_filter(expression):
+    """Show the tasks matching a filter expression; the buttons are presets"""
+    try:
+        task_filter = TaskFilter(expression)
+    except ValueError as e:
+        show_warning("Invalid Filter", f"Could not read the filter: {e}")
+        return
+    if not search_query:
+        view_scroll[view_key()] = canvas.canvasy(0)
+    current_filter.set(task_filter.text)
+    refresh_todos()
+    show_filter_text()
+    # Update button styles
+    for btn, preset in filter_buttons:
+        if FILTERS[preset].text == task_filter.text:
+            btn.configure(bg=COLORS["primary"], fg="white")
+        else:
+            btn.configure(bg=COLORS["secondary"], fg=COLORS["text_light"])
 
-progress_label = tk.Label(progress_frame, text="Progress: 0%", font=("Arial", 9),
-                          bg=COLORS["bg"], fg=COLORS["text_light"])
-progress_label.pack(anchor="w")
+# Filter box: Enter applies the expression, Escape goes back to all tasks
+def show_filter_text():
+    text = current_filter.get()
+    filter_entry.delete(0, tk.END)
+    if text == "all" and root.focus_get() is not filter_entry:
+        filter_entry.insert(0, filter_placeholder)
+        filter_entry.configure(fg=COLORS["text_light"])
+    else:
+        filter_entry.insert(0, text)
+        filter_entry.configure(fg=COLORS["text"])
+
+def on_filter_return(e):
+    text = filter_entry.get()
+    set_filter("" if text == filter_placeholder else text)
+
+def on_filter_escape(e):
+    set_filter("all")
+    canvas.focus_set()
+
+def on_filter_focus_in(e):
+    if filter_entry.get() == filter_placeholder:
+        filter_entry.delete(0, tk.END)
+        filter_entry.configure(fg=COLORS["text"])
+
+def on_filter_focus_out(e):
+    # Typed but not applied: show the filter in effect again
+    show_filter_text()
+
+def cycle_sort():
+    """Switch to the next sort order"""
+    if not search_query:
+        view_scroll[view_key()] = canvas.canvasy(0)
+    sort = SORTS[(SORTS.index(current_sort.get()) + 1) % len(SORTS)]
+    current_sort.set(sort)
+    sort_button.configure(text=SORT_LABELS[sort])
+    refresh_todos()
 
-progress_bg = tk.Frame(progress_frame, bg=COLORS["secondary"], height=8)
-progress_bg.pack(fill="x", pady=(5, 0))
+# Import / export
+def read_import(path, storage, report):
+    """Parse an import file on a worker thread, reporting each batch of rows.
+    
+    The rows get their new ids here too, so leasing them never waits on
+    the database from the Tk thread.
+    """
+    skipped = 0
+    for rows, skipped, done in import_batches(path):
+        if rows:
+            ids = storage.lease_ids(len(rows), refill=False)
+            rows = [(task_id,) + row for task_id, row in zip(ids, rows)]
+        report((rows, done))
+    return skipped
+
+def import_file():
+    path = filedialog.askopenfilename(parent=root, title="Import Tasks", filetypes=TASK_FILETYPES)
+    if not path:
+        return
+    added = 0
+    task_list = current_list
+    
+    # The file is parsed in the background; each batch is added here, to
+    # the list it was imported into even if another one is shown by now
+    def add_batch(progress):
+        nonlocal added
+        rows, done = progress
+        if rows and task_list.storage is not None:
+            task_list.store.restore(rows)
+            # The worker only took leased ids; a new block is queued from here
+            task_list.storage.prefetch_ids()
+            added += len(rows)
+        show_job_progress("Importing", done)
+    
+    def finished(skipped):
+        end_job_progress()
+        message = f"Imported {added} task{'s' if added != 1 else ''}"
+        if skipped:
+            message += f" ({skipped} skipped)"
+        show_toast(message, "success" if added else "warning")
+        todoLimiter()
+    
+    def failed(e):
+        end_job_progress()
+        show_error("Import Failed", f"Could not read the file:\n{e}")
+    
+    run_in_background(read_import, path, task_list.storage,
+                      on_progress=add_batch, on_done=finished, on_error=failed)
+
+def export_file():
+    path = filedialog.asksaveasfilename(parent=root, title="Export Tasks", defaultextension=".jsonl",
+                                        filetypes=TASK_FILETYPES)
+    if not path:
+        return
+    
+    def finished(count):
+        end_job_progress()
+        show_toast(f"Exported {count} task{'s' if count != 1 else ''}", "success")
+    
+    def failed(e):
+        end_job_progress()
+        show_error("Export Failed", f"Could not write the file:\n{e}")
+    
+    # Written from the database on the serial worker, after the pending
+    # writes, so the file is one consistent state however the list changes
+    storage.flush()
+    run_in_background(export_saved, storage, path, serial=True,
+                      on_progress=lambda done: show_job_progress("Exporting", done),
+                      on_done=finished, on_error=failed)
+
+def export_saved(list_storage, path, report):
+    """Stream a list's saved tasks into an export file"""
+    total, rows = list_storage.saved_rows()
+    tasks = (Task(task_id, text, bool(status), priority, due) for task_id, text, status, priority, due in rows)
+    return export_tasks(tasks, path, report, total)
+
+# Search box
+search_query = ""
+search_job = None
+
+def run_search():
+    global search_job, search_query
+    search_job = None
+    text = search_entry.get()
+    query = "" if text == search_placeholder else " ".join(tokenize(text))
+    if query != search_query:
+        if not search_query:
+            view_scroll[view_key()] = canvas.canvasy(0)
+        search_query = query
+        refresh_todos()
 
-progress_bar = tk.Frame(progress_bg, bg=COLORS["success"], height=8, width=0)
-progress_bar.place(x=0, y=0, relheight=1)
+def on_search_key(e):
+    """Wait for a pause in typing before searching"""
+    global search_job
+    if search_job is not None:
+        root.after_cancel(search_job)
+    search_job = root.after(SEARCH_DEBOUNCE_MS, run_search)
 
-# Filter buttons
-filter_frame = tk.Frame(main_page, bg=COLORS["bg"], pady=10)
-filter_frame.pack(fill="x", padx=20)
+def on_search_escape(e):
+    search_entry.delete(0, tk.END)
+    on_search_key(e)
 
-current_filter = tk.StringVar(value="all")
+def on_search_focus_in(e):
+    if search_entry.get() == search_placeholder:
+        search_entry.delete(0, tk.END)
+        search_entry.configure(fg=COLORS["text"])
 
-def set_filter(filter_type):
-    current_filter.set(filter_type)
-    refresh_todos()
-    # Update button styles
-    for btn, f_type in filter_buttons:
-        if f_type == filter_type:
-            btn.configure(bg=COLORS["primary"], fg="white")
-        else:
-            btn.configure(bg=COLORS["secondary"], fg=COLORS["text_light"])
+def on_search_focus_out(e):
+    if not search_entry.get():
+        search_entry.insert(0, search_placeholder)
+        search_entry.configure(fg=COLORS["text_light"])
 
-filter_buttons = []
-for text, f_type in [("All", "all"), ("Active", "active"), ("Completed", "completed")]:
-    btn = tk.Button(filter_frame, text=text, font=("Arial", 9),
-                   bg=COLORS["primary"] if f_type == "all" else COLORS["secondary"],
-                   fg="white" if f_type == "all" else COLORS["text_light"],
-                   relief=tk.FLAT, cursor="hand2", width=10, pady=3,
-                   command=lambda t=f_type: set_filter(t))
-    btn.pack(side=tk.LEFT, padx=(0, 5))
-    filter_buttons.append((btn, f_type))
-
-# Scrollable todo display area
-canvas_frame = tk.Frame(main_page, bg=COLORS["bg"])
-canvas_frame.pack(fill="both", expand=True, padx=10)
-
-canvas = tk.Canvas(canvas_frame, bg=COLORS["bg"], highlightthickness=0)
-scrollbar = tk.Scrollbar(canvas_frame, orient="vertical", command=canvas.yview,
-                         bg=COLORS["bg_light"], troughcolor=COLORS["bg"])
-todo_display = tk.Frame(canvas, bg=COLORS["bg"])
-
-todo_display.bind(
-    "<Configure>",
-    lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-)
-
-canvas.create_window((0, 0), window=todo_display, anchor="nw")
-canvas.configure(yscrollcommand=scrollbar.set)
+# Rebuild the visible rows whenever the view moves (scrollbar, wheel or resize)
+def on_canvas_yview(first, last):
+    scrollbar.set(first, last)
+    todo_grid.render()
 
 # Mouse wheel scrolling
 def on_mousewheel(event):
     canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-canvas.bind_all("<MouseWheel>", on_mousewheel)
 
-canvas.pack(side="left", fill="both", expand=True)
-scrollbar.pack(side="right", fill="y")
+def on_canvas_resize(event):
+    canvas.coords(empty_window, event.width // 2, 0)
+    todo_grid.relayout()
 
-# Empty state message
-empty_label = tk.Label(todo_display, text="🎯\n\nNo tasks yet!\nAdd your first task below.",
-                       font=("Arial", 12), bg=COLORS["bg"], fg=COLORS["text_light"],
-                       justify="center")
-
-# Grid columns configuration
-GRID_COLUMNS = 2
+def build_main_page():
+    global main_page, list_button, list_menu, list_choice, td_total, td_complete, progress_label, progress_bg, progress_bar
+    global current_filter, current_sort, filter_buttons, sort_button, filter_entry, search_entry
+    global canvas, scrollbar, renderer
+    global empty_label, empty_window, todo_grid
+    
+    main_page = tk.Frame(root, bg=COLORS["bg"])
+    
+    # Header section with stats
+    header_frame = tk.Frame(main_page, bg=COLORS["bg_light"], pady=15)
+    header_frame.pack(fill="x")
+    
+    header_inner = tk.Frame(header_frame, bg=COLORS["bg_light"])
+    header_inner.pack(fill="x", padx=20)
+    
+    # Left side - title
+    title_section = tk.Frame(header_inner, bg=COLORS["bg_light"])
+    title_section.pack(side=tk.LEFT)
+    
+    tk.Label(title_section, text="📋", font=("Segoe UI Emoji", 20),
+             bg=COLORS["bg_light"]).pack(side=tk.LEFT)
+    # The list on screen; click to switch to another one or start a new one
+    list_choice = tk.StringVar(value=current_list.name)
+    list_button = tk.Menubutton(title_section, text=f" {current_list.name} ▾", font=("Arial", 18, "bold"),
+                                bg=COLORS["bg_light"], fg=COLORS["text"], relief=tk.FLAT, cursor="hand2",
+                                activebackground=COLORS["bg_light"], activeforeground=COLORS["accent"])
+    list_button.pack(side=tk.LEFT)
+    list_menu = tk.Menu(list_button, tearoff=0, postcommand=build_list_menu,
+                        bg=COLORS["bg_light"], fg=COLORS["text"],
+                        activebackground=COLORS["primary"], activeforeground="white")
+    list_button.configure(menu=list_menu)
+    
+    # Right side - stats
+    stats_section = tk.Frame(header_inner, bg=COLORS["bg_light"])
+    stats_section.pack(side=tk.RIGHT)
+    
+    td_total = tk.Label(stats_section, text="0 tasks", 
+                        font=("Arial", 11), bg=COLORS["bg_light"], fg=COLORS["text_light"])
+    td_total.pack(side=tk.LEFT, padx=10)
+    
+    td_complete = tk.Label(stats_section, text="0 done", 
+                           font=("Arial", 11), bg=COLORS["bg_light"], fg=COLORS["success"])
+    td_complete.pack(side=tk.LEFT)
+    
+    # Progress bar frame
+    progress_frame = tk.Frame(main_page, bg=COLORS["bg"], pady=10, padx=20)
+    progress_frame.pack(fill="x")
+    
+    progress_label = tk.Label(progress_frame, text="Progress: 0%", font=("Arial", 9),
+                              bg=COLORS["bg"], fg=COLORS["text_light"])
+    progress_label.pack(anchor="w")
+    
+    progress_bg = tk.Frame(progress_frame, bg=COLORS["secondary"], height=8)
+    progress_bg.pack(fill="x", pady=(5, 0))
+    # The bar width depends on the track width, so redo it when that changes
+    progress_bg.bind("<Configure>", lambda e: renderer.mark("progress"))
+    
+    progress_bar = tk.Frame(progress_bg, bg=COLORS["success"], height=8, width=0)
+    progress_bar.place(x=0, y=0, relheight=1)
+    
+    # Filter buttons
+    filter_frame = tk.Frame(main_page, bg=COLORS["bg"], pady=10)
+    filter_frame.pack(fill="x", padx=20)
+    
+    current_filter = tk.StringVar(value="all")
+    
+    filter_buttons = []
+    for text, f_type in [("All", "all"), ("Active", "active"), ("Completed", "completed")]:
+        btn = tk.Button(filter_frame, text=text, font=("Arial", 9),
+                       bg=COLORS["primary"] if f_type == "all" else COLORS["secondary"],
+                       fg="white" if f_type == "all" else COLORS["text_light"],
+                       relief=tk.FLAT, cursor="hand2", width=10, pady=3,
+                       command=lambda t=f_type: set_filter(t))
+        btn.pack(side=tk.LEFT, padx=(0, 5))
+        filter_buttons.append((btn, f_type))
+    
+    # Sort order, cycled by clicking
+    current_sort = tk.StringVar(value="created")
+    sort_button = tk.Button(filter_frame, text=SORT_LABELS["created"], font=("Arial", 9),
+                            bg=COLORS["secondary"], fg=COLORS["text_light"],
+                            relief=tk.FLAT, cursor="hand2", pady=3, command=cycle_sort)
+    sort_button.pack(side=tk.LEFT, padx=(0, 5))
+    
+    # Import / export
+    for text, command in [("⭱ Export", export_file), ("⭳ Import", import_file)]:
+        tk.Button(filter_frame, text=text, font=("Arial", 9),
+                  bg=COLORS["secondary"], fg=COLORS["text_light"],
+                  relief=tk.FLAT, cursor="hand2", pady=3,
+                  command=command).pack(side=tk.RIGHT, padx=(5, 0))
+    
+    # Filter expression box, e.g. "active AND #urgent AND NOT #ops"
+    filter_entry = tk.Entry(filter_frame, font=("Arial", 9), relief=tk.FLAT, width=26,
+                            bg=COLORS["secondary"], fg=COLORS["text_light"],
+                            insertbackground=COLORS["text"])
+    filter_entry.pack(side=tk.LEFT, ipady=4, padx=(0, 5))
+    filter_entry.insert(0, filter_placeholder)
+    filter_entry.bind("<Return>", on_filter_return)
+    filter_entry.bind("<Escape>", on_filter_escape)
+    filter_entry.bind("<FocusIn>", on_filter_focus_in)
+    filter_entry.bind("<FocusOut>", on_filter_focus_out)
+    
+    # Search box (takes the space left between the filters and import/export)
+    search_entry = tk.Entry(filter_frame, font=("Arial", 9), relief=tk.FLAT,
+                            bg=COLORS["secondary"], fg=COLORS["text_light"],
+                            insertbackground=COLORS["text"])
+    search_entry.pack(side=tk.LEFT, fill="x", expand=True, ipady=4, padx=(5, 0))
+    search_entry.insert(0, search_placeholder)
+    search_entry.bind("<KeyRelease>", on_search_key)
+    search_entry.bind("<Escape>", on_search_escape)
+    search_entry.bind("<FocusIn>", on_search_focus_in)
+    search_entry.bind("<FocusOut>", on_search_focus_out)
+    
+    build_selection_bar(main_page)
+    
+    # Scrollable todo display area
+    canvas_frame = tk.Frame(main_page, bg=COLORS["bg"])
+    canvas_frame.pack(fill="both", expand=True, padx=10)
+    
+    canvas = tk.Canvas(canvas_frame, bg=COLORS["bg"], highlightthickness=0)
+    scrollbar = tk.Scrollbar(canvas_frame, orient="vertical", command=canvas.yview,
+                             bg=COLORS["bg_light"], troughcolor=COLORS["bg"])
+    
+    canvas.configure(yscrollcommand=on_canvas_yview)
+    canvas.bind_all("<MouseWheel>", on_mousewheel)
+    
+    canvas.pack(side="left", fill="both", expand=True)
+    scrollbar.pack(side="right", fill="y")
+    
+    # Empty state message
+    empty_label = tk.Label(canvas, text="🎯\n\nNo tasks yet!\nAdd your first task below.",
+                           font=("Arial", 12), bg=COLORS["bg"], fg=COLORS["text_light"],
+                           justify="center", pady=50)
+    empty_window = canvas.create_window(0, 0, window=empty_label, anchor="n", state="hidden")
+    
+    todo_grid = VirtualGrid(canvas)
+    canvas.bind("<Configure>", on_canvas_resize)
+    
+    renderer = RenderScheduler(root)
+    store.subscribe(renderer.on_change)
+    store.subscribe(on_selection_store_change)
+    
+    root.bind("<Control-a>", on_select_all_key)
+    root.bind("<Control-z>", lambda e: on_undo_key(e, undo_last))
+    root.bind("<Control-y>", lambda e: on_undo_key(e, redo_last))
+    root.bind("<Control-Z>", lambda e: on_undo_key(e, redo_last))
+    root.bind("<Escape>", lambda e: clear_selection(), add="+")
+    
+    build_input_section(main_page)
+    refresh_todos()
+    renderer.mark("stats")
 
+# ============= TASK ACTIONS =============
 def delete_todo(todo_id):
-    global todos
-    if show_confirm("Delete Task", "Are you sure you want to delete this task?"):
-        todos = [t for t in todos if t["id"] != todo_id]
-        refresh_todos()
-        show_toast("Task deleted!", "error", 1500)
-        if len(todos) < 6:
-            todo_btnsADD.pack(pady=5)
+    store.remove(todo_id)
+    show_toast("Task deleted!", "error", UNDO_TOAST_MS, action=("Undo", undo_last))
+    update_add_button()
+
+def edit_todo(todo_id):
+    todo = store.get(todo_id)
+    current = todo.text if todo.due is None else f"{todo.text} @{editable_due(todo.due)}"
+    text = show_prompt("Edit Task", "Update the task (end with @17:30 or @+2h to set a due date):", current)
+    if text is None:
+        return
+    text, due = split_due(text.strip())
+    if not text:
+        show_warning("Empty Task", "Please enter a task description!")
+        return
+    if (text, due) != (todo.text, todo.due) and todo_id in store:
+        store.update_many([(todo_id, text, todo.status, todo.priority, due)])
+        show_toast("Task updated! ✏️", "success", 1500)
 
 def mark_complete(todo_id):
-    for todo in todos:
-        if todo["id"] == todo_id:
-            todo["status"] = not todo["status"]
-            status_msg = "Task completed! 🎉" if todo["status"] else "Task marked as active"
-            toast_type = "success" if todo["status"] else "info"
-            show_toast(status_msg, toast_type, 1500)
-            break
-    refresh_todos()
+    todo = store.toggle(todo_id)
+    status_msg = "Task completed! 🎉" if todo.status else "Task marked as active"
+    toast_type = "success" if todo.status else "info"
+    show_toast(status_msg, toast_type, 1500)
+
+def cycle_priority(todo_id):
+    """Raise a task's priority one step, wrapping from high back to low"""
+    todo = store.get(todo_id)
+    todo = store.set_priority(todo_id, (todo.priority + 1) % len(PRIORITY_NAMES))
+    show_toast(f"Priority: {PRIORITY_NAMES[todo.priority]}", "info", 1500)
+
+# Undo / redo
+UNDO_TOAST_MS = 5000
+
+def undo_last():
+    if journal.busy:
+        show_toast("Still restoring tasks…", "info", 1500)
+        return
+    label = journal.undo()
+    show_toast(f"Undid {label}" if label else "Nothing to undo", "info", 1500)
+    update_add_button()
+
+def redo_last():
+    if journal.busy:
+        show_toast("Still restoring tasks…", "info", 1500)
+        return
+    label = journal.redo()
+    show_toast(f"Redid {label}" if label else "Nothing to redo", "info", 1500)
+    update_add_button()
+
+def on_undo_key(e, action):
+    # Entries keep their own shortcuts
+    if isinstance(e.widget, tk.Entry) or not main_page.winfo_ismapped():
+        return
+    action()
+
+# ============= TODO CARDS =============
+# Task text is cut to one line of the card's width with an ellipsis. Fonts
+# are created once per spec and widths are memoized per (font, text), so
+# reflowing the cards while the window is resized rarely measures anything.
+TEXT_FONT = ("Arial", 11, "bold")
+DONE_TEXT_FONT = ("Arial", 11, "bold overstrike")
+TEXT_CACHE_SIZE = 16384
+# Text widths are rounded down to this step, so nearby card widths share
+# their ellipsized texts while the window edge is dragged
+TEXT_WIDTH_STEP = 8
+# Card width taken by the borders, padding and priority bar beside the text
+CARD_TEXT_INSET = 48
+ELLIPSIS = "…"
+
+fonts = {}  # font spec -> tkfont.Font, shared by all cards for measuring
+
+def get_font(spec):
+    font = fonts.get(spec)
+    if font is None:
+        font = fonts[spec] = tkfont.Font(font=spec)
+    return font
+
+@functools.lru_cache(maxsize=TEXT_CACHE_SIZE)
+def text_width(spec, text):
+    """Width of text in pixels when drawn in the font spec"""
+    return get_font(spec).measure(text)
+
+@functools.lru_cache(maxsize=TEXT_CACHE_SIZE)
+def ellipsize(spec, text, width):
+    """text on one line, cut with an ellipsis where it gets wider than width pixels"""
+    text = " ".join(text.split())
+    if text_width(spec, text) <= width:
+        return text
+    # Longest prefix that still fits next to the ellipsis
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if text_width(spec, text[:middle].rstrip() + ELLIPSIS) <= width:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low].rstrip() + ELLIPSIS
+
+def card_text_width(card_width):
+    """Room for the task text on a card of the given width, rounded to TEXT_WIDTH_STEP"""
+    room = max(card_width - CARD_TEXT_INSET, TEXT_WIDTH_STEP)
+    return room - room % TEXT_WIDTH_STEP
+
+def status_badge(todo):
+    """Text and color of a card's status badge"""
+    if todo.status:
+        return "✓ Completed", COLORS["success"]
+    if todo.due is None:
+        return "○ In Progress", COLORS["warning"]
+    if is_overdue(todo):
+        return f"⚠ Overdue · {short_due(todo.due)}", COLORS["danger"]
+    return f"⏰ Due {short_due(todo.due)}", COLORS["warning"]
+
+class TodoCard:
+    """Styled todo card that is built once and rebound to other todos.
+    
+    The card lives in a hidden canvas window until the grid places it, and
+    rebind() only reconfigures the existing widgets, so a card can be handed
+    from one todo to another without creating any new Tk widgets.
+    """
+    
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.todo = None
+        self.card_color = COLORS["card_bg"]
+        self.text_width = card_text_width(MIN_COLUMN_WIDTH - 2 * CARD_PADDING)
+        
+        # Card frame with border
+        self.frame = tk.Frame(canvas, bg=COLORS["border"], padx=1, pady=1)
+        
+        self.card = tk.Frame(self.frame)
+        self.card.pack(fill="both", expand=True)
+        
+        # Inner padding frame
+        self.inner = tk.Frame(self.card, padx=15, pady=12)
+        self.inner.pack(fill="both", expand=True)
+        
+        # Priority indicator (optional visual)
+        self.priority_bar = tk.Frame(self.inner, width=4, height=40)
+        self.priority_bar.pack(side=tk.LEFT, padx=(0, 12), fill="y")
+        
+        # Content frame
+        self.content = tk.Frame(self.inner)
+        self.content.pack(side=tk.LEFT, fill="both", expand=True)
+        
+        # Task number and priority badge (click to change the priority)
+        self.task_num = tk.Label(self.content, font=("Arial", 8), fg=COLORS["text_light"], cursor="hand2")
+        self.task_num.pack(anchor="w")
+        
+        # Task text
+        self.td_item = tk.Label(self.content, anchor="w", justify="left")
+        self.td_item.pack(anchor="w", pady=(3, 5))
+        
+        # Status badge
+        self.status_frame = tk.Frame(self.content, padx=6, pady=2)
+        self.status_frame.pack(anchor="w", pady=(0, 8))
+        
+        self.td_status = tk.Label(self.status_frame, font=("Arial", 8, "bold"), fg="white")
+        self.td_status.pack()
+        
+        # Buttons frame
+        self.btn_frame = tk.Frame(self.content)
+        self.btn_frame.pack(fill="x", pady=(5, 0))
+        
+        # Complete/Undo button
+        self.btn_complete = tk.Button(self.btn_frame, font=("Arial", 9, "bold"),
+                                      fg="white", relief=tk.FLAT,
+                                      cursor="hand2", width=7, pady=3,
+                                      activebackground=COLORS["success_hover"])
+        self.btn_complete.pack(side=tk.LEFT, padx=(0, 5))
+        
+        # Delete button
+        self.btn_delete = tk.Button(self.btn_frame, text="🗑", font=("Arial", 10),
+                                    bg=COLORS["danger"], fg="white", relief=tk.FLAT,
+                                    cursor="hand2", width=3, pady=3,
+                                    activebackground=COLORS["danger_hover"])
+        self.btn_delete.pack(side=tk.LEFT)
+        
+        # Hover, double-click to edit and the buttons go through the
+        # delegated class bindings
+        register_card_widget(self.card, self, "hover")
+        register_card_widget(self.td_item, self, "edit")
+        register_card_widget(self.btn_complete, self, "complete")
+        register_card_widget(self.btn_delete, self, "delete")
+        register_card_widget(self.task_num, self, "priority")
+        for widget in (self.inner, self.priority_bar, self.content,
+                       self.status_frame, self.td_status, self.btn_frame):
+            register_card_widget(widget, self)
+        
+        self.window = canvas.create_window(0, 0, window=self.frame, anchor="nw",
+                                           height=CARD_HEIGHT, state="hidden")
+    
+    def move(self, x, y):
+        self.canvas.coords(self.window, x, y)
+    
+    def resize(self, width):
+        self.canvas.itemconfigure(self.window, width=width)
+        text_width = card_text_width(width)
+        if text_width != self.text_width:
+            self.text_width = text_width
+            if self.todo is not None:
+                self._set_text()
+    
+    def show(self):
+        self.canvas.itemconfigure(self.window, state="normal")
+    
+    def hide(self):
+        self.canvas.itemconfigure(self.window, state="hidden")
+    
+    def destroy(self):
+        self.canvas.delete(self.window)
+        self.frame.destroy()
+    
+    def rebind(self, todo):
+        """Show another todo (or fresh state of the same one) on this card"""
+        self.todo = todo
+        is_complete = todo.status
+        self.card_color = COLORS["card_complete"] if is_complete else COLORS["card_bg"]
+        
+        # Selected cards get a thicker accent border
+        border = 3 if todo.id in selected else 1
+        self.frame.configure(bg=COLORS["accent"] if todo.id in selected else COLORS["border"],
+                             padx=border, pady=border)
+        self._set_background(self.card_color)
+        self.task_num.configure(text=f"#{todo.id}  {PRIORITY_BADGES[todo.priority]}", bg=self.card_color)
+        self.priority_bar.configure(bg=COLORS["success"] if is_complete else PRIORITY_COLORS[todo.priority])
+        
+        # Task text
+        self._set_text()
+        self.td_item.configure(bg=self.card_color, fg=COLORS["text_light"] if is_complete else COLORS["text"])
+        
+        # Status badge
+        status_text, status_color = status_badge(todo)
+        self.status_frame.configure(bg=status_color)
+        self.td_status.configure(text=status_text, bg=status_color)
+        
+        # Complete/Undo button
+        self.btn_complete.configure(text="↩ Undo" if is_complete else "✓ Done",
+                                    bg=COLORS["text_light"] if is_complete else COLORS["success"])
+    
+    def _set_text(self):
+        font = DONE_TEXT_FONT if self.todo.status else TEXT_FONT
+        self.td_item.configure(text=ellipsize(font, self.todo.text, self.text_width), font=font)
+    
+    def _set_background(self, color):
+        for widget in (self.card, self.inner, self.content, self.btn_frame):
+            widget.configure(bg=color)
+    
+    def set_hover(self, hover):
+        self._set_background(COLORS["card_hover"] if hover else self.card_color)
+
+class CanvasTodoCard:
+    """Todo card drawn straight onto the canvas instead of built from widgets.
+    
+    The card is a handful of rectangles and text items that share one tag,
+    so moving or hiding it is a single canvas call. The buttons are tagged
+    regions; their clicks and hover go through one set of tag_bind handlers
+    per canvas, which find the card from the item under the pointer. The
+    layout follows TodoCard's packing, so both renderers look the same.
+    """
+    
+    # Offsets inside the card, matching TodoCard's borders and padding
+    PAD_X = 16
+    PAD_Y = 13
+    CONTENT_X = 32
+    BUTTON_HEIGHT = 26
+    DONE_WIDTH = 70
+    DELETE_WIDTH = 32
+    
+    NUM_FONT = ("Arial", 8)
+    STATUS_FONT = ("Arial", 8, "bold")
+    
+    item_cards = {}  # canvas item id -> card it belongs to
+    bound_canvases = set()
+    
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.todo = None
+        self.card_color = COLORS["card_bg"]
+        self.done_color = COLORS["success"]
+        self.x = 0
+        self.y = 0
+        self.width = 2 * self.CONTENT_X
+        self.text_width = card_text_width(self.width)
+        self.status_width = 0
+        
+        if str(canvas) not in self.bound_canvases:
+            self.bind_events(canvas)
+        
+        self.tag = f"card{id(self)}"
+        base_tags = (self.tag, "card")
+        
+        def item(create, tags=(), **kwargs):
+            return create(0, 0, 0, 0, tags=base_tags + tags, state="hidden", width=0, **kwargs)
+        
+        def text(tags=(), **kwargs):
+            return canvas.create_text(0, 0, tags=base_tags + tags, state="hidden", **kwargs)
+        
+        # Border, background and priority indicator
+        self.border = item(canvas.create_rectangle, fill=COLORS["border"])
+        self.background = item(canvas.create_rectangle)
+        self.priority_bar = item(canvas.create_rectangle)
+        
+        # Task number and priority badge, task text and status badge
+        self.task_num = text(anchor="nw", font=self.NUM_FONT, fill=COLORS["text_light"], tags=("card-priority",))
+        self.td_item = text(anchor="nw", tags=("card-text",))
+        self.status_bg = item(canvas.create_rectangle)
+        self.td_status = text(anchor="nw", font=self.STATUS_FONT, fill="white")
+        
+        # Complete/Undo and delete buttons
+        self.btn_complete = item(canvas.create_rectangle, tags=("card-complete",))
+        self.btn_complete_text = text(font=("Arial", 9, "bold"), fill="white", tags=("card-complete",))
+        self.btn_delete = item(canvas.create_rectangle, fill=COLORS["danger"], tags=("card-delete",))
+        self.btn_delete_text = text(text="🗑", font=("Arial", 10), fill="white", tags=("card-delete",))
+        
+        for item_id in canvas.find_withtag(self.tag):
+            self.item_cards[item_id] = self
+    
+    @classmethod
+    def bind_events(cls, canvas):
+        """Bind the shared card handlers on a canvas, once"""
+        cls.bound_canvases.add(str(canvas))
+        
+        def handler(method, *args):
+            def on_event(e):
+                current = canvas.find_withtag("current")
+                card = cls.item_cards.get(current[0]) if current else None
+                if card is not None and card.todo is not None:
+                    method(card, *args)
+            return on_event
+        
+        def released(button_tag, action):
+            def on_event(e):
+                current = canvas.find_withtag("current")
+                # Tk moves "current" only after delivering the release, so look
+                # under the pointer: like a Button command, only fire when
+                # released over the button that was pressed
+                x, y = canvas.canvasx(e.x), canvas.canvasy(e.y)
+                under = canvas.find_overlapping(x, y, x, y)
+                if not current or not under or button_tag not in canvas.gettags(under[-1]):
+                    return
+                card = cls.item_cards.get(current[0])
+                if card is not None and card.todo is not None and cls.item_cards.get(under[-1]) is card:
+                    action(card.todo.id)
+            return on_event
+        
+        canvas.tag_bind("card", "<Enter>", handler(cls.set_hover, True))
+        canvas.tag_bind("card", "<Leave>", handler(cls.set_hover, False))
+        canvas.tag_bind("card-complete", "<Enter>", handler(cls._hover_button, "complete", True))
+        canvas.tag_bind("card-complete", "<Leave>", handler(cls._hover_button, "complete", False))
+        canvas.tag_bind("card-delete", "<Enter>", handler(cls._hover_button, "delete", True))
+        canvas.tag_bind("card-delete", "<Leave>", handler(cls._hover_button, "delete", False))
+        canvas.tag_bind("card-complete", "<ButtonRelease-1>", released("card-complete", mark_complete))
+        canvas.tag_bind("card-delete", "<ButtonRelease-1>", released("card-delete", delete_todo))
+        canvas.tag_bind("card-text", "<Double-Button-1>", handler(lambda card: edit_todo(card.todo.id)))
+        canvas.tag_bind("card-priority", "<Button-1>", handler(lambda card: cycle_priority(card.todo.id)))
+        canvas.tag_bind("card", "<Control-Button-1>", handler(lambda card: select_task(card.todo.id, False)))
+        canvas.tag_bind("card", "<Shift-Button-1>", handler(lambda card: select_task(card.todo.id, True)))
+        # Modifier clicks select instead of pressing the card buttons
+        for button_tag in ("card-complete", "card-delete"):
+            canvas.tag_bind(button_tag, "<Control-ButtonRelease-1>", lambda e: None)
+            canvas.tag_bind(button_tag, "<Shift-ButtonRelease-1>", lambda e: None)
+        canvas.tag_bind("card-priority", "<Control-Button-1>", lambda e: None)
+        canvas.tag_bind("card-priority", "<Shift-Button-1>", lambda e: None)
+    
+    def rebind(self, todo):
+        """Show another todo (or fresh state of the same one) on this card"""
+        self.todo = todo
+        is_complete = todo.status
+        self.card_color = COLORS["card_complete"] if is_complete else COLORS["card_bg"]
+        self.done_color = COLORS["text_light"] if is_complete else COLORS["success"]
+        canvas = self.canvas
+        
+        canvas.itemconfigure(self.background, fill=self.card_color)
+        canvas.itemconfigure(self.border, fill=COLORS["accent"] if todo.id in selected else COLORS["border"])
+        canvas.itemconfigure(self.task_num, text=f"#{todo.id}  {PRIORITY_BADGES[todo.priority]}")
+        canvas.itemconfigure(self.priority_bar,
+                             fill=COLORS["success"] if is_complete else PRIORITY_COLORS[todo.priority])
+        
+        # Task text
+        self._set_text()
+        canvas.itemconfigure(self.td_item, fill=COLORS["text_light"] if is_complete else COLORS["text"])
+        
+        # Status badge
+        status_text, status_color = status_badge(todo)
+        canvas.itemconfigure(self.td_status, text=status_text)
+        canvas.itemconfigure(self.status_bg, fill=status_color)
+        self.status_width = text_width(self.STATUS_FONT, status_text)
+        
+        # Complete/Undo button
+        canvas.itemconfigure(self.btn_complete, fill=self.done_color)
+        canvas.itemconfigure(self.btn_complete_text, text="↩ Undo" if is_complete else "✓ Done")
+        self._layout()
+    
+    def move(self, x, y):
+        self.canvas.move(self.tag, x - self.x, y - self.y)
+        self.x, self.y = x, y
+    
+    def resize(self, width):
+        self.width = width
+        text_width = card_text_width(width)
+        if text_width != self.text_width:
+            self.text_width = text_width
+            if self.todo is not None:
+                self._set_text()
+        self._layout()
+    
+    def _set_text(self):
+        font = DONE_TEXT_FONT if self.todo.status else TEXT_FONT
+        self.canvas.itemconfigure(self.td_item, text=ellipsize(font, self.todo.text, self.text_width), font=font)
+    
+    def _layout(self):
+        """Position the items top to bottom like TodoCard's packed widgets"""
+        canvas = self.canvas
+        x, y, width = self.x, self.y, self.width
+        # Selected cards get a thicker accent border
+        border = 3 if self.todo is not None and self.todo.id in selected else 1
+        canvas.coords(self.border, x, y, x + width, y + CARD_HEIGHT)
+        canvas.coords(self.background, x + border, y + border,
+                      x + width - border, y + CARD_HEIGHT - border)
+        canvas.coords(self.priority_bar, x + self.PAD_X, y + self.PAD_Y,
+                      x + self.PAD_X + 4, y + CARD_HEIGHT - self.PAD_Y)
+        
+        left = x + self.CONTENT_X
+        top = y + self.PAD_Y
+        canvas.coords(self.task_num, left, top)
+        top += get_font(self.NUM_FONT).metrics("linespace") + 3
+        canvas.coords(self.td_item, left, top)
+        top += get_font(TEXT_FONT).metrics("linespace") + 5
+        
+        status_height = get_font(self.STATUS_FONT).metrics("linespace")
+        canvas.coords(self.status_bg, left, top, left + self.status_width + 12, top + status_height + 4)
+        canvas.coords(self.td_status, left + 6, top + 2)
+        top += status_height + 4 + 8 + 5
+        
+        for button, label, button_width in ((self.btn_complete, self.btn_complete_text, self.DONE_WIDTH),
+                                            (self.btn_delete, self.btn_delete_text, self.DELETE_WIDTH)):
+            canvas.coords(button, left, top, left + button_width, top + self.BUTTON_HEIGHT)
+            canvas.coords(label, left + button_width // 2, top + self.BUTTON_HEIGHT // 2)
+            left += button_width + 5
+    
+    def show(self):
+        self.canvas.itemconfigure(self.tag, state="normal")
+    
+    def hide(self):
+        self.canvas.itemconfigure(self.tag, state="hidden")
+    
+    def destroy(self):
+        for item_id in self.canvas.find_withtag(self.tag):
+            del self.item_cards[item_id]
+        self.canvas.delete(self.tag)
+    
+    def set_hover(self, hover):
+        self.canvas.itemconfigure(self.background, fill=COLORS["card_hover"] if hover else self.card_color)
+    
+    def _hover_button(self, action, hover):
+        if action == "complete":
+            button, color = self.btn_complete, COLORS["success_hover"] if hover else self.done_color
+        else:
+            button, color = self.btn_delete, COLORS["danger_hover"] if hover else COLORS["danger"]
+        self.canvas.itemconfigure(button, fill=color)
+        self.canvas.configure(cursor="hand2" if hover else "")
+
+CARD_CLASSES = {"widgets": TodoCard, "canvas": CanvasTodoCard}
 
-def create_todo_card(parent, todo, row, col):
-    """Create a styled todo card with action buttons"""
-    is_complete = todo["status"]
-    card_color = COLORS["card_complete"] if is_complete else COLORS["card_bg"]
-    
-    # Card frame with border
-    card_border = tk.Frame(parent, bg=COLORS["border"], padx=1, pady=1)
-    card_border.grid(row=row, column=col, padx=8, pady=8, sticky="nsew")
-    
-    card = tk.Frame(card_border, bg=card_color)
-    card.pack(fill="both", expand=True)
-    
-    # Inner padding frame
-    inner = tk.Frame(card, bg=card_color, padx=15, pady=12)
-    inner.pack(fill="both", expand=True)
-    
-    # Priority indicator (optional visual)
-    priority_bar = tk.Frame(inner, bg=COLORS["success"] if is_complete else COLORS["primary"], 
-                           width=4, height=40)
-    priority_bar.pack(side=tk.LEFT, padx=(0, 12), fill="y")
-    
-    # Content frame
-    content = tk.Frame(inner, bg=card_color)
-    content.pack(side=tk.LEFT, fill="both", expand=True)
-    
-    # Task number badge
-    task_num = tk.Label(content, text=f"#{todo['id']}", font=("Arial", 8),
-                        bg=card_color, fg=COLORS["text_light"])
-    task_num.pack(anchor="w")
-    
-    # Task text
-    task_text = todo["text"]
-    display_text = task_text if len(task_text) <= 25 else task_text[:25] + "..."
-    
-    text_style = ("Arial", 11, "bold overstrike") if is_complete else ("Arial", 11, "bold")
-    text_color = COLORS["text_light"] if is_complete else COLORS["text"]
-    
-    td_item = tk.Label(content, text=display_text, font=text_style,
-                       bg=card_color, fg=text_color, wraplength=140, justify="left")
-    td_item.pack(anchor="w", pady=(3, 5))
-    
-    # Status badge
-    status_text = "✓ Completed" if is_complete else "○ In Progress"
-    status_color = COLORS["success"] if is_complete else COLORS["warning"]
-    
-    status_frame = tk.Frame(content, bg=status_color, padx=6, pady=2)
-    status_frame.pack(anchor="w", pady=(0, 8))
-    
-    td_status = tk.Label(status_frame, text=status_text, font=("Arial", 8, "bold"),
-                         bg=status_color, fg="white")
-    td_status.pack()
-    
-    # Buttons frame
-    btn_frame = tk.Frame(content, bg=card_color)
-    btn_frame.pack(fill="x", pady=(5, 0))
-    
-    # Complete/Undo button
-    complete_text = "↩ Undo" if is_complete else "✓ Done"
-    complete_color = COLORS["text_light"] if is_complete else COLORS["success"]
-    btn_complete = tk.Button(btn_frame, text=complete_text, font=("Arial", 9, "bold"),
-                             bg=complete_color, fg="white", relief=tk.FLAT,
-                             cursor="hand2", width=7, pady=3,
-                             activebackground=COLORS["success_hover"],
-                             command=lambda tid=todo["id"]: mark_complete(tid))
-    btn_complete.pack(side=tk.LEFT, padx=(0, 5))
-    
-    # Delete button
-    btn_delete = tk.Button(btn_frame, text="🗑", font=("Arial", 10),
-                           bg=COLORS["danger"], fg="white", relief=tk.FLAT,
-                           cursor="hand2", width=3, pady=3,
-                           activebackground=COLORS["danger_hover"],
-                           command=lambda tid=todo["id"]: delete_todo(tid))
-    btn_delete.pack(side=tk.LEFT)
-    
-    # Hover effects for card
-    def on_card_enter(e):
-        card.configure(bg=COLORS["card_hover"])
-        inner.configure(bg=COLORS["card_hover"])
-        content.configure(bg=COLORS["card_hover"])
-        btn_frame.configure(bg=COLORS["card_hover"])
-    
-    def on_card_leave(e):
-        card.configure(bg=card_color)
-        inner.configure(bg=card_color)
-        content.configure(bg=card_color)
-        btn_frame.configure(bg=card_color)
-    
-    card.bind("<Enter>", on_card_enter)
-    card.bind("<Leave>", on_card_leave)
+def create_todo_card(canvas, todo):
+    """Create a styled todo card with action buttons (hidden until placed)"""
+    card = CARD_CLASSES[card_renderer](canvas)
+    card.rebind(todo)
+    return card
+
+class CardPool:
+    """Free list of TodoCard objects so released cards get reused"""
+    
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.free = []
+    
+    def acquire(self, todo):
+        if self.free:
+            card = self.free.pop()
+            card.rebind(todo)
+            return card
+        return create_todo_card(self.canvas, todo)
+    
+    def release(self, card):
+        card.hide()
+        card.todo = None
+        self.free.append(card)
+
+# ============= VIRTUALIZED CARD GRID =============
+class VirtualGrid:
+    """Card grid that only builds cards for the rows inside the viewport"""
+    
+    def __init__(self, canvas, min_column_width=MIN_COLUMN_WIDTH, overscan=OVERSCAN_ROWS):
+        self.canvas = canvas
+        self.min_column_width = min_column_width
+        self.columns = self.columns_for(canvas.winfo_width())
+        self.overscan = overscan
+        self.items = []
+        self.cards = {}  # todo id -> [TodoCard, index]
+        self.pool = CardPool(canvas)
+        self.height = 1
+    
+    def set_items(self, items, top=0):
+        """Show another sequence of todos, scrolled to the given pixel offset"""
+        self.items = items
+        self.update_scrollregion()
+        self.canvas.yview_moveto(top / self.height)
+        self.render()
+    
+    def changed(self):
+        """Catch up after todos were added to or removed from the sequence"""
+        self.update_scrollregion()
+        self.render()
+    
+    def clear(self):
+        for todo_id in list(self.cards):
+            self._release(todo_id)
+    
+    def restyle(self):
+        """Restyle every built card, e.g. after the selection changed"""
+        for card, _index in self.cards.values():
+            card.rebind(card.todo)
+    
+    def update(self, todo):
+        """Restyle the card of a todo whose fields changed, if it is built"""
+        entry = self.cards.get(todo.id)
+        if entry is not None and entry[0].todo is todo:
+            entry[0].rebind(todo)
+    
+    def columns_for(self, width):
+        """How many columns of at least min_column_width fit in width pixels"""
+        return max(1, min(width // self.min_column_width, MAX_COLUMNS))
+    
+    def row_count(self):
+        return (len(self.items) + self.columns - 1) // self.columns
+    
+    def column_width(self):
+        return max(self.canvas.winfo_width() // self.columns, 2 * CARD_PADDING + 1)
+    
+    def update_scrollregion(self):
+        self.height = max(self.row_count() * ROW_HEIGHT, 1)
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), self.height))
+    
+    def capacity(self):
+        """How many todos fill the viewport, overscan rows included"""
+        rows = self.canvas.winfo_height() // ROW_HEIGHT + 2 + 2 * self.overscan
+        return rows * self.columns
+    
+    def visible_range(self):
+        """Indexes of the todos in the viewport plus the overscan rows"""
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        first = max(0, int(top // ROW_HEIGHT) - self.overscan)
+        last = int(bottom // ROW_HEIGHT) + 1 + self.overscan
+        return range(first * self.columns, min(len(self.items), last * self.columns))
+    
+    def render(self):
+        """Reconcile the built cards with the todos that should be in view"""
+        wanted = {self.items[i].id: i for i in self.visible_range()}
+        for todo_id in [tid for tid in self.cards if tid not in wanted]:
+            self._release(todo_id)
+        col_width = self.column_width()
+        for todo_id, index in wanted.items():
+            entry = self.cards.get(todo_id)
+            if entry is None:
+                self._build(self.items[index], index, col_width)
+                continue
+            # Every list numbers its tasks from 1, so after a switch the
+            # same id can stand for another list's task
+            if entry[0].todo is not self.items[index]:
+                entry[0].rebind(self.items[index])
+            if entry[1] != index:
+                entry[1] = index
+                self._place(entry[0], index, col_width)
+    
+    def relayout(self):
+        """Reflow the built cards after the canvas changed size"""
+        columns = self.columns_for(self.canvas.winfo_width())
+        if columns != self.columns:
+            # Keep the first todo in view at the top as rows get longer or shorter
+            first = int(self.canvas.canvasy(0) // ROW_HEIGHT) * self.columns
+            self.columns = columns
+            self.update_scrollregion()
+            self.canvas.yview_moveto(first // columns * ROW_HEIGHT / self.height)
+        col_width = self.column_width()
+        for card, index in self.cards.values():
+            self._place(card, index, col_width)
+            card.resize(col_width - 2 * CARD_PADDING)
+        self.update_scrollregion()
+        self.render()
+    
+    def _place(self, card, index, col_width):
+        row, col = divmod(index, self.columns)
+        card.move(col * col_width + CARD_PADDING, row * ROW_HEIGHT + CARD_PADDING)
+    
+    def _build(self, todo, index, col_width):
+        card = self.pool.acquire(todo)
+        self._place(card, index, col_width)
+        card.resize(col_width - 2 * CARD_PADDING)
+        card.show()
+        self.cards[todo.id] = [card, index]
+    
+    def _release(self, todo_id):
+        card, _index = self.cards.pop(todo_id)
+        self.pool.release(card)
 
 def update_progress():
     """Update the progress bar and stats"""
-    total = len(todos)
-    completed = sum(1 for t in todos if t["status"])
+    total = len(store)
+    completed = store.completed
     percentage = (completed / total * 100) if total > 0 else 0
     
     # Update labels
     td_total.config(text=f"{total} task{'s' if total != 1 else ''}")
     td_complete.config(text=f"{completed} done")
-    progress_label.config(text=f"Progress: {int(percentage)}%")
-    
-    # Animate progress bar
-    progress_width = int((percentage / 100) * progress_bg.winfo_width()) if progress_bg.winfo_width() > 1 else 0
-    progress_bar.place(x=0, y=0, relheight=1, width=max(0, progress_width))
-
-def refresh_todos():
-    # Clear existing widgets
-    for widget in todo_display.winfo_children():
-        widget.destroy()
-    
-    # Get filtered todos
-    filter_type = current_filter.get()
-    if filter_type == "active":
-        filtered_todos = [t for t in todos if not t["status"]]
-    elif filter_type == "completed":
-        filtered_todos = [t for t in todos if t["status"]]
+    if job_progress is None:
+        progress_label.config(text=f"Progress: {int(percentage)}%")
     else:
-        filtered_todos = todos
-    
-    # Show empty state if no todos
-    if not filtered_todos:
-        empty_msg = {
-            "all": "🎯\n\nNo tasks yet!\nAdd your first task below.",
-            "active": "🎉\n\nNo active tasks!\nAll caught up!",
-            "completed": "📝\n\nNo completed tasks yet.\nKeep going!"
-        }
-        empty_label = tk.Label(todo_display, text=empty_msg.get(filter_type, empty_msg["all"]),
-                               font=("Arial", 12), bg=COLORS["bg"], fg=COLORS["text_light"],
-                               justify="center", pady=50)
-        empty_label.grid(row=0, column=0, columnspan=GRID_COLUMNS, sticky="nsew")
-    else:
-        # Configure grid columns
-        for i in range(GRID_COLUMNS):
-            todo_display.columnconfigure(i, weight=1, uniform="col")
-        
-        # Create todo cards in grid layout
-        for index, todo in enumerate(filtered_todos):
-            row = index // GRID_COLUMNS
-            col = index % GRID_COLUMNS
-            create_todo_card(todo_display, todo, row, col)
-    
-    # Update progress after a short delay to ensure widgets are rendered
-    root.after(50, update_progress)
+        label, done = job_progress
+        progress_label.config(text=f"{label}… {int(done * 100)}%")
     
-    # Reset canvas scroll
-    canvas.yview_moveto(0)
+    update_progress_bar()
 
-# ============= INPUT SECTION =============
-input_frame = tk.Frame(main_page, bg=COLORS["bg_light"], pady=20)
-input_frame.pack(side=tk.BOTTOM, fill="x")
-
-input_inner = tk.Frame(input_frame, bg=COLORS["bg_light"])
-input_inner.pack(fill="x", padx=20)
+def update_progress_bar():
+    """Size the progress bar to the completed share of the track (or of the running job)"""
+    total = len(store)
+    if job_progress is not None:
+        share = job_progress[1]
+    else:
+        share = store.completed / total if total else 0
+    track_width = progress_bg.winfo_width()
+    progress_width = int(share * track_width) if track_width > 1 else 0
+    progress_bar.place(x=0, y=0, relheight=1, width=max(0, progress_width))
 
-# Label with icon
-label_frame = tk.Frame(input_inner, bg=COLORS["bg_light"])
-label_frame.pack(fill="x", pady=(0, 10))
+# Label and finished share of the background job shown in the progress bar
+job_progress = None
+
+def show_job_progress(label, done):
+    global job_progress
+    job_progress = (label, done)
+    renderer.mark("stats")
+
+def end_job_progress():
+    global job_progress
+    job_progress = None
+    renderer.mark("stats")
+
+EMPTY_MESSAGES = {
+    "all": "🎯\n\nNo tasks yet!\nAdd your first task below.",
+    "active": "🎉\n\nNo active tasks!\nAll caught up!",
+    "completed": "📝\n\nNo completed tasks yet.\nKeep going!",
+    "search": "🔍\n\nNo matching tasks.",
+    "filter": "🏷\n\nNo tasks match this filter."
+}
 
-tk.Label(label_frame, text="✏️", font=("Segoe UI Emoji", 12),
-         bg=COLORS["bg_light"]).pack(side=tk.LEFT)
-tk.Label(label_frame, text=" Add New Task", font=("Arial", 12, "bold"),
-         bg=COLORS["bg_light"], fg=COLORS["text"]).pack(side=tk.LEFT)
+# Live view of the current search results, replaced when the query changes
+search_view = None
 
-# Entry with styling
-entry_frame = tk.Frame(input_inner, bg=COLORS["border"], padx=2, pady=2)
-entry_frame.pack(fill="x")
+def update_empty_state():
+    """Show the empty state message when the grid has no cards"""
+    if todo_grid.items:
+        canvas.itemconfigure(empty_window, state="hidden")
+    else:
+        filter_type = "search" if search_query else current_filter.get()
+        empty_label.configure(text=EMPTY_MESSAGES.get(filter_type, EMPTY_MESSAGES["filter"]))
+        canvas.itemconfigure(empty_window, state="normal")
 
-entry_inner = tk.Frame(entry_frame, bg=COLORS["secondary"])
-entry_inner.pack(fill="x")
+def refresh_todos():
+    """Point the grid at the view for the current filter and search"""
+    global search_view
+    clear_selection()
+    task_filter = TaskFilter(current_filter.get())
+    if search_view is not None:
+        search_view.detach()
+        search_view = None
+    if search_query:
+        query = search_query
+        search_view = make_view(
+            store, lambda t: task_filter(t) and search_index.matches(t.id, query),
+            current_sort.get(), candidates=search_index.search(query))
+        search_view.attach()
+        todo_grid.set_items(search_view)
+    else:
+        todo_grid.set_items(get_view(task_filter, current_sort.get()), view_scroll.get(view_key(), 0))
+    update_empty_state()
 
-todo_entry = tk.Entry(entry_inner, width=35, font=("Arial", 12), relief=tk.FLAT,
-                      bg=COLORS["secondary"], fg=COLORS["text"], insertbackground=COLORS["text"])
-todo_entry.pack(fill="x", ipady=10, padx=10)
+# ============= RENDER SCHEDULER =============
+class RenderScheduler:
+    """Collects dirty regions and repaints them in one after_idle pass per burst"""
+    
+    def __init__(self, widget, budget_ms=FRAME_BUDGET_MS):
+        self.widget = widget
+        self.budget_ms = budget_ms
+        self.job = None
+        self.regions = set()
+        self.cards = {}  # todo id -> todo whose card needs restyling
+    
+    def mark(self, *regions):
+        self.regions.update(regions)
+        self._schedule()
+    
+    def mark_cards(self, todos):
+        for todo in todos:
+            self.cards[todo.id] = todo
+        self._schedule()
+    
+    def on_change(self, event, tasks):
+        if event == "update":
+            # Restyle the cards, and let the grid drop any that left the view
+            self.mark_cards(tasks)
+        self.mark("grid", "empty", "stats")
+    
+    def _schedule(self):
+        if self.job is None:
+            self.job = self.widget.after_idle(self.flush)
+    
+    def flush(self):
+        """Repaint everything marked since the last frame"""
+        self.job = None
+        regions, self.regions = self.regions, set()
+        if "grid" in regions:
+            todo_grid.changed()
+        if "restyle" in regions:
+            todo_grid.restyle()
+            self.cards.clear()
+        if self.cards:
+            self._restyle_cards()
+        if "empty" in regions:
+            update_empty_state()
+        if "stats" in regions:
+            update_progress()
+        elif "progress" in regions:
+            update_progress_bar()
+    
+    def _restyle_cards(self):
+        deadline = None
+        if self.budget_ms is not None:
+            deadline = time.perf_counter() + self.budget_ms / 1000
+        while self.cards:
+            todo_id = next(iter(self.cards))
+            todo_grid.update(self.cards.pop(todo_id))
+            if deadline is not None and time.perf_counter() > deadline:
+                # Out of time: finish the rest on the next idle pass
+                self._schedule()
+                return
+
+# ============= MULTI-SELECT =============
+# Ids of the selected tasks; Ctrl-click toggles a card, Shift-click
+# selects the range from the last clicked card in the current view
+selected = set()
+selection_anchor = None
+
+def set_selection(ids, anchor=None):
+    global selection_anchor
+    selection_anchor = anchor
+    if ids == selected:
+        return
+    selected.clear()
+    selected.update(ids)
+    selection_changed()
+
+def selection_changed():
+    renderer.mark("restyle")
+    update_selection_bar()
+
+def select_task(todo_id, extend):
+    """Ctrl-click (toggle one card) or Shift-click (select a range)"""
+    global selection_anchor
+    items = todo_grid.items
+    anchor_index = items.index(selection_anchor) if extend and selection_anchor is not None else None
+    if anchor_index is not None:
+        index = items.index(todo_id)
+        first, last = sorted((anchor_index, index))
+        selected.update(items.ids[first:last + 1])
+    else:
+        selected.symmetric_difference_update((todo_id,))
+        selection_anchor = todo_id
+    selection_changed()
+
+def select_all():
+    """Select every task in the current filter and search"""
+    set_selection(set(todo_grid.items.ids))
+
+def clear_selection():
+    set_selection(set())
+
+def on_select_all_key(e):
+    # Entries keep Ctrl+A for their own text
+    if isinstance(e.widget, tk.Entry) or main_page is None or not main_page.winfo_ismapped():
+        return
+    select_all()
+
+def on_selection_store_change(event, tasks):
+    if not selected or event not in ("remove", "clear"):
+        return
+    if event == "clear":
+        selected.clear()
+    else:
+        selected.difference_update(task.id for task in tasks)
+    update_selection_bar()
+
+def complete_selected(status):
+    """Mark every selected task completed (or active) in one store update"""
+    changed = store.set_status_many(sorted(selected), status)
+    count = len(changed)
+    clear_selection()
+    if status:
+        show_toast(f"Completed {count} task{'s' if count != 1 else ''}! 🎉", "success", 1500)
+    else:
+        show_toast(f"Marked {count} task{'s' if count != 1 else ''} as active", "info", 1500)
+
+def delete_selected():
+    """Delete every selected task in one store update (undoable as one step)"""
+    count = len(selected)
+    store.remove_many(sorted(selected))
+    clear_selection()
+    show_toast(f"Deleted {count} task{'s' if count != 1 else ''}!", "error", UNDO_TOAST_MS,
+               action=("Undo", undo_last))
+    update_add_button()
+
+def update_selection_bar():
+    """Show the batch actions while anything is selected"""
+    if selected:
+        selection_label.configure(text=f"{len(selected)} selected")
+        if not selection_bar.winfo_ismapped():
+            selection_bar.pack(fill="x", padx=20, pady=(0, 5), before=canvas.master)
+    else:
+        selection_bar.pack_forget()
 
-# Placeholder text
-placeholder_text = "What needs to be done?"
+def build_selection_bar(parent):
+    global selection_bar, selection_label
+    
+    selection_bar = tk.Frame(parent, bg=COLORS["bg_light"], padx=8, pady=5)
+    selection_label = tk.Label(selection_bar, font=("Arial", 9, "bold"),
+                               bg=COLORS["bg_light"], fg=COLORS["accent"])
+    selection_label.pack(side=tk.LEFT)
+    
+    actions = [
+        ("✕", COLORS["secondary"], COLORS["card_hover"], clear_selection),
+        ("🗑 Delete", COLORS["danger"], COLORS["danger_hover"], delete_selected),
+        ("↩ Active", COLORS["secondary"], COLORS["card_hover"], lambda: complete_selected(False)),
+        ("✓ Done", COLORS["success"], COLORS["success_hover"], lambda: complete_selected(True)),
+        ("Select all", COLORS["secondary"], COLORS["card_hover"], select_all),
+    ]
+    for text, color, hover_color, command in actions:
+        btn = tk.Button(selection_bar, text=text, font=("Arial", 9), bg=color, fg="white",
+                        relief=tk.FLAT, cursor="hand2", padx=6, command=command)
+        btn.pack(side=tk.RIGHT, padx=(5, 0))
+        create_hover_effect(btn, color, hover_color)
 
+# ============= INPUT SECTION =============
 def on_entry_focus_in(e):
     if todo_entry.get() == placeholder_text:
         todo_entry.delete(0, tk.END)
@@ -605,75 +1809,525 @@ def on_entry_focus_out(e):
         todo_entry.insert(0, placeholder_text)
         todo_entry.configure(fg=COLORS["text_light"])
 
-todo_entry.insert(0, placeholder_text)
-todo_entry.configure(fg=COLORS["text_light"])
-todo_entry.bind("<FocusIn>", on_entry_focus_in)
-todo_entry.bind("<FocusOut>", on_entry_focus_out)
-
 def add_todo():
     text = todo_entry.get().strip()
     if text and text != placeholder_text:
-        new_todo = {
-            "id": len(todos) + 1 if not todos else max(t["id"] for t in todos) + 1,
-            "text": text,
-            "status": False
-        }
-        todos.append(new_todo)
+        # A trailing "@when" sets the due date
+        text, due = split_due(text)
+        try:
+            store.add(text, due=due)
+        except sqlite3.OperationalError as e:
+            # No leased id was left and another process holds the database
+            show_toast(f"Could not add the task: {e}", "error", 4000)
+            return
         todo_entry.delete(0, tk.END)
-        refresh_todos()
-        show_toast("Task added successfully! ✨", "success", 1500)
+        if due is None:
+            show_toast("Task added successfully! ✨", "success", 1500)
+        else:
+            show_toast(f"Task added, due {short_due(due)} ⏰", "success", 1500)
         todoLimiter()
     else:
         show_warning("Empty Task", "Please enter a task description!")
 
 def todoLimiter():
-    if len(todos) >= 10:
+    if TASK_LIMIT is not None and len(store) >= TASK_LIMIT:
         todo_btnsADD.pack_forget()
-        show_warning("Limit Reached", "Maximum of 10 tasks reached!\nComplete some tasks first.")
+        show_warning("Limit Reached", f"Maximum of {TASK_LIMIT} tasks reached!\nComplete some tasks first.")
 
 def todo_deleter():
-    if todos:
-        if show_confirm("Clear All Tasks", "Are you sure you want to delete ALL tasks?\nThis cannot be undone."):
-            todos.clear()
-            refresh_todos()
-            show_toast("All tasks cleared!", "info", 1500)
-            todo_btnsADD.pack(side=tk.LEFT, padx=(0, 10))
-
-# Buttons container
-btn_container = tk.Frame(input_inner, bg=COLORS["bg_light"])
-btn_container.pack(fill="x", pady=(15, 0))
-
-todo_btnsADD = tk.Button(btn_container, text="➕ Add Task", command=add_todo,
-                         bg=COLORS["primary"], fg="white",
-                         font=("Arial", 11, "bold"), relief=tk.FLAT, cursor="hand2",
-                         padx=20, pady=8, activebackground=COLORS["primary_hover"])
-todo_btnsADD.pack(side=tk.LEFT, padx=(0, 10))
-
-todo_reset = tk.Button(btn_container, text="🗑 Clear All", command=todo_deleter,
-                       bg=COLORS["danger"], fg="white", font=("Arial", 10),
-                       relief=tk.FLAT, cursor="hand2", padx=15, pady=8,
-                       activebackground=COLORS["danger_hover"])
-todo_reset.pack(side=tk.LEFT)
-
-# Keyboard shortcut hint
-hint_label = tk.Label(btn_container, text="Press Enter to add", font=("Arial", 9),
-                      bg=COLORS["bg_light"], fg=COLORS["text_light"])
-hint_label.pack(side=tk.RIGHT)
-
-# Hover effects for buttons
-def create_hover_effect(button, normal_color, hover_color):
-    button.bind("<Enter>", lambda e: button.configure(bg=hover_color))
-    button.bind("<Leave>", lambda e: button.configure(bg=normal_color))
-
-create_hover_effect(todo_btnsADD, COLORS["primary"], COLORS["primary_hover"])
-create_hover_effect(todo_reset, COLORS["danger"], COLORS["danger_hover"])
+    if store:
+        store.clear()
+        show_toast("All tasks cleared!", "info", UNDO_TOAST_MS, action=("Undo", undo_last))
+        update_add_button()
+
+def update_add_button():
+    """Show the add button only while below TASK_LIMIT"""
+    if TASK_LIMIT is not None and len(store) >= TASK_LIMIT:
+        todo_btnsADD.pack_forget()
+    else:
+        todo_btnsADD.pack(side=tk.LEFT, padx=(0, 10), before=todo_reset)
 
 # Bind Enter key to add todo
 def on_enter_key(e):
     if todo_entry.get() != placeholder_text:
         add_todo()
 
-todo_entry.bind("<Return>", on_enter_key)
+def build_input_section(parent):
+    global todo_entry, todo_btnsADD, todo_reset
+    
+    input_frame = tk.Frame(parent, bg=COLORS["bg_light"], pady=20)
+    input_frame.pack(side=tk.BOTTOM, fill="x")
+    
+    input_inner = tk.Frame(input_frame, bg=COLORS["bg_light"])
+    input_inner.pack(fill="x", padx=20)
+    
+    # Label with icon
+    label_frame = tk.Frame(input_inner, bg=COLORS["bg_light"])
+    label_frame.pack(fill="x", pady=(0, 10))
+    
+    tk.Label(label_frame, text="✏️", font=("Segoe UI Emoji", 12),
+             bg=COLORS["bg_light"]).pack(side=tk.LEFT)
+    tk.Label(label_frame, text=" Add New Task", font=("Arial", 12, "bold"),
+             bg=COLORS["bg_light"], fg=COLORS["text"]).pack(side=tk.LEFT)
+    
+    # Entry with styling
+    entry_frame = tk.Frame(input_inner, bg=COLORS["border"], padx=2, pady=2)
+    entry_frame.pack(fill="x")
+    
+    entry_inner = tk.Frame(entry_frame, bg=COLORS["secondary"])
+    entry_inner.pack(fill="x")
+    
+    todo_entry = tk.Entry(entry_inner, width=35, font=("Arial", 12), relief=tk.FLAT,
+                          bg=COLORS["secondary"], fg=COLORS["text"], insertbackground=COLORS["text"])
+    todo_entry.pack(fill="x", ipady=10, padx=10)
+    
+    todo_entry.insert(0, placeholder_text)
+    todo_entry.configure(fg=COLORS["text_light"])
+    todo_entry.bind("<FocusIn>", on_entry_focus_in)
+    todo_entry.bind("<FocusOut>", on_entry_focus_out)
+    
+    # Buttons container
+    btn_container = tk.Frame(input_inner, bg=COLORS["bg_light"])
+    btn_container.pack(fill="x", pady=(15, 0))
+    
+    todo_btnsADD = tk.Button(btn_container, text="➕ Add Task", command=add_todo,
+                             bg=COLORS["primary"], fg="white",
+                             font=("Arial", 11, "bold"), relief=tk.FLAT, cursor="hand2",
+                             padx=20, pady=8, activebackground=COLORS["primary_hover"])
+    todo_btnsADD.pack(side=tk.LEFT, padx=(0, 10))
+    
+    todo_reset = tk.Button(btn_container, text="🗑 Clear All", command=todo_deleter,
+                           bg=COLORS["danger"], fg="white", font=("Arial", 10),
+                           relief=tk.FLAT, cursor="hand2", padx=15, pady=8,
+                           activebackground=COLORS["danger_hover"])
+    todo_reset.pack(side=tk.LEFT)
+    
+    # Keyboard shortcut hint
+    hint_label = tk.Label(btn_container, text="Press Enter to add", font=("Arial", 9),
+                          bg=COLORS["bg_light"], fg=COLORS["text_light"])
+    hint_label.pack(side=tk.RIGHT)
+    
+    create_hover_effect(todo_btnsADD, COLORS["primary"], COLORS["primary_hover"])
+    create_hover_effect(todo_reset, COLORS["danger"], COLORS["danger_hover"])
+    
+    todo_entry.bind("<Return>", on_enter_key)
+
+# ============= INSTRUMENTATION =============
+# Opt in with --metrics [PATH] or TAPP_METRICS=PATH; the metrics are
+# written to PATH as JSON on exit, and F12 toggles the overlay
+DEFAULT_METRICS_PATH = "tapp-metrics.json"
+METRICS_TIMED = ("refresh_todos", "create_todo_card", "update_progress")
+
+# How often the lag monitor expects to run, and the overlay is redrawn
+LAG_TICK_MS = 100
+OVERLAY_REFRESH_MS = 1000
+
+metrics = Metrics()
+metrics_path = os.environ.get("TAPP_METRICS")
+metrics_overlay = None
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+def start_metrics():
+    """Wrap the timed functions and start the lag monitor and overlay"""
+    global metrics_overlay
+    module = globals()
+    for name in METRICS_TIMED:
+        module[name] = metrics.timed(name, module[name])
+    metrics.enabled = True
+    
+    metrics_overlay = tk.Label(root, font=("Courier", 8), justify="left", anchor="w",
+                               bg=COLORS["bg_light"], fg=COLORS["accent"], padx=6, pady=4)
+    root.bind("<F12>", toggle_metrics_overlay)
+    root.after(LAG_TICK_MS, lag_tick, time.perf_counter() + LAG_TICK_MS / 1000)
+    refresh_metrics_overlay()
+
+def lag_tick(expected):
+    """Record how late this tick ran, which is how long the loop was busy"""
+    now = time.perf_counter()
+    metrics.observe("event_loop_lag", max(0.0, (now - expected) * 1000))
+    root.after(LAG_TICK_MS, lag_tick, now + LAG_TICK_MS / 1000)
+
+def sample_metrics_gauges():
+    metrics.set_gauge("widgets", count_widgets(root))
+    metrics.set_gauge("after_callbacks", len(root.tk.splitlist(root.tk.call("after", "info"))))
+
+def refresh_metrics_overlay():
+    sample_metrics_gauges()
+    if metrics_overlay.winfo_ismapped():
+        metrics_overlay.configure(text=metrics.summary())
+        metrics_overlay.lift()
+    root.after(OVERLAY_REFRESH_MS, refresh_metrics_overlay)
+
+def toggle_metrics_overlay(e=None):
+    if metrics_overlay.winfo_ismapped():
+        metrics_overlay.place_forget()
+    else:
+        metrics_overlay.configure(text=metrics.summary())
+        metrics_overlay.place(relx=1, rely=1, x=-4, y=-4, anchor="se")
+        metrics_overlay.lift()
+
+# ============= DUE DATES =============
+# One timer per open list for its nearest deadline; when it passes the
+# card is restyled as overdue and a toast goes up
+DUE_TOAST_MS = 5000
+
+def start_reminders(task_list):
+    task_list.reminders = DueScheduler(task_list.store, root, lambda tasks: on_tasks_due(task_list, tasks))
+    task_list.reminders.attach()
+
+def on_tasks_due(task_list, tasks):
+    shown = task_list is current_list
+    if shown and main_page is not None:
+        renderer.mark_cards(tasks)
+    where = "" if shown else f" in {task_list.name}"
+    if len(tasks) == 1:
+        text = tasks[0].text
+        show_toast(f"Due now{where}: {text if len(text) <= 30 else text[:30] + '...'}", "warning", DUE_TOAST_MS)
+    else:
+        show_toast(f"{len(tasks)} tasks are due{where}", "warning", DUE_TOAST_MS)
+
+# ============= BACKGROUND WORK =============
+# Finished jobs and progress reports are applied from one recurring poll,
+# which runs while jobs are outstanding and spends at most the budget
+WORKER_POLL_MS = 30
+WORKER_DRAIN_BUDGET_MS = 10
+
+workers = WorkerPool()
+worker_poll_job = None
+
+def run_in_background(func, *args, **callbacks):
+    """Run func on a worker thread; the callbacks run on the Tk thread"""
+    global worker_poll_job
+    workers.submit(func, *args, **callbacks)
+    if worker_poll_job is None:
+        worker_poll_job = root.after(WORKER_POLL_MS, poll_workers)
+
+def poll_workers():
+    global worker_poll_job
+    worker_poll_job = None
+    try:
+        workers.drain(WORKER_DRAIN_BUDGET_MS)
+    finally:
+        if workers.busy:
+            worker_poll_job = root.after(WORKER_POLL_MS, poll_workers)
+
+# ============= MULTI-INSTANCE SYNC =============
+# Other processes on the same database (more windows, the CLI) log their
+# writes to the storage's change feed; it is polled on the serial worker
+# and only the tasks they changed are patched in. Only the list on screen
+# is followed; an open list catches up when it is shown again.
+FEED_POLL_MS = 500
+
+# A feed read or page load that failed (e.g. another process held the
+# database too long) is retried, waiting twice as long each time up to this
+RETRY_MAX_MS = 30000
+
+feed = None
+feed_job = None
+feed_failures = 0
+
+def retry_delay(failures):
+    """Wait before retrying a database job that failed failures times in a row"""
+    return min(FEED_POLL_MS * 2 ** failures, RETRY_MAX_MS)
+
+def schedule_feed_poll(delay_ms=FEED_POLL_MS):
+    global feed_job
+    if feed_job is None:
+        feed_job = root.after(delay_ms, poll_feed)
+
+def poll_feed():
+    global feed_job
+    feed_job = None
+    task_list = current_list
+    # Queue our own pending writes first, so they are in the feed before it is read
+    storage.flush()
+    run_in_background(feed.read, serial=True, on_done=lambda entries: on_feed_read(task_list, entries),
+                      on_error=lambda e: on_feed_error(task_list, e))
+
+def on_feed_read(task_list, entries):
+    global feed_failures
+    if task_list.storage is None:
+        return  # closed meanwhile
+    feed_failures = 0
+    if entries is None:
+        resync_tasks(task_list)
+        return
+    task_list.feed.apply(entries)
+    if task_list is current_list:
+        # A full page means there is more to catch up on
+        schedule_feed_poll(0 if len(entries) >= FEED_PAGE_SIZE else FEED_POLL_MS)
+
+def on_feed_error(task_list, e):
+    global feed_failures
+    if task_list.storage is None or task_list is not current_list:
+        return  # showing the list again polls afresh
+    if feed_failures == 0:
+        show_toast(f"Could not sync tasks: {e} (retrying)", "warning", 4000)
+    feed_failures += 1
+    schedule_feed_poll(retry_delay(feed_failures))
+
+def resync_tasks(task_list):
+    """Reload every task of a list after falling behind a compacted feed"""
+    task_list.journal.clear()
+    task_list.loaded = False
+    list_store = task_list.store
+    list_store.remote = True
+    try:
+        list_store.clear()
+    finally:
+        list_store.remote = False
+    start_resync(task_list)
+
+def start_resync(task_list, failures=0):
+    if task_list.storage is None:
+        return
+    
+    def failed(e):
+        if failures == 0:
+            show_toast(f"Could not reload tasks: {e} (retrying)", "warning", 4000)
+        root.after(retry_delay(failures + 1), lambda: start_resync(task_list, failures + 1))
+    
+    run_in_background(restart_feed, task_list, serial=True,
+                      on_done=lambda last_id: load_tasks(task_list, 0, last_id), on_error=failed)
+
+def restart_feed(task_list):
+    task_list.feed.start()
+    return task_list.storage.max_id()
+
+# ============= TASK LISTS =============
+# Named lists, each in a database of its own. Only the list on screen is
+# rendered and followed; the lists used most recently stay open with their
+# indexes, views and undo history, so switching back to one is a swap.
+# The others are saved and closed, and load again when they are shown.
+lists = ListCache()
+lists.put(current_list)
+
+def use_list(task_list):
+    """Point the module globals, and the screen's store listeners, at a list"""
+    global current_list, store, search_index, tag_index, journal, filter_views, view_scroll, storage, feed
+    if main_page is not None:
+        store.unsubscribe(renderer.on_change)
+        store.unsubscribe(on_selection_store_change)
+        task_list.store.subscribe(renderer.on_change)
+        task_list.store.subscribe(on_selection_store_change)
+    current_list = task_list
+    store = task_list.store
+    search_index = task_list.search_index
+    tag_index = task_list.tag_index
+    journal = task_list.journal
+    filter_views = task_list.views
+    view_scroll = task_list.view_scroll
+    storage = task_list.storage
+    feed = task_list.feed
+
+def switch_list(name):
+    """Show another list, opening it first if it is not open"""
+    global feed_job
+    if name == current_list.name:
+        return
+    if not search_query:
+        view_scroll[view_key()] = canvas.canvasy(0)
+    if storage is not None:
+        storage.flush()
+    if feed_job is not None:
+        root.after_cancel(feed_job)
+        feed_job = None
+    task_list = lists.get(name)
+    cold = task_list is None
+    if cold:
+        task_list = TaskList(name)
+    use_list(task_list)
+    # Selected ids and pending card restyles belong to the list left behind
+    set_selection(set())
+    renderer.cards.clear()
+    close_lists(lists.put(task_list))
+    list_choice.set(name)
+    list_button.configure(text=f" {name} ▾")
+    refresh_todos()
+    renderer.mark("stats")
+    update_add_button()
+    if cold:
+        # The first page is just what fills the grid; the rest pages in behind it
+        open_list(task_list, first_page=todo_grid.capacity())
+    elif task_list.loaded:
+        schedule_feed_poll(0)
+
+def close_lists(task_lists):
+    """Save lists dropped from the cache and let them go"""
+    for task_list in task_lists:
+        if task_list.reminders is not None:
+            task_list.reminders.detach()
+        task_list.journal.clear()
+        list_storage, task_list.storage = task_list.storage, None
+        if list_storage is not None:
+            list_storage.flush()
+            # Closes after the writes just queued on the serial worker
+            run_in_background(list_storage.close, serial=True)
+
+def build_list_menu():
+    """Fill the list menu with the saved lists each time it opens"""
+    list_menu.delete(0, tk.END)
+    for name in list_names():
+        list_menu.add_radiobutton(label=name, value=name, variable=list_choice,
+                                  command=lambda n=name: switch_list(n))
+    list_menu.add_separator()
+    list_menu.add_command(label="＋ New list…", command=new_list)
+
+def new_list():
+    name = show_prompt("New List", "Name of the new list:")
+    if name is None:
+        return
+    try:
+        name = check_list_name(name)
+    except ValueError as e:
+        show_warning("Invalid Name", f"Could not use that name: {e}")
+        return
+    switch_list(name)
 
 # ============= START APPLICATION =============
-root.mainloop()
+flush_job = None
+
+def schedule_flush():
+    """Write pending changes shortly after the first one in a burst"""
+    global flush_job
+    if flush_job is None:
+        flush_job = root.after(FLUSH_DELAY_MS, flush_storage)
+
+def flush_storage():
+    global flush_job
+    flush_job = None
+    for task_list in lists:
+        if task_list.storage is not None:
+            task_list.storage.flush()
+
+def write_in_background(write, changes, on_error):
+    """Storage writer: all database access runs in order on the serial worker"""
+    
+    def failed(e):
+        show_toast(f"Could not save tasks: {e}", "error", 4000)
+        if on_error is not None:
+            on_error(e)
+    
+    run_in_background(write, changes, serial=True, on_error=failed)
+
+def open_storage():
+    """Open the database of the list on screen and start paging tasks in"""
+    open_list(current_list)
+
+def open_list(task_list, first_page=LOAD_PAGE_SIZE):
+    """Open a list's database and start paging its tasks in"""
+    global storage, feed
+    path = list_path(task_list.name)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    list_storage = SQLiteStorage(path, on_dirty=schedule_flush, writer=write_in_background)
+    list_storage.attach(task_list.store)
+    task_list.store.allocate_ids = list_storage.lease_ids
+    # Large undo steps are spilled to disk and read back on the workers
+    task_list.journal.run_io = run_in_background
+    task_list.storage = list_storage
+    task_list.feed = ChangeFeed(list_storage, task_list.store)
+    task_list.feed.start()
+    start_reminders(task_list)
+    if task_list is current_list:
+        storage, feed = task_list.storage, task_list.feed
+    # Ids up to the saved maximum are taken, even before their page is in
+    last_id = list_storage.max_id()
+    task_list.store.reserve_ids(last_id)
+    # From here on only the serial worker uses the connection
+    list_storage.prefetch_ids()
+    load_tasks(task_list, 0, last_id, first_page)
+
+def load_tasks(task_list, after_id, last_id, limit=LOAD_PAGE_SIZE, failures=0):
+    """Read the next page of a list's saved tasks on the serial worker"""
+    if task_list.storage is None:
+        return
+    
+    def failed(e):
+        # Retry the same page, so loading never stops halfway
+        if failures == 0:
+            show_toast(f"Could not load tasks: {e} (retrying)", "warning", 4000)
+        root.after(retry_delay(failures + 1), lambda: load_tasks(task_list, after_id, last_id, limit, failures + 1))
+    
+    task_list.storage.flush()
+    run_in_background(task_list.storage.load_page, after_id, last_id, limit, serial=True,
+                      on_done=lambda rows: on_tasks_loaded(task_list, rows, last_id, limit), on_error=failed)
+
+def on_tasks_loaded(task_list, rows, last_id, limit):
+    if task_list.storage is None:
+        return  # closed before it finished loading
+    task_list.store.load(rows)
+    if len(rows) == limit:
+        load_tasks(task_list, rows[-1][0], last_id)
+        return
+    task_list.loaded = True
+    # Now that its size is known the cache may have to let older lists go
+    close_lists(lists.trim())
+    if task_list is current_list:
+        # Follow the feed once every task is in, so changes to tasks still
+        # to be loaded are not mistaken for new ones
+        schedule_feed_poll(0)
+
+def on_close():
+    if flush_job is not None:
+        root.after_cancel(flush_job)
+    if worker_poll_job is not None:
+        root.after_cancel(worker_poll_job)
+    for task_list in lists:
+        if task_list.reminders is not None:
+            task_list.reminders.detach()
+    if feed_job is not None:
+        root.after_cancel(feed_job)
+    # Let queued writes finish; running imports and exports are cancelled
+    workers.shutdown()
+    for task_list in lists:
+        if task_list.storage is not None:
+            task_list.storage.close()
+        task_list.journal.clear()
+    if metrics.enabled:
+        sample_metrics_gauges()
+        metrics.dump(metrics_path)
+    root.destroy()
+
+def main(argv=None):
+    global root, first_paint_ms, card_renderer, metrics_path
+    started = time.perf_counter()
+    
+    parser = argparse.ArgumentParser(description="T@PP - Todo App")
+    parser.add_argument("--renderer", choices=CARD_RENDERERS,
+                        help="draw cards from widgets or as canvas items (default: TAPP_RENDERER or widgets)")
+    parser.add_argument("--metrics", nargs="?", const=DEFAULT_METRICS_PATH, metavar="PATH",
+                        help=f"collect performance metrics and write them to PATH on exit "
+                             f"(default: {DEFAULT_METRICS_PATH})")
+    args = parser.parse_args(argv)
+    card_renderer = args.renderer or card_renderer
+    if card_renderer not in CARD_RENDERERS:
+        parser.error(f"unknown renderer {card_renderer!r} in TAPP_RENDERER")
+    metrics_path = args.metrics or metrics_path
+    if metrics_path in ("1", "true", "yes"):
+        metrics_path = DEFAULT_METRICS_PATH
+    
+    root = tk.Tk()
+    root.title("T@PP - Todo App")
+    root.geometry("550x700")
+    root.configure(bg=COLORS["bg"])
+    root.resizable(True, True)
+    root.protocol("WM_DELETE_WINDOW", on_close)
+    if metrics_path:
+        start_metrics()
+    
+    build_welcome_page()
+    
+    if os.environ.get("TAPP_STARTUP_TIMING"):
+        root.wait_visibility(welcome)
+        root.update_idletasks()
+        first_paint_ms = (time.perf_counter() - started) * 1000
+        print(f"Welcome screen painted in {first_paint_ms:.1f} ms", file=sys.stderr)
+    
+    # Storage opens once the welcome screen is up
+    root.after_idle(open_storage)
+    root.mainloop()
+
+if __name__ == "__main__":
+    main()
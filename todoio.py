@@ -0,0 +1,184 @@
+"""Streaming JSONL/CSV import and export for the T@PP task store"""
+import csv
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+
+from todocore import NORMAL, PRIORITY_NAMES
+from todoreminders import format_due, parse_due
+
+# Records parsed and validated before each insert into the store
+IMPORT_BATCH_SIZE = 5000
+
+# Seconds a partial batch of streamed input may wait for more before it is written
+STREAM_FLUSH_S = 0.2
+
+# Tasks written between progress reports while exporting
+EXPORT_REPORT_EVERY = 5000
+
+TRUE_STRINGS = {"1", "true", "yes", "y", "done", "x"}
+
+def is_csv(path):
+    return path.lower().endswith(".csv")
+
+def read_records(path):
+    """Yield raw records from a .csv or .jsonl file one line at a time.
+    
+    Lines that are not valid JSON come out as None so they can be counted.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from parse_records(f, is_csv(path))
+
+def parse_records(f, csv_format):
+    if csv_format:
+        yield from csv.DictReader(f)
+        return
+    for line in f:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+def parse_priority(value):
+    """A priority from a number or a name such as "high"; NORMAL when unrecognised"""
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value in PRIORITY_NAMES:
+            return PRIORITY_NAMES.index(value)
+        try:
+            value = int(value)
+        except ValueError:
+            return NORMAL
+    if isinstance(value, bool) or not isinstance(value, int):
+        return NORMAL
+    return value if 0 <= value < len(PRIORITY_NAMES) else NORMAL
+
+def validate_record(record):
+    """Turn a raw record into a (text, status, priority, due) row, or None if it is unusable"""
+    if not isinstance(record, dict):
+        return None
+    text = record.get("text")
+    if not isinstance(text, str) or not text.strip():
+        return None
+    status = record.get("status", False)
+    if isinstance(status, str):
+        status = status.strip().lower() in TRUE_STRINGS
+    try:
+        due = parse_due(record.get("due"))
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return text.strip(), bool(status), parse_priority(record.get("priority", NORMAL)), due
+
+def batched(iterable, size, wait=None):
+    """Yield lists of up to size items.
+    
+    With wait, the items are pulled on a helper thread and a partial batch
+    comes out wait seconds after its first item, so a slow producer's items
+    are not held back until a whole batch has arrived.
+    """
+    if wait is None:
+        iterator = iter(iterable)
+        while batch := list(itertools.islice(iterator, size)):
+            yield batch
+        return
+    items = queue.Queue(size)
+    end = object()
+    failure = []
+    
+    def pull():
+        try:
+            for item in iterable:
+                items.put(item)
+        except BaseException as e:
+            failure.append(e)
+        finally:
+            items.put(end)
+    
+    threading.Thread(target=pull, name="batched", daemon=True).start()
+    batch = []
+    deadline = None
+    while True:
+        try:
+            item = items.get(timeout=max(deadline - time.monotonic(), 0) if batch else None)
+        except queue.Empty:
+            yield batch
+            batch = []
+            continue
+        if item is end:
+            break
+        if not batch:
+            deadline = time.monotonic() + wait
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+    if failure:
+        raise failure[0]
+
+def row_batches(f, csv_format, batch_size=IMPORT_BATCH_SIZE, wait=None):
+    """Yield (rows, skipped) for an open file, such as stdin, one batch of valid rows at a time.
+    
+    skipped counts the unusable records seen so far. The last batch may be
+    empty, so the final skipped count always comes out. wait is passed on
+    to batched() for input that arrives over time.
+    """
+    skipped = 0
+    
+    def valid_rows():
+        nonlocal skipped
+        for record in parse_records(f, csv_format):
+            row = validate_record(record)
+            if row is None:
+                skipped += 1
+            else:
+                yield row
+    
+    for batch in batched(valid_rows(), batch_size, wait):
+        yield batch, skipped
+    yield [], skipped
+
+def import_batches(path, batch_size=IMPORT_BATCH_SIZE):
+    """Yield (rows, skipped, done) for a file, one batch of valid rows at a time.
+    
+    done is the share of the file read so far; see row_batches() for the
+    rest. Touches no store, so it can run on a worker thread.
+    """
+    size = os.path.getsize(path) or 1
+    with open(path, newline="", encoding="utf-8") as f:
+        for rows, skipped in row_batches(f, is_csv(path), batch_size):
+            yield rows, skipped, min(f.buffer.tell() / size, 1.0)
+
+def task_record(task):
+    """The JSON record a task is exported as"""
+    return {"id": task.id, "text": task.text, "status": task.status,
+            "priority": task.priority, "due": format_due(task.due)}
+
+def export_tasks(tasks, path, report=None, total=None):
+    """Write tasks (a store, or any iterable of them) to a .csv or .jsonl file.
+    
+    With report, the share of total (by default len(tasks)) written so far
+    is passed to it every EXPORT_REPORT_EVERY tasks.
+    """
+    total = (len(tasks) if total is None else total) or 1
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = None
+        if is_csv(path):
+            writer = csv.writer(f)
+            writer.writerow(["id", "text", "status", "priority", "due"])
+        for task in tasks:
+            if writer is not None:
+                writer.writerow((task.id, task.text, int(task.status), task.priority, format_due(task.due) or ""))
+            else:
+                f.write(json.dumps(task_record(task)) + "\n")
+            count += 1
+            if report is not None and count % EXPORT_REPORT_EVERY == 0:
+                report(count / total)
+    return count
@@ -0,0 +1,279 @@
+"""Undo/redo journal for the T@PP task store"""
+import os
+import tempfile
+from array import array
+from collections import deque
+
+from todoio import IMPORT_BATCH_SIZE, batched, export_tasks, read_records
+from todoreminders import parse_due
+
+# Memory the undo and redo history may use together, in (estimated) bytes
+JOURNAL_MEMORY_LIMIT = 8 * 1024 * 1024
+
+# Steps kept in each direction, however small they are
+JOURNAL_MAX_STEPS = 200
+
+# Removed tasks beyond this many are written to a temporary JSONL file
+# instead of being kept in memory until they are restored
+SPILL_ROWS = 1000
+
+# Rough per-task overhead of a kept (id, text, status, priority, due) row in bytes
+ROW_OVERHEAD = 120
+
+STEP_LABELS = {"add": "add", "update": "change", "remove": "delete", "clear": "clear"}
+
+class Step:
+    """One undoable change, stored as the operation that reverses it.
+    
+    kind is "remove" (data holds ids), "restore" (data holds id-ordered
+    rows, or path names the JSONL file they were spilled to) or "update"
+    (data holds the previous (id, text, status, priority, due) rows).
+    While a spill is still being written in the background, a restore
+    step has both: data holds the removed tasks until the file is done.
+    """
+    
+    __slots__ = ("kind", "label", "data", "path", "size")
+    
+    def __init__(self, kind, label, data=None, path=None):
+        self.kind = kind
+        self.label = label
+        self.data = data
+        self.path = path
+        if path is not None:
+            self.size = ROW_OVERHEAD
+        elif kind == "remove":
+            self.size = 64 if isinstance(data, range) else 8 * len(data)
+        else:
+            self.size = sum(ROW_OVERHEAD + len(row[1]) for row in data)
+    
+    def discard(self):
+        if self.path is not None:
+            remove_file(self.path)
+            self.path = None
+
+def compact_ids(ids):
+    """A range for consecutive ids (as adds produce), else a packed array"""
+    if ids and ids[-1] - ids[0] == len(ids) - 1:
+        return range(ids[0], ids[-1] + 1)
+    return array("q", ids)
+
+def restore_step(label, tasks, run_io=None):
+    """Step that puts tasks back, spilling large batches to disk.
+    
+    With run_io the spill file is written on a worker; the step keeps the
+    tasks (no longer in the store, so nothing changes them) until then.
+    """
+    if len(tasks) <= SPILL_ROWS:
+        return Step("restore", label, task_rows(tasks))
+    fd, path = tempfile.mkstemp(prefix="tapp-undo-", suffix=".jsonl")
+    os.close(fd)
+    if run_io is None:
+        write_spill(tasks, path)
+        return Step("restore", label, path=path)
+    step = Step("restore", label, path=path)
+    step.data = tasks
+    
+    def written(count):
+        step.data = None
+        if step.path is None:  # discarded while it was being written
+            remove_file(path)
+    
+    def failed(e):
+        # Keep the rows in memory instead
+        step.data = task_rows(tasks)
+        step.path = None
+        remove_file(path)
+    
+    run_io(write_spill, tasks, path, on_done=written, on_error=failed)
+    return step
+
+def write_spill(tasks, path):
+    """Write removed tasks to a spill file in id order, as restore() takes them"""
+    return export_tasks(sorted(tasks, key=lambda task: task.id), path)
+
+def remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def task_rows(tasks):
+    return [(task.id,) + task.fields() for task in sorted(tasks, key=lambda task: task.id)]
+
+def read_spill(path):
+    """Yield the rows of a spill file in batches"""
+    records = read_records(path)
+    rows = ((record["id"], record["text"], record["status"], record["priority"], parse_due(record["due"]))
+            for record in records)
+    yield from batched(rows, IMPORT_BATCH_SIZE)
+
+def report_spill(path, report):
+    """Pass the rows of a spill file to report in batches, for a worker"""
+    for rows in read_spill(path):
+        report(rows)
+
+def restore_rows(step):
+    """Yield the rows of a restore step in batches"""
+    if step.data is None:
+        yield from read_spill(step.path)
+    elif step.path is None:
+        yield from batched(step.data, IMPORT_BATCH_SIZE)
+    else:
+        yield from batched(task_rows(step.data), IMPORT_BATCH_SIZE)
+
+class UndoJournal:
+    """Bounded undo/redo history for a TaskStore.
+    
+    Every store notification becomes one step holding only its inverse:
+    the ids of added tasks, the previous fields of updated ones, or the
+    rows of removed ones (spilled to a temporary file when there are many,
+    so undoing a clear never keeps a copy of a large list in memory). The
+    oldest steps are dropped once the history passes its memory limit.
+    
+    Set run_io to a function like WorkerPool.submit (func, *args,
+    on_done=, on_error=, on_progress=) to write and read spill files on a
+    worker. A spilled step is then put back in batches as they are read;
+    busy is True until it is done, and undo() and redo() wait for it.
+    Without run_io, spill files are written and read in place.
+    """
+    
+    def __init__(self, store, memory_limit=JOURNAL_MEMORY_LIMIT, max_steps=JOURNAL_MAX_STEPS):
+        self.store = store
+        self.memory_limit = memory_limit
+        self.max_steps = max_steps
+        self.undo_steps = deque()
+        self.redo_steps = deque()
+        self.size = 0
+        self.run_io = None
+        self.busy = False
+        self._applying = False
+        self._recorded = 0  # steps recorded so far, to spot changes made during a restore
+    
+    def attach(self):
+        self.store.subscribe(self.on_change)
+    
+    def detach(self):
+        self.store.unsubscribe(self.on_change)
+    
+    @property
+    def can_undo(self):
+        return bool(self.undo_steps)
+    
+    @property
+    def can_redo(self):
+        return bool(self.redo_steps)
+    
+    def on_change(self, event, tasks):
+        # Changes made by another process are not ours to undo
+        if self._applying or event == "load" or self.store.remote or not tasks:
+            return
+        label = STEP_LABELS[event]
+        if event == "add":
+            step = Step("remove", label, compact_ids([task.id for task in tasks]))
+        elif event == "update":
+            before = self.store.before
+            step = Step("update", label, [(task.id,) + before[task.id] for task in tasks])
+        else:
+            step = restore_step(label, tasks, self.run_io)
+        self._recorded += 1
+        self._clear(self.redo_steps)
+        self._push(self.undo_steps, step)
+    
+    def undo(self):
+        """Reverse the latest step and return its label, or None"""
+        return self._move(self.undo_steps, self.redo_steps)
+    
+    def redo(self):
+        """Apply the latest undone step again and return its label, or None"""
+        return self._move(self.redo_steps, self.undo_steps)
+    
+    def clear(self):
+        self._clear(self.undo_steps)
+        self._clear(self.redo_steps)
+    
+    def _move(self, source, target):
+        if not source or self.busy:
+            return None
+        step = source.pop()
+        self.size -= step.size
+        if step.kind == "restore" and step.data is None and self.run_io is not None:
+            self._restore_spilled(step, target)
+            return step.label
+        self._applying = True
+        try:
+            inverse = self._apply(step)
+        finally:
+            self._applying = False
+            step.discard()
+        self._push(target, inverse)
+        return step.label
+    
+    def _apply(self, step):
+        """Carry out a step and return the step that reverses it"""
+        store = self.store
+        if step.kind == "remove":
+            ids = [task_id for task_id in step.data if task_id in store]
+            inverse = restore_step(step.label, [store.get(task_id) for task_id in ids], self.run_io)
+            store.remove_many(ids)
+            return inverse
+        if step.kind == "update":
+            rows = [row for row in step.data if row[0] in store]
+            current = [(task.id,) + task.fields() for task in map(store.get, (row[0] for row in rows))]
+            store.update_many(rows)
+            return Step("update", step.label, current)
+        ids = array("q")
+        for rows in restore_rows(step):
+            rows = [row for row in rows if row[0] not in store]
+            store.restore(rows)
+            ids.extend(row[0] for row in rows)
+        return Step("remove", step.label, compact_ids(ids))
+    
+    def _restore_spilled(self, step, target):
+        """Read a spilled step on a worker and put its rows back as they arrive"""
+        store = self.store
+        ids = array("q")
+        recorded = self._recorded
+        self.busy = True
+        
+        def put_back(rows):
+            rows = [row for row in rows if row[0] not in store]
+            self._applying = True
+            try:
+                store.restore(rows)
+            finally:
+                self._applying = False
+            ids.extend(row[0] for row in rows)
+        
+        def finished(result=None):
+            self.busy = False
+            step.discard()
+            # A change made meanwhile started a new history; the inverse
+            # would no longer follow from it
+            if self._recorded == recorded:
+                self._push(target, Step("remove", step.label, compact_ids(ids)))
+        
+        self.run_io(report_spill, step.path, on_progress=put_back, on_done=finished, on_error=finished)
+    
+    def _push(self, steps, step):
+        steps.append(step)
+        self.size += step.size
+        while len(steps) > self.max_steps:
+            self._drop_oldest(steps)
+        # Over the memory limit the undo side goes first, it is the older
+        # history; the step just pushed is kept even if it alone is too big
+        while self.size > self.memory_limit:
+            oldest = self.undo_steps if self.undo_steps else self.redo_steps
+            if oldest is steps and len(steps) == 1:
+                break
+            self._drop_oldest(oldest)
+    
+    def _drop_oldest(self, steps):
+        step = steps.popleft()
+        self.size -= step.size
+        step.discard()
+    
+    def _clear(self, steps):
+        while steps:
+            step = steps.pop()
+            self.size -= step.size
+            step.discard()
@@ -0,0 +1,116 @@
+"""Named task lists for T@PP: one database per list and an LRU cache of open ones (no Tk)"""
+import os
+from urllib.parse import quote, unquote
+
+from todocore import SearchIndex, TagIndex, TaskStore
+from todojournal import UndoJournal
+from todostorage import DB_PATH
+
+# The list that lives in DB_PATH; every other list is a database of its own
+DEFAULT_LIST = "My Tasks"
+LISTS_DIR = os.environ.get("TAPP_LISTS_DIR", os.path.splitext(DB_PATH)[0] + "-lists")
+LIST_SUFFIX = ".db"
+MAX_LIST_NAME = 60
+
+# Open lists kept in memory besides the active one, and the memory they
+# may take together (estimated, in MB); the least recently used go first
+LIST_CACHE_SIZE = int(os.environ.get("TAPP_LIST_CACHE", "3"))
+LIST_CACHE_MB = float(os.environ.get("TAPP_LIST_CACHE_MB", "64"))
+
+# Rough memory per loaded task: the record, index entries and views, in bytes
+TASK_MEMORY_ESTIMATE = 600
+
+def check_list_name(name):
+    """The name with surrounding spaces removed; raises ValueError for unusable names"""
+    name = " ".join(name.split())
+    if not name:
+        raise ValueError("a list needs a name")
+    if len(name) > MAX_LIST_NAME:
+        raise ValueError(f"list names can have at most {MAX_LIST_NAME} characters")
+    return name
+
+def list_path(name, lists_dir=LISTS_DIR):
+    """Database file of a list; the name is kept in the file name"""
+    if name == DEFAULT_LIST:
+        return DB_PATH
+    return os.path.join(lists_dir, quote(name, safe=" ") + LIST_SUFFIX)
+
+def list_names(lists_dir=LISTS_DIR):
+    """The default list followed by every saved list, by name"""
+    try:
+        files = os.listdir(lists_dir)
+    except FileNotFoundError:
+        files = []
+    names = {unquote(f[:-len(LIST_SUFFIX)]) for f in files if f.endswith(LIST_SUFFIX)}
+    names.discard(DEFAULT_LIST)
+    return [DEFAULT_LIST] + sorted(names, key=str.casefold)
+
+class TaskList:
+    """One named list in memory: its store and everything that follows it.
+    
+    The search and tag indexes, the undo journal and the cache of filter
+    views are attached for the list's whole life, so a list that stays
+    open can be shown again without rebuilding any of them. storage, feed
+    and reminders are set by whoever opens the list's database.
+    """
+    
+    def __init__(self, name):
+        self.name = name
+        self.store = TaskStore()
+        self.search_index = SearchIndex()
+        self.search_index.attach(self.store)
+        self.tag_index = TagIndex()
+        self.tag_index.attach(self.store)
+        self.journal = UndoJournal(self.store)
+        self.journal.attach()
+        self.views = {}        # (filter text, sort) -> attached view
+        self.view_scroll = {}  # (filter text, sort) -> last scroll offset
+        self.storage = None
+        self.feed = None
+        self.reminders = None
+        self.loaded = False    # every saved page is in the store
+    
+    def memory_estimate(self):
+        return len(self.store) * TASK_MEMORY_ESTIMATE
+
+class ListCache:
+    """Open TaskLists by name, least recently used first.
+    
+    put() makes a list the most recent and returns the lists that no
+    longer fit, oldest first, for the caller to save and close. The most
+    recent list is always kept, however large it is. Memory is estimated
+    from the task counts when lists are put, so call trim() as lists grow.
+    """
+    
+    def __init__(self, max_lists=LIST_CACHE_SIZE + 1, max_mb=LIST_CACHE_MB):
+        self.max_lists = max(1, max_lists)
+        self.max_bytes = max_mb * 1024 * 1024
+        self._lists = {}  # name -> TaskList, least recent first
+    
+    def __len__(self):
+        return len(self._lists)
+    
+    def __iter__(self):
+        return iter(list(self._lists.values()))
+    
+    def __contains__(self, name):
+        return name in self._lists
+    
+    def get(self, name):
+        return self._lists.get(name)
+    
+    def put(self, task_list):
+        """Make task_list the most recently used and return the evicted lists"""
+        self._lists.pop(task_list.name, None)
+        self._lists[task_list.name] = task_list
+        return self.trim()
+    
+    def trim(self):
+        """Drop the least recently used lists until the rest fit, and return them"""
+        evicted = []
+        while len(self._lists) > 1 and (len(self._lists) > self.max_lists or self._size() > self.max_bytes):
+            evicted.append(self._lists.pop(next(iter(self._lists))))
+        return evicted
+    
+    def _size(self):
+        return sum(task_list.memory_estimate() for task_list in self._lists.values())
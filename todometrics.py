@@ -0,0 +1,110 @@
+"""Opt-in performance metrics for T@PP: timers, histograms and gauges (no Tk)"""
+import bisect
+import functools
+import json
+import time
+
+# Upper bounds of the histogram buckets in milliseconds; the last bucket
+# catches everything slower
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+class Histogram:
+    """Count, total, extremes and bucketed distribution of durations in ms"""
+    
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+    
+    def observe(self, ms):
+        self.count += 1
+        self.total += ms
+        self.min = ms if self.min is None else min(self.min, ms)
+        self.max = ms if self.max is None else max(self.max, ms)
+        self.buckets[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+    
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples"""
+        if not self.count:
+            return None
+        wanted = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= wanted:
+                return min(bound, self.max)
+        return self.max
+    
+    def to_dict(self):
+        buckets = {f"<={bound}": count for bound, count in zip(BUCKETS_MS, self.buckets)}
+        buckets["slower"] = self.buckets[-1]
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else None,
+            "min_ms": self.min,
+            "max_ms": self.max,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": buckets,
+        }
+
+class Metrics:
+    """Named histograms and gauges, collected only once enabled"""
+    
+    def __init__(self):
+        self.enabled = False
+        self.histograms = {}
+        self.gauges = {}  # name -> [current, peak]
+        self.started = time.time()
+    
+    def observe(self, name, ms):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.observe(ms)
+    
+    def timed(self, name, func):
+        """Wrap func so every call is timed into the name histogram"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.observe(name, (time.perf_counter() - start) * 1000)
+        return wrapper
+    
+    def set_gauge(self, name, value):
+        gauge = self.gauges.get(name)
+        if gauge is None:
+            self.gauges[name] = [value, value]
+        else:
+            gauge[0] = value
+            gauge[1] = max(gauge[1], value)
+    
+    def to_dict(self):
+        return {
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "uptime_s": time.time() - self.started,
+            "timings": {name: h.to_dict() for name, h in sorted(self.histograms.items())},
+            "gauges": {name: {"current": current, "peak": peak}
+                       for name, (current, peak) in sorted(self.gauges.items())},
+        }
+    
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.write("\n")
+    
+    def summary(self):
+        """A few lines for an on-screen overlay"""
+        lines = []
+        for name, histogram in sorted(self.histograms.items()):
+            p95 = histogram.percentile(0.95)
+            lines.append(f"{name}: n={histogram.count} p95={p95:.1f} max={histogram.max:.1f} ms")
+        for name, (current, peak) in sorted(self.gauges.items()):
+            lines.append(f"{name}: {current} (peak {peak})")
+        return "\n".join(lines)
@@ -0,0 +1,181 @@
+"""Due dates for T@PP: parsing, formatting and a deadline scheduler (no Tk)"""
+import heapq
+import re
+import time
+from datetime import datetime, timedelta
+
+# Longest single wait, so a changed system clock is noticed within the hour
+MAX_WAIT_MS = 60 * 60 * 1000
+
+# Batches larger than this are pushed onto the heap with one heapify
+BULK_THRESHOLD = 64
+
+RELATIVE_UNITS = {"m": 60, "h": 3600, "d": 86400, "w": 604800}
+DATE_FORMATS = ("%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M", "%Y-%m-%d")
+
+def format_due(due):
+    """An ISO 8601 timestamp with the local UTC offset, or None"""
+    if due is None:
+        return None
+    return datetime.fromtimestamp(due).astimezone().isoformat(timespec="seconds")
+
+def short_due(due):
+    """A compact local date and time for cards, e.g. "Oct 20 17:00" """
+    return time.strftime("%b %d %H:%M", time.localtime(due))
+
+def editable_due(due):
+    """The due date as "YYYY-MM-DD HH:MM", which parse_due reads back"""
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(due))
+
+def parse_due(value, now=None):
+    """Epoch seconds from a number or a string, or None when there is no due date.
+    
+    Strings may be ISO 8601 timestamps, "YYYY-MM-DD[ HH:MM]", a time of
+    day ("17:30", today or else tomorrow) or relative ("+30m", "+2h",
+    "+1d", "+1w"). Raises ValueError for anything else, and for times
+    outside what datetime can represent (such as Infinity or +99999999w).
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f"not a due date: {value!r}")
+    if isinstance(value, (int, float)):
+        return checked_due(value)
+    text = value.strip()
+    if not text:
+        return None
+    now = time.time() if now is None else now
+    match = re.fullmatch(r"\+(\d+)\s*([mhdw])", text.lower())
+    if match:
+        return checked_due(int(now) + int(match.group(1)) * RELATIVE_UNITS[match.group(2)])
+    match = re.fullmatch(r"(\d{1,2}):(\d{2})", text)
+    if match:
+        today = datetime.fromtimestamp(now)
+        due = today.replace(hour=int(match.group(1)), minute=int(match.group(2)), second=0, microsecond=0)
+        if due.timestamp() <= now:
+            due += timedelta(days=1)
+        return int(due.timestamp())
+    for date_format in DATE_FORMATS:
+        try:
+            return int(datetime.strptime(text, date_format).timestamp())
+        except ValueError:
+            pass
+    return int(datetime.fromisoformat(text).timestamp())
+
+def checked_due(seconds):
+    """seconds as an int, or ValueError when no local date has that timestamp"""
+    try:
+        datetime.fromtimestamp(seconds)
+        return int(seconds)
+    except (OverflowError, OSError, ValueError):
+        raise ValueError(f"due date out of range: {seconds!r}") from None
+
+def split_due(text, now=None):
+    """Split "task text @when" into (text, due); due is None without an @ suffix"""
+    head, sep, when = text.rpartition(" @")
+    if not sep or not head.strip():
+        return text, None
+    try:
+        return head.rstrip(), parse_due(when, now)
+    except ValueError:
+        return text, None
+
+def is_overdue(task, now=None):
+    return task.due is not None and not task.status and task.due <= (time.time() if now is None else now)
+
+class DueScheduler:
+    """Heap of upcoming deadlines behind a single timer.
+    
+    Active tasks whose deadline is still to come sit in a min-heap of
+    (due, id). Only the nearest deadline has a timer armed, through
+    timer.after(ms, callback) / timer.after_cancel(job) (a Tk widget will
+    do), and it is re-armed only when that nearest deadline changes. Tasks
+    that are completed, removed or given another due date leave stale heap
+    entries behind, which are skipped when they surface, so changes cost
+    O(log n) and an idle app wakes up at most once per MAX_WAIT_MS.
+    on_due(tasks) is called with the tasks whose deadline has just passed.
+    """
+    
+    def __init__(self, store, timer, on_due, clock=time.time):
+        self.store = store
+        self.timer = timer
+        self.on_due = on_due
+        self.clock = clock
+        self.heap = []      # (due, id), possibly stale
+        self.pending = {}   # id -> due of the tasks still to come due
+        self.job = None
+        self.armed_for = None
+    
+    def attach(self):
+        self.store.subscribe(self.on_change)
+    
+    def detach(self):
+        self.store.unsubscribe(self.on_change)
+        self._cancel()
+    
+    def on_change(self, event, tasks):
+        if event == "clear":
+            self.heap.clear()
+            self.pending.clear()
+            self._arm()
+            return
+        # Deadlines already past are announced once when tasks are loaded;
+        # later changes to overdue tasks only restyle them
+        now = None if event == "load" else self.clock()
+        entries = []
+        for task in tasks:
+            due = None if event == "remove" or task.status else task.due
+            if due is not None and now is not None and due <= now and self.pending.get(task.id) != due:
+                due = None
+            if due is None:
+                self.pending.pop(task.id, None)
+            elif self.pending.get(task.id) != due:
+                self.pending[task.id] = due
+                entries.append((due, task.id))
+        if len(entries) > BULK_THRESHOLD:
+            self.heap.extend(entries)
+            heapq.heapify(self.heap)
+        else:
+            for entry in entries:
+                heapq.heappush(self.heap, entry)
+        # Stale entries never outnumber live ones by much
+        if len(self.heap) > 2 * len(self.pending) + BULK_THRESHOLD:
+            self.heap = [(due, task_id) for task_id, due in self.pending.items()]
+            heapq.heapify(self.heap)
+        self._arm()
+    
+    def _next_due(self):
+        """Nearest pending deadline, dropping stale entries off the top"""
+        heap = self.heap
+        while heap and self.pending.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+    
+    def _arm(self):
+        due = self._next_due()
+        if due == self.armed_for:
+            return
+        self._cancel()
+        if due is not None:
+            delay_ms = max(0, min(int((due - self.clock()) * 1000) + 1, MAX_WAIT_MS))
+            self.job = self.timer.after(delay_ms, self._fire)
+            self.armed_for = due
+    
+    def _cancel(self):
+        if self.job is not None:
+            self.timer.after_cancel(self.job)
+        self.job = None
+        self.armed_for = None
+    
+    def _fire(self):
+        self.job = None
+        self.armed_for = None
+        now = self.clock()
+        tasks = []
+        while (due := self._next_due()) is not None and due <= now:
+            _due, task_id = heapq.heappop(self.heap)
+            del self.pending[task_id]
+            tasks.append(self.store.get(task_id))
+        self._arm()
+        if tasks:
+            self.on_due(tasks)
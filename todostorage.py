@@ -0,0 +1,411 @@
+"""SQLite persistence for the T@PP task store"""
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+
+DB_PATH = os.environ.get("TAPP_DB", os.path.join(os.path.expanduser("~"), ".tapp.db"))
+
+# Delay before pending changes are written, so a burst of clicks is one commit
+FLUSH_DELAY_MS = 300
+
+# Rows fetched per query when paging tasks in at startup
+LOAD_PAGE_SIZE = 1000
+
+# Pending changes that force an immediate flush (keeps bulk imports bounded)
+FLUSH_MAX_PENDING = 10000
+
+# Feed entries read per poll by an instance catching up
+FEED_PAGE_SIZE = 5000
+
+# Task ids leased from the shared counter at a time when there is a writer;
+# a new block is leased on the writer's thread once half of one is left
+LEASE_BLOCK = 1000
+
+# Instances refresh their row in the instances table this often, and are
+# considered gone (no longer holding back compaction) after the timeout
+INSTANCE_HEARTBEAT_S = 30
+INSTANCE_TIMEOUT_S = 300
+
+def saved_row(task):
+    """The (id, text, status, priority, due) row a task is written as"""
+    return task.id, task.text, int(task.status), task.priority, task.due
+
+class SQLiteStorage:
+    """SQLite persistence for a TaskStore with write-behind batching.
+    
+    Changes are coalesced per task id in memory and written by flush() in
+    a single transaction, so a burst of clicks costs one commit. The SQL
+    strings are constants, so sqlite3 reuses its prepared statements.
+    
+    With a writer, flush() only takes the pending changes and passes
+    writer(write, changes, on_error) the job of writing them, e.g. on a
+    worker thread that serializes all database access. If the job fails,
+    the writer calls on_error(exception) on the thread that owns the store
+    and the changes are pending again. Every take is numbered: generation
+    counts the takes and written is the latest one written, so a reader
+    can tell which changes it may not have seen yet.
+    
+    Every write is also appended to the changes table, a log with
+    increasing sequence numbers that other processes on the same database
+    follow (see todofeed). SQLite's file locks keep the log and the tasks
+    in step, and new task ids are leased from a shared counter so two
+    processes never hand out the same one. With a writer, ids are leased
+    LEASE_BLOCK at a time through it, ahead of need, so adding a task
+    rarely touches the database. The tasks table is the snapshot:
+    compact() drops log entries every running instance has applied.
+    """
+    
+    SCHEMA = """CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY,
+        text TEXT NOT NULL,
+        status INTEGER NOT NULL DEFAULT 0,
+        priority INTEGER NOT NULL DEFAULT 1,
+        due INTEGER
+    )"""
+    # Columns added since the first schema, for databases created before them
+    COLUMNS = "PRAGMA table_info(tasks)"
+    ADD_COLUMNS = {
+        "priority": "ALTER TABLE tasks ADD COLUMN priority INTEGER NOT NULL DEFAULT 1",
+        "due": "ALTER TABLE tasks ADD COLUMN due INTEGER",
+    }
+    UPSERT = "INSERT OR REPLACE INTO tasks (id, text, status, priority, due) VALUES (?, ?, ?, ?, ?)"
+    DELETE = "DELETE FROM tasks WHERE id = ?"
+    CLEAR = "DELETE FROM tasks"
+    MAX_ID = "SELECT COALESCE(MAX(id), 0) FROM tasks"
+    PAGE = "SELECT id, text, status, priority, due FROM tasks WHERE id > ? AND id <= ? ORDER BY id LIMIT ?"
+    GET = "SELECT id, text, status, priority, due FROM tasks WHERE id = ?"
+    ALL = "SELECT id, text, status, priority, due FROM tasks ORDER BY id"
+    COUNT = "SELECT COUNT(*) FROM tasks"
+    
+    FEED_SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            origin TEXT NOT NULL,
+            op TEXT NOT NULL,
+            id INTEGER, text TEXT, status INTEGER, priority INTEGER, due INTEGER
+        )""",
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS instances (origin TEXT PRIMARY KEY, seq INTEGER NOT NULL, seen REAL NOT NULL)",
+    )
+    LOG_CLEAR = "INSERT INTO changes (origin, op) VALUES (?, 'clear')"
+    LOG_DELETE = "INSERT INTO changes (origin, op, id) VALUES (?, 'delete', ?)"
+    LOG_UPSERT = ("INSERT INTO changes (origin, op, id, text, status, priority, due) "
+                  "VALUES (?, 'upsert', ?, ?, ?, ?, ?)")
+    FEED = "SELECT seq, origin, op, id, text, status, priority, due FROM changes WHERE seq > ? ORDER BY seq LIMIT ?"
+    LAST_SEQ = "SELECT COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'changes'), 0)"
+    DATA_VERSION = "PRAGMA data_version"
+    
+    # The next free task id; never below what the tasks table already holds
+    INIT_NEXT_ID = "INSERT OR IGNORE INTO meta VALUES ('next_id', 1)"
+    LEASE_IDS = ("UPDATE meta SET value = MAX(value, (SELECT COALESCE(MAX(id), 0) + 1 FROM tasks)) + ? "
+                 "WHERE key = 'next_id'")
+    NEXT_ID = "SELECT value FROM meta WHERE key = 'next_id'"
+    
+    # Entries up to "compacted" are gone; an instance behind that must reload
+    COMPACTED = "SELECT COALESCE((SELECT value FROM meta WHERE key = 'compacted'), 0)"
+    SET_COMPACTED = ("INSERT INTO meta VALUES ('compacted', ?) "
+                     "ON CONFLICT(key) DO UPDATE SET value = MAX(value, excluded.value)")
+    REGISTER = "INSERT OR REPLACE INTO instances VALUES (?, ?, ?)"
+    UNREGISTER = "DELETE FROM instances WHERE origin = ?"
+    DROP_GONE = "DELETE FROM instances WHERE seen < ?"
+    APPLIED_BY_ALL = "SELECT MIN(seq) FROM instances"
+    COMPACT = "DELETE FROM changes WHERE seq <= ?"
+    
+    def __init__(self, path, on_dirty=None, writer=None):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(self.SCHEMA)
+        columns = {column[1] for column in self.conn.execute(self.COLUMNS)}
+        for name, statement in self.ADD_COLUMNS.items():
+            if name not in columns:
+                self.conn.execute(statement)
+        for statement in self.FEED_SCHEMA:
+            self.conn.execute(statement)
+        self.conn.execute(self.INIT_NEXT_ID)
+        self.conn.commit()
+        self.on_dirty = on_dirty
+        self.writer = writer
+        self.origin = uuid.uuid4().hex  # tags this process's feed entries
+        self.registered = False
+        self.heartbeat = 0.0
+        self.data_version = None
+        self._lease_conn = None
+        self._pending = {}  # id -> row to write, or None to delete
+        self._cleared = False
+        self.generation = 0    # takes of pending changes so far
+        self.written = 0       # generation of the latest write
+        self._taken = {}       # id -> generation of its latest take
+        self._cleared_taken = 0
+        self._leased = deque()  # ranges of leased ids not handed out yet, in order
+        self._lease_lock = threading.Lock()
+        self._refilling = False
+        self._last_id = 0       # highest id handed out by lease_ids
+    
+    def attach(self, store):
+        self.store = store
+        store.subscribe(self.on_change)
+    
+    def on_change(self, event, tasks):
+        # Loaded tasks are saved already, and changes from other processes
+        # were saved by them
+        if event == "load" or self.store.remote:
+            return
+        if event == "clear":
+            self._pending.clear()
+            self._cleared = True
+        elif event == "remove":
+            for task in tasks:
+                self._pending[task.id] = None
+        else:
+            for task in tasks:
+                self._pending[task.id] = saved_row(task)
+        if len(self._pending) >= FLUSH_MAX_PENDING:
+            self.flush()
+        elif self.on_dirty:
+            self.on_dirty()
+    
+    @property
+    def dirty(self):
+        return self._cleared or bool(self._pending)
+    
+    def has_pending(self, task_id, written=None):
+        """Whether a change to the task (or a clear) is still to be written.
+        
+        With written, a value of the written attribute, changes taken
+        after that generation count as well, written or not.
+        """
+        if self._cleared or task_id in self._pending:
+            return True
+        return written is not None and (self._cleared_taken > written or self._taken.get(task_id, 0) > written)
+    
+    def forget_taken(self, written):
+        """Stop tracking the takes up to generation written"""
+        if self._taken and self.generation <= written:
+            self._taken.clear()
+        elif self._taken:
+            self._taken = {task_id: taken for task_id, taken in self._taken.items() if taken > written}
+    
+    def take_pending(self):
+        """Hand over the pending changes as (cleared, deletes, upserts, generation)"""
+        self.generation += 1
+        generation = self.generation
+        changes = (self._cleared,
+                   [(task_id,) for task_id, row in self._pending.items() if row is None],
+                   [row for row in self._pending.values() if row is not None],
+                   generation)
+        if self._cleared:
+            self._cleared_taken = generation
+        self._taken.update(dict.fromkeys(self._pending, generation))
+        self._pending = {}
+        self._cleared = False
+        return changes
+    
+    def write(self, changes):
+        """Apply changes from take_pending() in one transaction"""
+        cleared, deletes, upserts, generation = changes
+        origin = self.origin
+        with self.conn:
+            if cleared:
+                self.conn.execute(self.CLEAR)
+                self.conn.execute(self.LOG_CLEAR, (origin,))
+            if deletes:
+                self.conn.executemany(self.DELETE, deletes)
+                self.conn.executemany(self.LOG_DELETE, ((origin, task_id) for task_id, in deletes))
+            if upserts:
+                self.conn.executemany(self.UPSERT, upserts)
+                self.conn.executemany(self.LOG_UPSERT, ((origin,) + row for row in upserts))
+        self.written = generation
+        # Our own commits leave data_version alone; read the entries they logged
+        self.data_version = None
+    
+    def flush(self):
+        """Write all pending changes in one transaction, through the writer if set"""
+        if not self.dirty:
+            return
+        if self.writer is None:
+            self.write(self.take_pending())
+        else:
+            changes = self.take_pending()
+            self.writer(self.write, changes, lambda e: self.requeue(changes))
+    
+    def requeue(self, changes):
+        """Take back changes from take_pending() that could not be written.
+        
+        The store holds the latest state of every task they touched, so
+        each comes back as that state unless it has a newer change pending
+        already; the next flush retries them.
+        """
+        cleared, deletes, upserts, _generation = changes
+        if cleared:
+            # Tasks written after the clear would be wiped by its retry
+            self._cleared = True
+            task_ids = [task.id for task in self.store]
+        else:
+            task_ids = [task_id for task_id, in deletes] + [row[0] for row in upserts]
+        for task_id in task_ids:
+            if task_id not in self._pending:
+                task = self.store.get(task_id)
+                self._pending[task_id] = None if task is None else saved_row(task)
+        if self.on_dirty:
+            self.on_dirty()
+    
+    def max_id(self):
+        return self.conn.execute(self.MAX_ID).fetchone()[0]
+    
+    def lease_ids(self, count, refill=True):
+        """Reserve count new task ids and return them, in increasing order.
+        
+        Ids come from the leased blocks when they have enough; otherwise
+        the rest is leased right away on a connection of its own, so it
+        can be called from any thread while the writer uses the main one
+        (sqlite3.OperationalError if the database stays locked). Off the
+        thread that owns the writer, pass refill=False and call
+        prefetch_ids() from that thread later.
+        """
+        with self._lease_lock:
+            ids = []
+            while self._leased and len(ids) < count:
+                # A block leased in the background can come in behind a
+                # later one; only ids after those handed out are used
+                block = self._leased.popleft()
+                block = block[max(0, self._last_id + 1 - block.start):]
+                take = count - len(ids)
+                ids.extend(block[:take])
+                if len(block) > take:
+                    self._leased.appendleft(block[take:])
+            if len(ids) < count:
+                extra = LEASE_BLOCK if self.writer is not None else 0
+                block = self._lease(count - len(ids) + extra)
+                ids.extend(block[:count - len(ids)])
+                if extra:
+                    self._leased.append(block[len(block) - extra:])
+            if ids:
+                self._last_id = ids[-1]
+        if refill:
+            self.prefetch_ids()
+        return ids
+    
+    def prefetch_ids(self):
+        """Lease another block through the writer once fewer than half of one are left"""
+        with self._lease_lock:
+            if self.writer is None or self._refilling or sum(map(len, self._leased)) >= LEASE_BLOCK // 2:
+                return
+            self._refilling = True
+        self.writer(self._refill_ids, LEASE_BLOCK, None)
+    
+    def _refill_ids(self, count):
+        block = range(0)
+        try:
+            block = self._lease(count, self.conn)
+        finally:
+            with self._lease_lock:
+                self._leased.append(block)
+                self._leased = deque(sorted(self._leased, key=lambda leased: leased.start))
+                self._refilling = False
+    
+    def _lease(self, count, conn=None):
+        """Take count ids from the shared counter as a range"""
+        if conn is None:
+            if self._lease_conn is None:
+                self._lease_conn = sqlite3.connect(self.path, check_same_thread=False)
+                self._lease_conn.execute("PRAGMA synchronous=NORMAL")
+            conn = self._lease_conn
+        with conn:
+            conn.execute(self.LEASE_IDS, (count,))
+            end = conn.execute(self.NEXT_ID).fetchone()[0]
+        return range(end - count, end)
+    
+    # Change feed
+    def register(self):
+        """Start following the feed; returns the sequence number to follow from.
+        
+        Call it before loading the tasks, so no change can fall between
+        the two (changes seen twice are harmless).
+        """
+        with self.conn:
+            seq = self.conn.execute(self.LAST_SEQ).fetchone()[0]
+            self.heartbeat = time.time()
+            self.conn.execute(self.REGISTER, (self.origin, seq, self.heartbeat))
+        self.registered = True
+        self.data_version = None
+        return seq
+    
+    def read_feed(self, after_seq, limit=FEED_PAGE_SIZE):
+        """Feed entries after after_seq as (seq, origin, op, id, text, status, priority, due).
+        
+        Returns [] quickly when no other connection committed anything
+        since the last call, and None when entries after after_seq were
+        already compacted away, so the caller has to reload everything.
+        """
+        version = self.conn.execute(self.DATA_VERSION).fetchone()[0]
+        if version == self.data_version:
+            return []
+        if self.conn.execute(self.COMPACTED).fetchone()[0] > after_seq:
+            return None
+        rows = self.conn.execute(self.FEED, (after_seq, limit)).fetchall()
+        # Come back without the shortcut until the backlog is read
+        self.data_version = version if len(rows) < limit else None
+        return rows
+    
+    def acknowledge(self, seq):
+        """Record how far this instance got; written at most once per heartbeat"""
+        now = time.time()
+        if now - self.heartbeat < INSTANCE_HEARTBEAT_S:
+            return
+        self.heartbeat = now
+        with self.conn:
+            self.conn.execute(self.REGISTER, (self.origin, seq, now))
+    
+    def compact(self):
+        """Drop the feed entries that every running instance has applied"""
+        with self.conn:
+            self.conn.execute(self.DROP_GONE, (time.time() - INSTANCE_TIMEOUT_S,))
+            seq = self.conn.execute(self.APPLIED_BY_ALL).fetchone()[0]
+            if seq is None:
+                seq = self.conn.execute(self.LAST_SEQ).fetchone()[0]
+            if seq:
+                self.conn.execute(self.COMPACT, (seq,))
+                self.conn.execute(self.SET_COMPACTED, (seq,))
+    
+    def load_page(self, after_id, last_id, limit=LOAD_PAGE_SIZE):
+        """Rows with after_id < id <= last_id in id order.
+        
+        Without a writer pending changes are flushed first. With one, call
+        flush() before queueing the read behind the writes it starts.
+        """
+        if self.writer is None:
+            self.flush()
+        return self.conn.execute(self.PAGE, (after_id, last_id, limit)).fetchall()
+    
+    def saved_rows(self):
+        """(count, rows): every saved row in id order, streamed from one read (flushing like load_page)"""
+        if self.writer is None:
+            self.flush()
+        return self.conn.execute(self.COUNT).fetchone()[0], self.conn.execute(self.ALL)
+    
+    def load_ids(self, task_ids):
+        """Rows of the given task ids that exist, in id order (flushing like load_page)"""
+        if self.writer is None:
+            self.flush()
+        rows = (self.conn.execute(self.GET, (task_id,)).fetchone() for task_id in sorted(set(task_ids)))
+        return [row for row in rows if row is not None]
+    
+    def close(self):
+        """Write what is still pending directly and close the database.
+        
+        With a writer, wait for the writes it was given to finish first.
+        """
+        if self.dirty:
+            self.write(self.take_pending())
+        if self.registered:
+            with self.conn:
+                self.conn.execute(self.UNREGISTER, (self.origin,))
+        self.compact()
+        self.conn.close()
+        if self._lease_conn is not None:
+            self._lease_conn.close()
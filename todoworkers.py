@@ -0,0 +1,114 @@
+"""Background worker threads for T@PP, handing results back to the UI thread"""
+import queue
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+# Threads for independent jobs such as imports and exports
+WORKER_THREADS = 4
+
+# Progress reports of one job that may wait for drain() at a time; report()
+# blocks beyond that, so a fast reader never queues up a whole file
+MAX_PENDING_REPORTS = 2
+
+# How often a blocked report() checks whether the pool is shutting down, in seconds
+REPORT_WAIT_S = 0.1
+
+class Job:
+    """Handle a running function uses to report progress"""
+    
+    def __init__(self, pool, on_progress):
+        self.pool = pool
+        self.on_progress = on_progress
+        self.slots = threading.BoundedSemaphore(MAX_PENDING_REPORTS)
+    
+    def report(self, value):
+        """Queue value for on_progress, waiting while earlier reports are still queued.
+        
+        Raises CancelledError once the pool shuts down.
+        """
+        while not self.slots.acquire(timeout=REPORT_WAIT_S):
+            if self.pool.closing:
+                raise CancelledError()
+        if self.pool.closing:
+            raise CancelledError()
+        self.pool.results.put((self._deliver, value))
+    
+    def _deliver(self, value):
+        try:
+            self.on_progress(value)
+        finally:
+            self.slots.release()
+
+class WorkerPool:
+    """Thread pool whose callbacks run on the thread that calls drain().
+    
+    Workers never touch the caller's state: finished jobs and progress
+    reports go onto a thread-safe queue, and drain() runs their callbacks,
+    so a Tk app can apply them from a single recurring after() poll. Jobs
+    submitted with serial=True run one at a time in submission order on a
+    dedicated thread, which keeps database writes and reads in order.
+    """
+    
+    def __init__(self, max_workers=WORKER_THREADS):
+        self.pool = ThreadPoolExecutor(max_workers, thread_name_prefix="tapp-worker")
+        self.serial = ThreadPoolExecutor(1, thread_name_prefix="tapp-serial")
+        self.results = queue.SimpleQueue()  # (callback, argument)
+        self.pending = 0
+        self.closing = False
+    
+    @property
+    def busy(self):
+        return self.pending > 0 or not self.results.empty()
+    
+    def submit(self, func, *args, on_done=None, on_error=None, on_progress=None, serial=False):
+        """Run func(*args) on a worker thread.
+        
+        on_done(result) or on_error(exception) runs from drain() when it
+        finishes. With on_progress, func also gets a report keyword
+        argument; every report(value) call leads to on_progress(value), and
+        blocks while MAX_PENDING_REPORTS earlier values are still undrained.
+        """
+        kwargs = {}
+        if on_progress is not None:
+            kwargs["report"] = Job(self, on_progress).report
+        executor = self.serial if serial else self.pool
+        future = executor.submit(func, *args, **kwargs)
+        self.pending += 1
+        future.add_done_callback(
+            lambda f: self.results.put((self._finish, (f, on_done, on_error))))
+        return future
+    
+    def _finish(self, outcome):
+        future, on_done, on_error = outcome
+        self.pending -= 1
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            if on_done is not None:
+                on_done(future.result())
+        elif on_error is not None:
+            on_error(error)
+        elif not isinstance(error, CancelledError):
+            traceback.print_exception(type(error), error, error.__traceback__, file=sys.stderr)
+    
+    def drain(self, budget_ms=None):
+        """Run queued callbacks, stopping early once budget_ms has passed"""
+        deadline = None if budget_ms is None else time.perf_counter() + budget_ms / 1000
+        while True:
+            try:
+                callback, value = self.results.get_nowait()
+            except queue.Empty:
+                return
+            callback(value)
+            if deadline is not None and time.perf_counter() > deadline:
+                return
+    
+    def shutdown(self):
+        """Cancel queued jobs, stop reporting ones and wait for serial jobs to finish"""
+        self.closing = True
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        self.serial.shutdown(wait=True)